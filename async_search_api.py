@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from search_api import METRICS_CONTENT_TYPE, handle_request
+from search_metrics import rejected_requests
+
+# Defaults sized for the small instances in app.yaml
+DEFAULT_CONCURRENCY = os.cpu_count() or 1
+DEFAULT_QUEUE_DEPTH = 64
+
+# Seconds a client may take to send its request headers
+HEADER_TIMEOUT = 10
+MAX_HEADER_BYTES = 16384
+
+
+class AsyncSearchServer:
+    """Single-threaded asyncio front end that runs scoring on a bounded executor"""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, queue_depth=DEFAULT_QUEUE_DEPTH, quiet=False):
+        self.concurrency = concurrency
+        self.queue_depth = queue_depth
+        self.quiet = quiet
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='search')
+        self.slots = None
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def dispatch(self, path):
+        """Run one request on the executor, or shed it when the queue is full"""
+        # `concurrency` searches run at once and `queue_depth` more may wait for a slot;
+        # anything beyond that gets a fast 503 so latency stays bounded under overload
+        if self.in_flight >= self.concurrency + self.queue_depth:
+            self.rejected += 1
+            rejected_requests.inc()
+            return 503, {'error': 'Server overloaded, retry shortly'}
+
+        self.in_flight += 1
+        try:
+            async with self.slots:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, handle_request, path)
+        except Exception:
+            # handle_request answers its own errors; this covers the executor itself failing
+            traceback.print_exc()
+            return 500, {'error': "Internal server error"}
+        finally:
+            self.in_flight -= 1
+
+    async def handle_connection(self, reader, writer):
+        """Serve keep-alive HTTP/1.1 GET requests on one connection"""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), HEADER_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+
+                lines = head.decode('latin-1').split('\r\n')
+                request_line = lines[0].split()
+                if len(request_line) != 3:
+                    await self.write_response(writer, 400, {'error': 'Malformed request line'}, keep_alive=False)
+                    return
+                method, path, version = request_line
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                if method != 'GET':
+                    status, payload = 405, {'error': f"Method not allowed: {method}"}
+                else:
+                    status, payload = await self.dispatch(path)
+
+                if not self.quiet:
+                    print(f"{method} {path} {status}")
+                await self.write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def write_response(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), METRICS_CONTENT_TYPE
+        else:
+            body, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+        headers = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"
+        ]
+        if status == 503:
+            headers.append('Retry-After: 1')
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def serve(self, host, port):
+        self.slots = asyncio.Semaphore(self.concurrency)
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        async with server:
+            await server.serve_forever()
+
+
+def serve_async(host, port, concurrency=DEFAULT_CONCURRENCY, queue_depth=DEFAULT_QUEUE_DEPTH, quiet=False):
+    """Run the asyncio search server until interrupted"""
+    server = AsyncSearchServer(concurrency, queue_depth, quiet)
+    try:
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown(wait=False)
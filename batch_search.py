@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from search_api import SearchRequestError, parse_k, run_search
+
+# Queries submitted to the pool per worker before the oldest answer is written;
+# bounds memory and keeps output streaming however long the input is
+IN_FLIGHT_PER_WORKER = 16
+
+
+def parse_query_line(line, line_number):
+    """One input line as a query item; accepts plain text or a JSON object"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    if line.startswith('{'):
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            return {'line': line_number, 'error': f"Invalid JSON: {error}"}
+        if not isinstance(record, dict) or not str(record.get('query', '')).strip():
+            return {'line': line_number, 'error': "JSON line needs a non-empty 'query'"}
+        k = None
+        if record.get('k') is not None:
+            try:
+                k = parse_k(record['k'])
+            except SearchRequestError as error:
+                return {'line': line_number, 'error': error.message}
+        return {
+            'line': line_number,
+            'id': record.get('id'),
+            'query': str(record['query']).strip(),
+            'community': record.get('community'),
+            'k': k
+        }
+
+    return {'line': line_number, 'id': None, 'query': line, 'community': None, 'k': None}
+
+
+def read_queries(stream):
+    """Yield query items from a text or JSONL stream, skipping blanks and comments"""
+    for line_number, line in enumerate(stream, 1):
+        item = parse_query_line(line, line_number)
+        if item is not None:
+            yield item
+
+
+def score_item(item, default_community=None, default_k=None):
+    """Score one query item with the shared engine; runs inside a worker"""
+    if 'error' in item:
+        return item
+
+    community = item['community'] or default_community
+    k = item['k'] if item['k'] is not None else default_k
+    try:
+        response = run_search(item['query'], community, k)
+    except SearchRequestError as error:
+        response = {'query': item['query'], 'community': community, 'error': error.message}
+    except Exception as error:
+        # An engine bug on one odd line fails that line, not the batch
+        traceback.print_exc()
+        response = {'query': item['query'], 'community': community,
+                    'error': f"Internal error: {type(error).__name__}: {error}"}
+
+    response['line'] = item['line']
+    if item['id'] is not None:
+        response['id'] = item['id']
+    return response
+
+
+def _score_item_with_defaults(args):
+    return score_item(*args)
+
+
+def run_batch(items, workers, default_community=None, default_k=None):
+    """Yield responses in input order, scoring across a process pool when workers > 1"""
+    jobs = ((item, default_community, default_k) for item in items)
+    if workers <= 1:
+        for job in jobs:
+            yield _score_item_with_defaults(job)
+        return
+
+    # executor.map would read and submit the whole input before the first answer
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for job in jobs:
+            pending.append(executor.submit(_score_item_with_defaults, job))
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a file of HOA questions and stream ranked results as JSONL")
+    parser.add_argument('input', nargs='?', default='-', help="Query file, one query per line or JSONL (default: stdin)")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file (default: stdout)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help="Worker processes (default: %(default)s)")
+    parser.add_argument('--community', help="Community for lines that do not name one")
+    parser.add_argument('-k', type=int, help="Keep only the top k results per query")
+    args = parser.parse_args()
+    if args.k is not None:
+        try:
+            parse_k(args.k)
+        except SearchRequestError as error:
+            parser.error(error.message)
+
+    input_stream = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output_stream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+
+    started = time.perf_counter()
+    latencies = []
+    errors = 0
+    try:
+        for response in run_batch(read_queries(input_stream), args.workers, args.community, args.k):
+            if 'error' in response:
+                errors += 1
+            else:
+                latencies.append(response['took_ms'])
+            output_stream.write(json.dumps(response) + '\n')
+            output_stream.flush()
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    elapsed = time.perf_counter() - started
+    total = len(latencies) + errors
+    summary = f"{total} queries ({errors} errors) in {elapsed:.2f}s"
+    if latencies:
+        latencies.sort()
+        summary += f", {total / elapsed:.1f} queries/s, p50 {latencies[len(latencies) // 2]:.2f} ms, max {latencies[-1]:.2f} ms"
+    print(summary, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
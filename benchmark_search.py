@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import time
+import tracemalloc
+
+from hoa_search_engine import (calculate_semantic_similarity, florida_hoa_rules, get_rule_index, process_stage_timings,
+                               search_florida_hoa_rules, set_stage_profiling, stage_timing_rows)
+
+# The 16 topic buttons in app.py
+TOPIC_BUTTON_QUERIES = [
+    "architectural review boca ridge glen",
+    "pet restrictions boca ridge glen dogs",
+    "assessment collection fines boca ridge",
+    "residential use restrictions boca ridge",
+    "landscaping requirements boca ridge trees",
+    "vehicle parking restrictions boca ridge",
+    "common areas boca ridge glen",
+    "florida statute 720 requirements",
+    "noise restrictions quiet hours",
+    "solar panel installation rights",
+    "board elections voting procedures",
+    "security services gated community",
+    "flag display rights American flag",
+    "outdoor storage shed installation",
+    "insurance coverage hurricane requirements",
+    "HOA budget financial reports"
+]
+
+# Queries suggested by the "Florida HOA Search Tips" box
+SEARCH_TIP_QUERIES = [
+    "boca ridge pet policy",
+    "boca ridge architectural",
+    "Florida Statute 720.303",
+    "720.305",
+    "720.3085",
+    "assessment collection",
+    "violation procedures",
+    "common areas",
+    "What are Boca Ridge Glen's pet restrictions?"
+]
+
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_results')
+
+
+def synthetic_long_queries(count=20, words=120, seed=720):
+    """Deterministic long queries drawn from the rule vocabulary"""
+    vocabulary = sorted({
+        word
+        for rule_data in florida_hoa_rules.values()
+        for word in re.findall(r'\b\w+\b', (rule_data['content'] + ' ' + rule_data.get('boca_ridge_example', '')).lower())
+    })
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(vocabulary) for _ in range(words)) for _ in range(count)]
+
+
+def query_groups(long_queries=20, long_words=120, seed=720):
+    return {
+        'topic_buttons': TOPIC_BUTTON_QUERIES,
+        'search_tips': SEARCH_TIP_QUERIES,
+        'synthetic_long': synthetic_long_queries(long_queries, long_words, seed)
+    }
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies_ms, elapsed):
+    latencies_ms = sorted(latencies_ms)
+    return {
+        'calls': len(latencies_ms),
+        'p50_ms': percentile(latencies_ms, 50),
+        'p95_ms': percentile(latencies_ms, 95),
+        'p99_ms': percentile(latencies_ms, 99),
+        'mean_ms': sum(latencies_ms) / len(latencies_ms) if latencies_ms else 0.0,
+        'max_ms': latencies_ms[-1] if latencies_ms else 0.0,
+        'throughput_per_s': len(latencies_ms) / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def time_calls(call, arguments, repeat):
+    """Latency of every call in ms, replaying the argument list `repeat` times"""
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for args in arguments:
+            call_started = time.perf_counter()
+            call(*args)
+            latencies.append((time.perf_counter() - call_started) * 1000)
+    return latencies, time.perf_counter() - started
+
+
+def measure_allocations(call, arguments):
+    """Peak bytes allocated while a call runs, traced with tracemalloc"""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for args in arguments:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            call(*args)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return {
+        'mean_peak_bytes': sum(peaks) / len(peaks) if peaks else 0,
+        'max_peak_bytes': max(peaks) if peaks else 0
+    }
+
+
+def similarity_arguments(queries):
+    """(query, content, rule_id) triples as search_florida_hoa_rules would score them"""
+    return [
+        (query, rule_data['content'] + ' ' + rule_data.get('boca_ridge_example', ''), rule_id)
+        for query in queries
+        for rule_id, rule_data in florida_hoa_rules.items()
+    ]
+
+
+def benchmark(groups, repeat, community=None):
+    report = {}
+    for group, queries in groups.items():
+        search_arguments = [(query, community) for query in queries]
+        latencies, elapsed = time_calls(search_florida_hoa_rules, search_arguments, repeat)
+        search_stats = summarize(latencies, elapsed)
+        search_stats.update(measure_allocations(search_florida_hoa_rules, search_arguments))
+
+        pair_arguments = similarity_arguments(queries)
+        latencies, elapsed = time_calls(calculate_semantic_similarity, pair_arguments, repeat)
+        similarity_stats = summarize(latencies, elapsed)
+        similarity_stats.update(measure_allocations(calculate_semantic_similarity, pair_arguments))
+
+        report[group] = {
+            'queries': len(queries),
+            'search_florida_hoa_rules': search_stats,
+            'calculate_semantic_similarity': similarity_stats
+        }
+    return report
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report, baseline=None):
+    print(f"{'group':<16} {'function':<30} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'calls/s':>11} {'peak KiB':>9}")
+    for group, group_report in report['groups'].items():
+        for function in ('search_florida_hoa_rules', 'calculate_semantic_similarity'):
+            stats = group_report[function]
+            line = (f"{group:<16} {function:<30} {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} "
+                    f"{stats['p99_ms']:>9.3f} {stats['throughput_per_s']:>11.1f} {stats['mean_peak_bytes'] / 1024:>9.1f}")
+            previous = (baseline or {}).get('groups', {}).get(group, {}).get(function)
+            if previous and previous['p50_ms']:
+                line += f"  p50 {(stats['p50_ms'] / previous['p50_ms'] - 1) * 100:+.1f}% vs {baseline.get('revision')}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency benchmark for search_florida_hoa_rules and calculate_semantic_similarity")
+    parser.add_argument('--repeat', type=int, default=20, help="Replays of each query set (default: %(default)s)")
+    parser.add_argument('--long-queries', type=int, default=20, help="Synthetic long queries (default: %(default)s)")
+    parser.add_argument('--long-words', type=int, default=120, help="Words per synthetic query (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=720, help="Seed for synthetic queries (default: %(default)s)")
+    parser.add_argument('--community', help="Search this community's rule index")
+    parser.add_argument('--snapshot', help="Score from a memory-mapped index snapshot instead of the in-process index")
+    parser.add_argument('--stage-timings', action='store_true',
+                        help="Also time each scorer stage (adds timer overhead to the latencies)")
+    parser.add_argument('--output', help="JSON results file (default: benchmark_results/<revision>-<timestamp>.json)")
+    parser.add_argument('--compare', help="Earlier JSON results to compare p50 latency against")
+    args = parser.parse_args()
+
+    if args.stage_timings:
+        set_stage_profiling(True)
+
+    index_started = time.perf_counter()
+    if args.snapshot:
+        from index_snapshot import attach_snapshot
+        attach_snapshot(args.snapshot)
+    get_rule_index(args.community)
+    index_ms = (time.perf_counter() - index_started) * 1000
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'index_load_ms': index_ms,
+        'groups': benchmark(query_groups(args.long_queries, args.long_words, args.seed), args.repeat, args.community)
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.stage_timings:
+        report['stage_timings'] = stage_timing_rows(process_stage_timings())
+        print(f"\n{'stage':<10} {'calls':>8} {'total ms':>10} {'mean us':>9} {'share':>6}")
+        for row in report['stage_timings']:
+            print(f"{row['stage']:<10} {row['calls']:>8} {row['total_ms']:>10.3f} {row['mean_us']:>9.3f} {row['share']:>6.1%}")
+
+    output = args.output
+    if not output:
+        os.makedirs(DEFAULT_RESULTS_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_RESULTS_DIR, f"{report['revision'] or 'unknown'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+from benchmark_search import percentile
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FIRST_QUERY = "pet restrictions boca ridge glen dogs"
+
+# Child process body: import the engine, run one search, report its phases as JSON
+CHILD_SEARCH = """
+import json, sys, time
+started = time.perf_counter()
+if sys.argv[1] == 'mmap':
+    from index_snapshot import attach_snapshot
+    attach_snapshot(sys.argv[2])
+import hoa_search_engine
+imported = time.perf_counter()
+hoa_search_engine.search_florida_hoa_rules(sys.argv[3])
+searched = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'first_search_ms': (searched - imported) * 1000}))
+"""
+
+CHILD_STREAMLIT_IMPORT = "import streamlit"
+
+
+def time_child(arguments, env=None):
+    """Wall time from spawning a Python child until it exits, plus the JSON it printed"""
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable] + arguments, cwd=REPO_DIR, env=env,
+                               capture_output=True, text=True, check=True)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    output = completed.stdout.strip()
+    return elapsed_ms, json.loads(output) if output else {}
+
+
+def engine_startup(mode, snapshot_path):
+    """Process start to first ranked result for one way of loading the engine"""
+    env = dict(os.environ)
+    if mode == 'build':
+        env['HOA_STARTUP_SNAPSHOT'] = ''
+    return time_child(['-c', CHILD_SEARCH, mode, snapshot_path or '', FIRST_QUERY], env)
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def api_startup(timeout=30.0):
+    """Process start of search_api.py to its first answered /search request"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/search?q={urllib.parse.quote(FIRST_QUERY)}"
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, 'search_api.py', '--port', str(port), '--quiet'], cwd=REPO_DIR,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    response.read()
+                return (time.perf_counter() - started) * 1000, {}
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError(f"search_api.py did not answer within {timeout} s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summarize_runs(runs):
+    totals = sorted(total for total, _ in runs)
+    summary = {'runs': len(runs), 'p50_ms': percentile(totals, 50), 'min_ms': totals[0], 'max_ms': totals[-1]}
+    phases = [phase for _, phase in runs if phase]
+    for key in (phases[0] if phases else {}):
+        summary[f'{key}_p50'] = percentile(sorted(phase[key] for phase in phases), 50)
+    return summary
+
+
+def benchmark(repeat, modes, snapshot_path):
+    report = {}
+    for mode in modes:
+        if mode == 'api':
+            runs = [api_startup() for _ in range(repeat)]
+        elif mode == 'streamlit_import':
+            runs = [time_child(['-c', CHILD_STREAMLIT_IMPORT]) for _ in range(repeat)]
+        else:
+            runs = [engine_startup(mode, snapshot_path) for _ in range(repeat)]
+        report[mode] = summarize_runs(runs)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time from process start to the first search result")
+    parser.add_argument('--repeat', type=int, default=10, help="Cold starts per mode (default: %(default)s)")
+    parser.add_argument('--skip-api', action='store_true', help="Do not time search_api.py startup")
+    parser.add_argument('--output', help="Write the report as JSON")
+    args = parser.parse_args()
+
+    # Same build steps a deploy runs, so every mode starts from fresh snapshot files
+    from hoa_search_engine import write_startup_snapshot
+    from index_snapshot import write_snapshot
+    write_startup_snapshot()
+    snapshot_path = write_snapshot()
+
+    # build: analyze every rule at startup; startup: unpickle prebuilt indexes; mmap: attach the shared snapshot
+    modes = ['build', 'startup', 'mmap']
+    if not args.skip_api:
+        modes.append('api')
+    if importlib.util.find_spec('streamlit') is not None:
+        modes.append('streamlit_import')
+
+    report = benchmark(args.repeat, modes, snapshot_path)
+    print(f"{'mode':<18} {'p50 ms':>8} {'min ms':>8} {'max ms':>8} {'import ms':>10} {'1st search ms':>14}")
+    for mode, stats in report.items():
+        print(f"{mode:<18} {stats['p50_ms']:>8.1f} {stats['min_ms']:>8.1f} {stats['max_ms']:>8.1f} "
+              f"{stats.get('import_ms_p50', 0.0):>10.2f} {stats.get('first_search_ms_p50', 0.0):>14.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from array import array
+
+from community_corpus import load_community_passages
+from hoa_search_engine import florida_hoa_rules, list_communities, load_community_rules, rule_title
+
+DEFAULT_GRAPH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'citation_graph.json')
+GRAPH_VERSION = 1
+
+# Florida Statutes chapters the governing documents cite: HOAs, not-for-profit
+# corporations, condominiums, water resources and growth management
+STATUTE_CHAPTERS = ('720', '617', '718', '373', '163')
+CITATION = re.compile(r'\b(' + '|'.join(STATUTE_CHAPTERS) + r')\.(\d{2,4})\b')
+# Bylaws and declarations mostly cite whole chapters ("under Chapter 617 of the Florida Statutes")
+CHAPTER_CITATION = re.compile(r'\bchapters?\s+(' + '|'.join(STATUTE_CHAPTERS) + r')\b(?!\.\d)', re.IGNORECASE)
+
+
+def extract_citations(text):
+    """Statute sections ("720.306", subsections folded in) and whole chapters ("chapter 617") cited in a text"""
+    cited = [f"{chapter}.{section}" for chapter, section in CITATION.findall(text)]
+    cited += [f"chapter {chapter}" for chapter in CHAPTER_CITATION.findall(text)]
+    return list(dict.fromkeys(cited))
+
+
+def citing_sections():
+    """(node metadata, cited statutes) for every rule and passage that cites at least one statute"""
+    sections = []
+    for rule_id, rule_data in florida_hoa_rules.items():
+        cited = extract_citations(rule_data.get('statute', '') + ' ' + rule_data['content'])
+        if cited:
+            sections.append(({'key': rule_id, 'kind': 'rule', 'community': None,
+                              'document': None, 'page': None, 'title': rule_title(rule_id, rule_data)}, cited))
+
+    for community in list_communities():
+        for rule_id, rule_data in load_community_rules(community).items():
+            cited = extract_citations((rule_data.get('section') or '') + ' ' + rule_data['content'])
+            if cited:
+                sections.append(({'key': rule_id, 'kind': 'rule', 'community': community,
+                                  'document': rule_data.get('document'), 'page': None, 'title': rule_title(rule_id, rule_data)}, cited))
+        for passage in load_community_passages(community):
+            cited = extract_citations(passage.text)
+            if cited:
+                sections.append(({'key': f"{community}:{passage.passage_id}", 'kind': 'passage', 'community': community,
+                                  'document': passage.document, 'page': passage.page,
+                                  'title': f"{passage.document}, page {passage.page}"}, cited))
+    return sections
+
+
+def _compressed_rows(rows, row_count):
+    """CSR adjacency: offsets[i]:offsets[i + 1] slices targets for row i"""
+    offsets = array('I', [0])
+    targets = array('I')
+    for row in range(row_count):
+        targets.extend(rows.get(row, ()))
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+class CitationGraph:
+    """Section -> cited statute -> citing sections, as two CSR adjacency arrays"""
+
+    def __init__(self, nodes, statutes, node_offsets, node_statutes, statute_offsets, statute_nodes):
+        self.nodes = nodes
+        self.statutes = statutes
+        self.node_offsets = node_offsets
+        self.node_statutes = node_statutes
+        self.statute_offsets = statute_offsets
+        self.statute_nodes = statute_nodes
+        self.node_ids = {node['key']: node_id for node_id, node in enumerate(nodes)}
+        self.statute_ids = {statute: statute_id for statute_id, statute in enumerate(statutes)}
+
+    @classmethod
+    def build(cls, sections):
+        nodes = [node for node, _ in sections]
+        statutes = sorted({statute for _, cited in sections for statute in cited})
+        statute_ids = {statute: statute_id for statute_id, statute in enumerate(statutes)}
+
+        cites = {node_id: sorted(statute_ids[statute] for statute in cited) for node_id, (_, cited) in enumerate(sections)}
+        cited_by = {}
+        for node_id, statute_list in cites.items():
+            for statute_id in statute_list:
+                cited_by.setdefault(statute_id, []).append(node_id)
+
+        node_offsets, node_statutes = _compressed_rows(cites, len(nodes))
+        statute_offsets, statute_nodes = _compressed_rows(cited_by, len(statutes))
+        return cls(nodes, statutes, node_offsets, node_statutes, statute_offsets, statute_nodes)
+
+    def statutes_cited_by(self, key):
+        """Statutes a rule or passage cites; O(out-degree)"""
+        node_id = self.node_ids.get(key)
+        if node_id is None:
+            return []
+        return [self.statutes[statute_id]
+                for statute_id in self.node_statutes[self.node_offsets[node_id]:self.node_offsets[node_id + 1]]]
+
+    def sections_citing(self, statute, kind=None, community=None, document_contains=None):
+        """Rules and passages citing a statute section, optionally filtered; O(in-degree)"""
+        statute_id = self.statute_ids.get(statute)
+        if statute_id is None:
+            return []
+        matches = []
+        for node_id in self.statute_nodes[self.statute_offsets[statute_id]:self.statute_offsets[statute_id + 1]]:
+            node = self.nodes[node_id]
+            if kind and node['kind'] != kind:
+                continue
+            if community and node['community'] not in (community, None):
+                continue
+            if document_contains and document_contains.lower() not in (node['document'] or '').lower():
+                continue
+            matches.append(node)
+        return matches
+
+    def related(self, key, kind=None, community=None):
+        """Other rules and passages sharing a cited statute with this one, most shared statutes first"""
+        shared = {}
+        for statute in self.statutes_cited_by(key):
+            for node in self.sections_citing(statute, kind, community):
+                if node['key'] != key:
+                    shared[node['key']] = shared.get(node['key'], 0) + 1
+        return [dict(self.nodes[self.node_ids[other]], shared_statutes=count)
+                for other, count in sorted(shared.items(), key=lambda item: (-item[1], item[0]))]
+
+    def to_json(self):
+        return {
+            'version': GRAPH_VERSION,
+            'built_at': time.time(),
+            'nodes': self.nodes,
+            'statutes': self.statutes,
+            'node_offsets': self.node_offsets.tolist(),
+            'node_statutes': self.node_statutes.tolist(),
+            'statute_offsets': self.statute_offsets.tolist(),
+            'statute_nodes': self.statute_nodes.tolist()
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        if data.get('version') != GRAPH_VERSION:
+            raise ValueError(f"Unsupported citation graph version {data.get('version')}")
+        return cls(data['nodes'], data['statutes'],
+                   array('I', data['node_offsets']), array('I', data['node_statutes']),
+                   array('I', data['statute_offsets']), array('I', data['statute_nodes']))
+
+
+def write_citation_graph(path=DEFAULT_GRAPH_PATH):
+    """Extract every citation and store the graph; run offline (deploy build or after documents change)"""
+    graph = CitationGraph.build(citing_sections())
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(graph.to_json(), f)
+    os.replace(temp_path, path)
+    return graph
+
+
+_citation_graph = None
+_citation_graph_lock = threading.Lock()
+
+
+def get_citation_graph(path=DEFAULT_GRAPH_PATH):
+    """Process-level citation graph, read from the stored file (built once if it is missing)"""
+    global _citation_graph
+    if _citation_graph is None:
+        with _citation_graph_lock:
+            if _citation_graph is None:
+                if os.path.exists(path):
+                    with open(path, encoding='utf-8') as f:
+                        _citation_graph = CitationGraph.from_json(json.load(f))
+                else:
+                    _citation_graph = write_citation_graph(path)
+    return _citation_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the statute citation graph, or query it")
+    parser.add_argument('--output', default=DEFAULT_GRAPH_PATH, help="Graph file (default: %(default)s)")
+    parser.add_argument('--statute', help="List rules and passages citing this statute section, e.g. 720.306")
+    parser.add_argument('--document', help="With --statute: only documents whose name contains this, e.g. bylaws")
+    parser.add_argument('--related', metavar='KEY', help="List rules and passages related to a rule id or passage key")
+    args = parser.parse_args()
+
+    if not args.statute and not args.related:
+        started = time.perf_counter()
+        graph = write_citation_graph(args.output)
+        print(f"Wrote {args.output}: {len(graph.nodes)} citing sections, {len(graph.statutes)} statutes, "
+              f"{len(graph.node_statutes)} citations in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return
+
+    graph = get_citation_graph(args.output)
+    if args.statute:
+        for node in graph.sections_citing(args.statute, document_contains=args.document):
+            print(f"{node['kind']:<8} {node['key']:<40} {node['title']}")
+    if args.related:
+        for node in graph.related(args.related):
+            print(f"{node['shared_statutes']:>3} {node['kind']:<8} {node['key']:<40} {node['title']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,585 @@
+import argparse
+import os
+import re
+import sys
+import threading
+import tracemalloc
+from array import array
+from collections import Counter
+
+from hoa_search_engine import (COMMUNITIES_DIR, RuleFeatures, RuleRecord, SearchResult, SlottedRecord, analyze_query,
+                               analyze_rule, extract_words, list_communities, score_features)
+from near_duplicates import (EMBEDDED_PASSAGE_CONTAINMENT, cluster_near_duplicates, document_version,
+                             embedded_documents, match_embedded_copies, shingles)
+from passage_classifier import bitset_ids, classify_passages, learn_vocabularies, query_categories
+from passage_store import DocumentSource, close_documents
+from postings import PostingsIndex, shared_vocabulary
+
+# Page breaks written by the PDF and OCR converters
+PAGE_MARKER = re.compile(r'=== PAGE (\d+) ===')
+DOCUMENT_LINE = re.compile(r'📄 DOCUMENT:\s*(.+)')
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+WORD = re.compile(r'\S+')
+
+# Passage size in words: short paragraphs are merged up to MIN, long ones (and
+# OCR pages that arrive as one line) are cut into windows of at most MAX
+PASSAGE_MIN_WORDS = 40
+PASSAGE_MAX_WORDS = 120
+
+# Document types recognised from file names, first match wins; anything else is 'other'
+DOCUMENT_TYPES = (
+    ('statute', ('statute',)),
+    ('bylaws', ('bylaws', 'by-laws')),
+    ('declaration', ('declaration', 'covenant')),
+    ('survey', ('survey',))
+)
+
+# Score multiplier for passages of a document a newer version supersedes
+SUPERSEDED_WEIGHT = 0.8
+# Score multiplier for passages classified into a category the query asks about
+CATEGORY_BOOST = 1.15
+
+
+class Passage(SlottedRecord):
+    """One indexed stretch of a community's governing documents, text held in memory (see StoredPassage)"""
+    __slots__ = ('passage_id', 'community', 'document', 'page', 'text')
+
+    def __init__(self, passage_id, community, document, page, text):
+        self.passage_id = passage_id
+        # Interned: thousands of passages share one string per community and document
+        self.community = sys.intern(community)
+        self.document = sys.intern(document)
+        self.page = page
+        self.text = text
+
+
+class StoredPassage(SlottedRecord):
+    """A passage that keeps only where it sits in its document's file; the text is read on demand.
+
+    start and length are byte offsets into the file, and the page comes from
+    the document's page-offset table, so nothing per passage but a few ints
+    stays resident.
+    """
+    __slots__ = ('passage_id', 'community', 'document', 'source', 'start', 'length')
+
+    def __init__(self, passage_id, community, document, source, start, length):
+        self.passage_id = passage_id
+        self.community = sys.intern(community)
+        self.document = sys.intern(document)
+        self.source = source
+        self.start = start
+        self.length = length
+
+    @property
+    def page(self):
+        return self.source.page_at(self.start)
+
+    @property
+    def text(self):
+        return self.source.read(self.start, self.length)
+
+
+def list_documents(community):
+    """Text files converted from a community's PDFs"""
+    community_dir = os.path.join(COMMUNITIES_DIR, community)
+    if not os.path.isdir(community_dir):
+        return []
+    return sorted(name for name in os.listdir(community_dir) if name.endswith('.txt'))
+
+
+def page_spans(text):
+    """(page number, start, end) of each page's text; text without page markers is page 1.
+
+    Text before the first marker (the converter banner) belongs to no page.
+    """
+    markers = list(PAGE_MARKER.finditer(text))
+    if not markers:
+        return [(1, 0, len(text))]
+    ends = [marker.start() for marker in markers[1:]] + [len(text)]
+    return [(int(marker.group(1)), marker.end(), end) for marker, end in zip(markers, ends)]
+
+
+def split_pages(text):
+    """(page number, page text) pairs; text without page markers is page 1"""
+    return [(page, text[start:end]) for page, start, end in page_spans(text)]
+
+
+def passage_spans(text, start=0, end=None, min_words=PASSAGE_MIN_WORDS, max_words=PASSAGE_MAX_WORDS):
+    """(start, end) of paragraph-sized word windows of text[start:end], from a window's first word to its last"""
+    end = len(text) if end is None else end
+    paragraphs = []
+    position = start
+    for match in PARAGRAPH_BREAK.finditer(text, start, end):
+        paragraphs.append((position, match.start()))
+        position = match.end()
+    paragraphs.append((position, end))
+
+    spans = []
+    pending = []
+    for paragraph_start, paragraph_end in paragraphs:
+        pending.extend(match.span() for match in WORD.finditer(text, paragraph_start, paragraph_end))
+        while len(pending) >= max_words:
+            spans.append((pending[0][0], pending[max_words - 1][1]))
+            pending = pending[max_words:]
+        if len(pending) >= min_words:
+            spans.append((pending[0][0], pending[-1][1]))
+            pending = []
+    if pending:
+        spans.append((pending[0][0], pending[-1][1]))
+    return spans
+
+
+def split_passages(page_text, min_words=PASSAGE_MIN_WORDS, max_words=PASSAGE_MAX_WORDS):
+    """Paragraph-sized word windows of one page"""
+    return [' '.join(page_text[start:end].split())
+            for start, end in passage_spans(page_text, 0, None, min_words, max_words)]
+
+
+def document_type(document):
+    """Kind of governing document, from its name: statute, bylaws, declaration, survey or other"""
+    name = (document or '').lower()
+    for kind, keywords in DOCUMENT_TYPES:
+        if any(keyword in name for keyword in keywords):
+            return kind
+    return 'other'
+
+
+def version_chain(document):
+    """Key of the documents that are versions of each other: the document type, or the document itself for 'other'"""
+    kind = document_type(document)
+    return document if kind == 'other' else kind
+
+
+def version_chains(documents):
+    """Document type -> its dated versions, oldest first, for types with more than one dated version"""
+    chains = {}
+    for document in documents:
+        kind = document_type(document)
+        if kind != 'other' and document_version(document):
+            chains.setdefault(kind, []).append(document)
+    return {kind: sorted(versions, key=document_version) for kind, versions in chains.items() if len(versions) > 1}
+
+
+def superseded_documents(documents):
+    """Documents with a newer dated version of the same type among `documents`"""
+    return {document for versions in version_chains(documents).values() for document in versions[:-1]}
+
+
+def document_title(text, filename):
+    match = DOCUMENT_LINE.search(text)
+    return match.group(1).strip() if match else os.path.splitext(filename)[0]
+
+
+def read_document(community, filename):
+    """Document title and pages of one converted text file"""
+    with open(os.path.join(COMMUNITIES_DIR, community, filename), encoding='utf-8') as f:
+        text = f.read()
+    return document_title(text, filename), split_pages(text)
+
+
+def ingest_document(community, filename):
+    """Document title, its page-offset table, and the (byte start, byte length) of each of its passages.
+
+    Offsets are into the file as stored, so a passage is read back with one
+    seek (see passage_store.py) instead of keeping the text in memory.
+    """
+    path = os.path.join(COMMUNITIES_DIR, community, filename)
+    with open(path, 'rb') as f:
+        text = f.read().decode('utf-8')
+
+    # Offsets only ever move forward, so characters are converted to bytes incrementally
+    char_position = 0
+    byte_position = 0
+
+    def byte_offset(char_offset):
+        nonlocal char_position, byte_position
+        byte_position += len(text[char_position:char_offset].encode('utf-8'))
+        char_position = char_offset
+        return byte_position
+
+    page_numbers = []
+    page_offsets = []
+    spans = []
+    for page, start, end in page_spans(text):
+        page_numbers.append(page)
+        page_offsets.append(byte_offset(start))
+        for span_start, span_end in passage_spans(text, start, end):
+            byte_start = byte_offset(span_start)
+            spans.append((byte_start, byte_offset(span_end) - byte_start))
+    return document_title(text, filename), DocumentSource(path, page_numbers, page_offsets), spans
+
+
+def load_community_passages(community):
+    """Every passage of a community's documents, in document and page order"""
+    passages = []
+    for filename in list_documents(community):
+        document, source, spans = ingest_document(community, filename)
+        for start, length in spans:
+            passages.append(StoredPassage(len(passages), community, document, source, start, length))
+    return passages
+
+
+FLAG_FLORIDA = 1
+FLAG_BOCA = 2
+FLAG_HOA = 4
+FLAG_SUPERSEDED = 8
+
+
+class PassageIndex:
+    """Passages plus their scorer features, stored column-wise.
+
+    Per-passage scalars live in typed arrays and term counts live only in the
+    varint postings, so no passage keeps a Counter of its words. A query
+    decodes the postings of its own terms, which yields both the candidate
+    passages and the only term counts score_features looks up.
+
+    With dedupe, near-duplicate passages from different versions of one
+    document type (the 2016 and 2017 statutes, the 1993 and 2019 bylaws) are
+    clustered and only the newest version of each cluster is indexed; the
+    others are kept as its versions. Passages of a document copied whole into
+    a file of another type (the declaration inside the 2019 bylaws) are kept
+    as versions of the original's passages.
+
+    Every indexed passage is classified once here; category_bitsets maps each
+    category to an int with bit i set when passage i belongs to it.
+    """
+
+    def __init__(self, passages, vocabulary=shared_vocabulary, dedupe=True):
+        self.passages = passages
+        self.versions = {}
+        representatives = set(range(len(passages)))
+        if dedupe:
+            representatives = self._cluster_versions(passages)
+        self.lengths = array('I')
+        self.distincts = array('I')
+        self.magnitudes = array('d')
+        self.category_masks = array('Q')
+        self.intent_masks = array('Q')
+        self.flags = array('B')
+        self.postings = PostingsIndex(vocabulary)
+        superseded = superseded_documents({passage.document for passage in passages})
+        passage_counts = []
+
+        for passage in passages:
+            if passage.passage_id not in representatives:
+                # Placeholder row keeps the columns indexed by passage id; never a candidate
+                for column in (self.lengths, self.distincts, self.magnitudes, self.category_masks, self.intent_masks, self.flags):
+                    column.append(0)
+                passage_counts.append(None)
+                continue
+            features = analyze_rule(passage.text, '')
+            self.lengths.append(features.length)
+            self.distincts.append(features.distinct)
+            self.magnitudes.append(features.magnitude)
+            self.category_masks.append(features.category_mask)
+            self.intent_masks.append(features.intent_mask)
+            self.flags.append((FLAG_FLORIDA if features.mentions_florida else 0) |
+                              (FLAG_BOCA if features.mentions_boca else 0) |
+                              (FLAG_HOA if features.mentions_hoa else 0) |
+                              (FLAG_SUPERSEDED if passage.document in superseded else 0))
+            self.postings.add(passage.passage_id, features.freq)
+            passage_counts.append(features.freq)
+        self.postings.freeze()
+        self.category_vocabularies = learn_vocabularies([counts.keys() if counts is not None else None
+                                                         for counts in passage_counts])
+        self.category_bitsets = classify_passages(passage_counts, self.category_vocabularies)
+
+    def _cluster_versions(self, passages):
+        """Fill self.versions (representative id -> other member ids) and return the representative ids"""
+        # Versions of one document type are compared with each other only, so an
+        # undated declaration is never ranked as older than the bylaws copying it
+        chains = {}
+        for passage in passages:
+            chains.setdefault(version_chain(passage.document), []).append(passage.passage_id)
+        clusters = {}
+        for chain in chains.values():
+            cluster_ids = cluster_near_duplicates([passages[passage_id].text for passage_id in chain],
+                                                  [passages[passage_id].document for passage_id in chain])
+            for position, cluster_id in enumerate(cluster_ids):
+                clusters.setdefault(chain[cluster_id], []).append(chain[position])
+        for members in clusters.values():
+            # Newest document version first; documents without a year sort as oldest
+            members.sort(key=lambda passage_id: (-document_version(passages[passage_id].document), passage_id))
+        clusters = {members[0]: members for members in clusters.values()}
+
+        self._fold_embedded_copies(passages, clusters)
+        for representative, members in clusters.items():
+            if len(members) > 1:
+                self.versions[representative] = members[1:]
+        return set(clusters)
+
+    def _fold_embedded_copies(self, passages, clusters):
+        """Fold the passages of a document copied into a file of another type into the original's clusters"""
+        passage_shingles = {}
+        document_passages = {}
+        for passage_id in clusters:
+            document_passages.setdefault(passages[passage_id].document, []).append(passage_id)
+            passage_shingles[passage_id] = shingles(passages[passage_id].text)
+        document_shingles = {document: set().union(*(passage_shingles[passage_id] for passage_id in passage_ids))
+                             for document, passage_ids in document_passages.items()}
+        groups = {document: version_chain(document) for document in document_passages}
+        for original, copy in embedded_documents(document_shingles, groups):
+            originals = document_passages[original]
+            copies = document_passages[copy]
+            matches = match_embedded_copies([passage_shingles[passage_id] for passage_id in originals],
+                                            [passage_shingles[passage_id] for passage_id in copies])
+            for copy_id, position in zip(copies, matches):
+                # The original keeps its place as representative; the copy and its versions follow it
+                if position >= 0 and copy_id in clusters and originals[position] in clusters:
+                    clusters[originals[position]].extend(clusters.pop(copy_id))
+
+    def __len__(self):
+        return len(self.passages)
+
+    def versions_of(self, passage_id):
+        """(document, page) of the near-duplicate copies collapsed into a passage"""
+        return tuple((self.passages[other].document, self.passages[other].page)
+                     for other in self.versions.get(passage_id, ()))
+
+    def features(self, passage_id, term_counts):
+        """Scorer features of one passage, with the counts of just the query's terms"""
+        features = RuleFeatures()
+        features.text = self.passages[passage_id].text.lower()
+        features.length = self.lengths[passage_id]
+        features.distinct = self.distincts[passage_id]
+        features.freq = term_counts
+        features.magnitude = self.magnitudes[passage_id]
+        features.category_mask = self.category_masks[passage_id]
+        features.intent_mask = self.intent_masks[passage_id]
+        flags = self.flags[passage_id]
+        features.mentions_florida = bool(flags & FLAG_FLORIDA)
+        features.mentions_boca = bool(flags & FLAG_BOCA)
+        features.mentions_hoa = bool(flags & FLAG_HOA)
+        return features
+
+    def category_ids(self, category):
+        """Ids of the passages classified into a category"""
+        return bitset_ids(self.category_bitsets.get(category, 0))
+
+    def candidates(self, query_words, allowed=None):
+        """passage id -> {word: count} for every passage containing at least one query word.
+
+        With an allowed bitset, passages whose bit is clear are skipped.
+        """
+        vocabulary = self.postings.vocabulary
+        candidates = {}
+        for word in query_words:
+            term_id = vocabulary.lookup(word)
+            if term_id < 0:
+                continue
+            for passage_id, count in self.postings.iter_postings(term_id):
+                if allowed is not None and not allowed >> passage_id & 1:
+                    continue
+                term_counts = candidates.get(passage_id)
+                if term_counts is None:
+                    term_counts = candidates[passage_id] = {}
+                term_counts[word] = count
+        return candidates
+
+    def size_bytes(self):
+        """Bytes in the feature columns and postings buffers (passage text not included)"""
+        columns = (self.lengths, self.distincts, self.magnitudes, self.category_masks, self.intent_masks, self.flags)
+        return sum(column.itemsize * len(column) for column in columns) + self.postings.size_bytes()
+
+
+def build_passage_index(passages, dedupe=True):
+    return PassageIndex(passages, dedupe=dedupe)
+
+
+# Process-level passage indexes keyed by community
+_passage_indexes = {}
+_passage_index_lock = threading.Lock()
+
+
+def get_passage_index(community):
+    """Shared passage index for a community; built on first use and reused by every session"""
+    index = _passage_indexes.get(community)
+    if index is not None:
+        return index
+
+    if community not in list_communities():
+        raise KeyError(f"Unknown community: {community}")
+
+    with _passage_index_lock:
+        if community not in _passage_indexes:
+            _passage_indexes[community] = build_passage_index(load_community_passages(community))
+        return _passage_indexes[community]
+
+
+def passage_result(passage, score, versions=()):
+    """A passage shaped as a ranked result so result cards and the API can show it; only here is its text read for display"""
+    rule_data = RuleRecord.from_dict({
+        'title': f"{passage.document}, page {passage.page}",
+        'content': passage.text,
+        'statute': passage.document,
+        'links': (),
+        'community': passage.community,
+        'document': passage.document
+    })
+    return SearchResult(f"{passage.community}:{passage.passage_id}", rule_data, score, rule_data.title, False, 'passage',
+                        versions=versions)
+
+
+def search_passages(query, community, k=10, category=None, allowed=None):
+    """Top-k passages of a community's documents for a query, best first.
+
+    Only passages sharing a word with the query are scored; a passage with no
+    shared word could at most pick up a small category or context bonus.
+    Near-duplicates in older document versions are never scored and come back
+    as the result's versions instead of as results of their own; other passages
+    of a superseded version are ranked below the current one. With a category
+    or an allowed bitset (see facets.py), only passages in both are candidates;
+    passages in a category the query's words point to are boosted.
+    """
+    query_features = analyze_query(query)
+    index = get_passage_index(community)
+    if category is not None:
+        if category not in index.category_bitsets:
+            raise KeyError(f"Unknown category: {category}")
+        allowed = index.category_bitsets[category] if allowed is None else allowed & index.category_bitsets[category]
+    scored = score_passages(index, query_features, allowed)
+    return [passage_result(index.passages[passage_id], score, index.versions_of(passage_id))
+            for score, passage_id, _ in scored[:k]]
+
+
+def score_passages(index, query_features, allowed=None):
+    """(score, passage id, query term counts) for every candidate passage of an index with a positive score, best first"""
+    if allowed == 0:
+        return []
+    boosted = 0
+    for query_category in query_categories(query_features['set'], index.category_vocabularies):
+        boosted |= index.category_bitsets[query_category]
+
+    scored = []
+    for passage_id, term_counts in index.candidates(query_features['set'], allowed).items():
+        score = score_features(query_features, index.features(passage_id, term_counts))
+        if index.flags[passage_id] & FLAG_SUPERSEDED:
+            score *= SUPERSEDED_WEIGHT
+        if boosted >> passage_id & 1:
+            score *= CATEGORY_BOOST
+        if score > 0:
+            scored.append((score, passage_id, term_counts))
+    scored.sort(key=lambda entry: (-entry[0], entry[1]))
+    return scored
+
+
+def counter_layout(passages):
+    """Slotted passages with a full feature record (and term Counter) each"""
+    return [(passage, analyze_rule(passage.text, '')) for passage in passages]
+
+
+def dict_layout(passages):
+    """The same passages held the way rules used to be: nested dicts with per-passage token strings"""
+    index = []
+    for passage in passages:
+        content = passage.text.lower()
+        # Tokens from a fresh tokenizer pass, so nothing is interned
+        freq = Counter(extract_words(content))
+        features = analyze_rule(passage.text, '').to_dict()
+        features['freq'] = freq
+        record = {'passage_id': passage.passage_id, 'community': passage.community, 'document': passage.document,
+                  'page': passage.page, 'text': passage.text}
+        index.append((record, features))
+    return index
+
+
+def traced_bytes(build, cleanup=None):
+    """Bytes still allocated after build() (and then cleanup()) returns, and build's result"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        if cleanup is not None:
+            cleanup()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before, result
+
+
+# Index layouts compared by the memory report, newest first
+MEMORY_LAYOUTS = {
+    'postings': build_passage_index,
+    'counters': counter_layout,
+    'dicts': dict_layout
+}
+
+
+def passage_memory_report(community):
+    """Traced memory per indexed passage for each index layout, with the passage text cache emptied.
+
+    The counter and dict layouts hold the text; postings read it from the
+    files, through a cache whose fill for this corpus is text_cache_bytes.
+    """
+    passages = load_community_passages(community)
+    count = len(passages) or 1
+    report = {
+        'community': community,
+        'documents': len(list_documents(community)),
+        'passages': len(passages)
+    }
+    for layout, build in MEMORY_LAYOUTS.items():
+        # Every layout starts and ends with no texts cached; the cache is
+        # bounded (TEXT_CACHE_SIZE texts) and reported on its own below
+        close_documents()
+        layout_bytes, _ = traced_bytes(lambda: build(load_community_passages(community)), cleanup=close_documents)
+        report[f'{layout}_bytes_per_passage'] = layout_bytes / count
+    close_documents()
+    report['text_cache_bytes'], _ = traced_bytes(lambda: [passage.text for passage in passages])
+    index = build_passage_index(passages)
+    report['postings_buffer_bytes'] = index.postings.size_bytes()
+    report['postings_bytes_without_dedupe'] = build_passage_index(passages, dedupe=False).postings.size_bytes()
+    report['collapsed_passages'] = sum(len(others) for others in index.versions.values())
+    report['vocabulary'] = len(index.postings.vocabulary)
+    return report
+
+
+# Queries whose best passages are in Boca Ridge Glen's declaration, which the
+# 2019 bylaws file repeats page for page
+DUPLICATE_CHECK_QUERIES = ("trucks boats trailers parking", "pets animals leash", "architectural control committee approval",
+                           "easements common area", "insurance casualty damage", "signs displayed")
+
+
+def duplicate_results(community, queries=DUPLICATE_CHECK_QUERIES, k=10):
+    """(query, first title, second title) for top passages of different document types that repeat one text"""
+    duplicates = []
+    for query in queries:
+        results = search_passages(query, community, k)
+        result_shingles = [shingles(result.rule_data.content) for result in results]
+        for i, first in enumerate(results):
+            for j in range(i + 1, len(results)):
+                second = results[j]
+                if version_chain(first.rule_data.document) == version_chain(second.rule_data.document):
+                    continue
+                shared = len(result_shingles[i] & result_shingles[j])
+                if shared >= EMBEDDED_PASSAGE_CONTAINMENT * min(len(result_shingles[i]), len(result_shingles[j])):
+                    duplicates.append((query, first.title, second.title))
+    return duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Passage corpus of each community's documents and its memory footprint")
+    parser.add_argument('--community', action='append', help="Community to report (repeatable; default: all)")
+    args = parser.parse_args()
+
+    print(f"{'community':<22} {'docs':>5} {'passages':>9} " +
+          " ".join(f"{layout + ' B/psg':>15}" for layout in MEMORY_LAYOUTS) + f" {'text cache B':>13} {'postings B':>11} {'no dedupe B':>12} {'collapsed':>9}")
+    for community in args.community or list_communities():
+        report = passage_memory_report(community)
+        print(f"{community:<22} {report['documents']:>5} {report['passages']:>9} " +
+              " ".join(f"{report[layout + '_bytes_per_passage']:>15.0f}" for layout in MEMORY_LAYOUTS) +
+              f" {report['text_cache_bytes']:>13} {report['postings_buffer_bytes']:>11} {report['postings_bytes_without_dedupe']:>12} {report['collapsed_passages']:>9}")
+
+    # A document copied into a file of another type must not show up twice in one result list
+    duplicates = []
+    for community in args.community or list_communities():
+        duplicates += duplicate_results(community)
+    for query, first, second in duplicates:
+        print(f"{query!r}: {first} repeats {second}", file=sys.stderr)
+    print(f"\nembedded copy check: {len(duplicates)} repeated results")
+    if duplicates:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
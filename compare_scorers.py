@@ -0,0 +1,162 @@
+import argparse
+import ast
+import importlib
+import json
+import os
+import time
+
+from benchmark_search import SEARCH_TIP_QUERIES, TOPIC_BUTTON_QUERIES, percentile
+from evaluate_golden import load_golden_queries, reciprocal_rank, result_key
+from hoa_search_engine import florida_hoa_rules, search_florida_hoa_rules
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Scorers embedded in the Streamlit scripts: (script, search function, rule table it reads)
+SCRIPT_SCORERS = {
+    'streamlit_app': ('streamlit_app.py', 'search_florida_hoa_rules', 'florida_hoa_rules'),
+    'florida_hoa_app': ('florida_hoa_app.py', 'search_florida_hoa_rules', 'florida_hoa_rules'),
+    'florida_hoa_with_links': ('florida_hoa_with_links.py', 'search_florida_hoa_rules', 'florida_hoa_rules'),
+    'florida_hoa_with_boca_ridge': ('florida_hoa_with_boca_ridge.py', 'search_florida_hoa_rules', 'florida_hoa_rules'),
+    'comprehensive_hoa_app': ('comprehensive_hoa_app.py', 'search_hoa_rules', 'hoa_rules'),
+    'enhanced_hoa_app': ('enhanced_hoa_app.py', 'search_hoa_rules', 'hoa_rules'),
+    'open_ended_hoa_app': ('open_ended_hoa_app.py', 'search_hoa_rules', 'hoa_rules')
+}
+
+# Every other scorer is compared against the production engine
+REFERENCE_SCORER = 'app'
+
+# Depth for the top-k overlap column
+AGREEMENT_DEPTH = 3
+
+
+def load_script_scorer(script, function_name, rules_name, rules=florida_hoa_rules):
+    """Pull a search function out of a Streamlit script without running its UI.
+
+    Only the script's imports (minus Streamlit), function definitions and its
+    rule table literal are executed; the table is then swapped for `rules`,
+    reshaped to what the script expects, so every scorer sees the same rules.
+    """
+    with open(os.path.join(REPO_DIR, script), encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=script)
+
+    kept = []
+    rules_are_text = False
+    for node in tree.body:
+        if isinstance(node, ast.Import) and all(alias.name != 'streamlit' for alias in node.names):
+            kept.append(node)
+        elif isinstance(node, ast.ImportFrom) and node.module in ('re', 'math', 'json', 'collections'):
+            kept.append(node)
+        elif isinstance(node, ast.FunctionDef):
+            kept.append(node)
+        elif isinstance(node, ast.Assign) and any(getattr(target, 'id', None) == rules_name for target in node.targets):
+            first_value = node.value.values[0] if isinstance(node.value, ast.Dict) and node.value.values else None
+            rules_are_text = isinstance(first_value, ast.Constant) and isinstance(first_value.value, str)
+
+    namespace = {'__name__': f"scorer_plugin_{function_name}"}
+    exec(compile(ast.Module(body=kept, type_ignores=[]), script, 'exec'), namespace)
+
+    if rules_are_text:
+        namespace[rules_name] = {
+            rule_id: rule_data['content'] + ' ' + rule_data.get('boca_ridge_example', '')
+            for rule_id, rule_data in rules.items()
+        }
+    else:
+        namespace[rules_name] = rules
+    return namespace[function_name]
+
+
+def load_module_scorer(spec):
+    """External plugin given as module:function; the function takes a query and returns ranked results or rule ids"""
+    module_name, function_name = spec.split(':', 1)
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def load_scorers(plugin_specs=()):
+    scorers = {REFERENCE_SCORER: search_florida_hoa_rules}
+    for name, (script, function_name, rules_name) in SCRIPT_SCORERS.items():
+        scorers[name] = load_script_scorer(script, function_name, rules_name)
+    for spec in plugin_specs:
+        name, _, target = spec.partition('=')
+        scorers[name] = load_module_scorer(target)
+    return scorers
+
+
+def comparison_queries(golden):
+    """Topic buttons, search tips and statewide golden questions, without duplicates"""
+    return list(dict.fromkeys(TOPIC_BUTTON_QUERIES + SEARCH_TIP_QUERIES + [record['query'] for record in golden]))
+
+
+def run_scorer(search, queries, repeat):
+    """Rankings plus wall and CPU time per query for one scorer"""
+    rankings = {}
+    latencies = []
+    cpu_started = time.process_time()
+    for query in queries:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = search(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+        rankings[query] = [result if isinstance(result, str) else result_key(result) for result in results]
+    cpu_ms = (time.process_time() - cpu_started) * 1000
+    latencies.sort()
+    return rankings, {
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'cpu_ms_per_query': cpu_ms / len(latencies) if latencies else 0.0
+    }
+
+
+def agreement(rankings, reference, depth=AGREEMENT_DEPTH):
+    """Top-1 agreement and mean top-k Jaccard overlap against the reference rankings"""
+    top1 = 0
+    overlap = 0.0
+    for query, reference_ranking in reference.items():
+        ranking = rankings[query]
+        if ranking[:1] == reference_ranking[:1]:
+            top1 += 1
+        ours, theirs = set(ranking[:depth]), set(reference_ranking[:depth])
+        overlap += len(ours & theirs) / len(ours | theirs) if ours | theirs else 1.0
+    return top1 / len(reference), overlap / len(reference)
+
+
+def compare(scorers, queries, golden, repeat):
+    runs = {name: run_scorer(search, queries, repeat) for name, search in scorers.items()}
+    reference_rankings = runs[REFERENCE_SCORER][0]
+
+    report = {}
+    for name, (rankings, timing) in runs.items():
+        top1, overlap = agreement(rankings, reference_rankings)
+        reciprocal_ranks = [reciprocal_rank(rankings[record['query']], record['expected'][0]) for record in golden]
+        report[name] = dict(timing, top1_agreement=top1, overlap_at_k=overlap,
+                            golden_mrr=sum(reciprocal_ranks) / len(reciprocal_ranks) if reciprocal_ranks else 0.0)
+    return report
+
+
+def print_table(report):
+    print(f"{'scorer':<28} {'p50 ms':>8} {'p95 ms':>8} {'CPU ms/q':>9} {'top1 agr':>9} "
+          f"{'overlap@' + str(AGREEMENT_DEPTH):>10} {'golden MRR':>11}")
+    for name, stats in report.items():
+        print(f"{name:<28} {stats['p50_ms']:>8.3f} {stats['p95_ms']:>8.3f} {stats['cpu_ms_per_query']:>9.3f} "
+              f"{stats['top1_agreement']:>9.3f} {stats['overlap_at_k']:>10.3f} {stats['golden_mrr']:>11.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare every scorer in the repo on the same queries and rule set")
+    parser.add_argument('--repeat', type=int, default=10, help="Timed runs per query (default: %(default)s)")
+    parser.add_argument('--plugin', action='append', default=[], metavar='NAME=MODULE:FUNCTION',
+                        help="Extra scorer to compare; the function takes a query and returns ranked results or rule ids")
+    parser.add_argument('--output', help="Write the comparison as JSON")
+    args = parser.parse_args()
+
+    # Legacy scorers are statewide only, so community golden questions are left out
+    golden = [record for record in load_golden_queries() if not record.get('community')]
+    report = compare(load_scorers(args.plugin), comparison_queries(golden), golden, args.repeat)
+    print_table(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
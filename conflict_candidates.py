@@ -0,0 +1,288 @@
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from citation_graph import extract_citations
+from community_corpus import load_community_passages
+from document_sections import passage_statute_sections
+from hoa_search_engine import (analyze_rule, category_bits, florida_hoa_rules, list_communities, load_community_rules,
+                               rule_title)
+
+DEFAULT_CONFLICTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'conflict_candidates.json')
+CONFLICTS_VERSION = 1
+
+# Categories specific enough to block on; 'legal', 'rules', 'property' and
+# 'frequency' match nearly every statute passage and would block nothing
+BLOCKING_CATEGORIES = ('governance', 'financial', 'maintenance', 'pets', 'architectural', 'landscaping', 'vehicle', 'water')
+BLOCKING_MASK = sum(category_bits[category] for category in BLOCKING_CATEGORIES)
+
+# Highest-tf-idf words of each section, used as its topic blocking keys
+TOPIC_TERMS = 8
+
+# Statute language protecting owners from association documents
+PROTECTIVE = re.compile(r'\b(?:may not|shall not|cannot)\s+(?:be\s+)?(?:prohibit|restrict|enforce|require|impose)\w*'
+                        r'|\bprohibits? the inclusion or enforcement\b|\b(?:void|unenforceable)\b', re.IGNORECASE)
+# Community language restricting owners
+RESTRICTIVE = re.compile(r'\bshall not\b|\bprohibited\b|\bnot (?:be )?permitted\b|\bno\s+\w+(?:\s+\w+)?\s+shall\b'
+                         r'|\bmust\b|\bshall be (?:required|approved|maintained)\b|\bwithout (?:the )?(?:prior )?'
+                         r'(?:written )?(?:approval|consent)\b', re.IGNORECASE)
+
+# Score multipliers for pairs missing one side of the opposition: statute
+# text that limits nothing, or community text that restricts nothing
+UNPROTECTED_WEIGHT = 0.25
+UNRESTRICTED_WEIGHT = 0.5
+
+# Minimum stored score; pairs below it are topically unrelated or lack opposing language
+MIN_CONFLICT_SCORE = 0.05
+# Candidates stored per community
+MAX_CANDIDATES = 200
+
+
+def is_statute_document(document):
+    return 'statute' in (document or '').lower()
+
+
+def section_item(key, kind, title, text, community=None, document=None, page=None, statute=None):
+    """Blocking and scoring view of one rule or passage"""
+    features = analyze_rule(text, key)
+    return {
+        'key': key,
+        'kind': kind,
+        'title': title,
+        'community': community,
+        'document': document,
+        'page': page,
+        'statute': statute,
+        'excerpt': ' '.join(text.split())[:300],
+        'freq': dict(features.freq),
+        'magnitude': features.magnitude,
+        'category_mask': features.category_mask & BLOCKING_MASK,
+        'citations': [cited for cited in extract_citations(text) if not cited.startswith('chapter')],
+        'protective': len(PROTECTIVE.findall(text)),
+        'restrictive': len(RESTRICTIVE.findall(text))
+    }
+
+
+def statute_items():
+    """State-law side: built-in statute rules and statute-document passages, each tagged with its statute section"""
+    items = []
+    for rule_id, rule_data in florida_hoa_rules.items():
+        cited = [cited for cited in extract_citations(rule_data.get('statute', '')) if not cited.startswith('chapter')]
+        # Built-in rules citing no section are community examples, not state law
+        if cited:
+            items.append(section_item(rule_id, 'rule', rule_title(rule_id, rule_data), rule_data['content'], statute=cited[0]))
+
+    # Statute text is state law, so copies in any community folder serve every community
+    for community in list_communities():
+        passages = load_community_passages(community)
+        for passage, section in zip(passages, passage_statute_sections(passages)):
+            if not is_statute_document(passage.document):
+                continue
+            items.append(section_item(f"{community}:{passage.passage_id}", 'passage',
+                                      f"{passage.document}, page {passage.page}", passage.text,
+                                      community, passage.document, passage.page, section))
+    return items
+
+
+def community_items(community):
+    """Community side: rules_database.json rules and non-statute document passages"""
+    items = []
+    for rule_id, rule_data in load_community_rules(community).items():
+        items.append(section_item(rule_id, 'rule', rule_title(rule_id, rule_data), rule_data['content'],
+                                  community, rule_data.get('document')))
+    for passage in load_community_passages(community):
+        if not is_statute_document(passage.document):
+            items.append(section_item(f"{community}:{passage.passage_id}", 'passage',
+                                      f"{passage.document}, page {passage.page}", passage.text,
+                                      community, passage.document, passage.page))
+    return items
+
+
+def assign_topics(items, topic_terms=TOPIC_TERMS):
+    """Give every item its highest-tf-idf words, idf taken over all items of both sides"""
+    document_frequency = {}
+    for item in items:
+        for word in item['freq']:
+            document_frequency[word] = document_frequency.get(word, 0) + 1
+    total = len(items)
+    for item in items:
+        weighted = sorted(((count * math.log(total / document_frequency[word]), word)
+                           for word, count in item['freq'].items() if document_frequency[word] > 1),
+                          reverse=True)
+        item['topics'] = [word for _, word in weighted[:topic_terms]]
+
+
+def blocked_pairs(community_side, statute_side):
+    """(community item, statute item) index pairs sharing a cited statute, or a topic word and a category.
+
+    Pairs come only from inverted lists keyed by citation and topic word, so
+    the all-pairs product is never enumerated.
+    """
+    by_citation = {}
+    by_topic = {}
+    for position, item in enumerate(statute_side):
+        if item['statute']:
+            by_citation.setdefault(item['statute'], []).append(position)
+        for word in item['topics']:
+            by_topic.setdefault(word, []).append(position)
+
+    pairs = {}
+    for community_position, item in enumerate(community_side):
+        for cited in item['citations']:
+            for statute_position in by_citation.get(cited, ()):
+                pairs.setdefault((community_position, statute_position), set()).add(f"citation:{cited}")
+        for word in item['topics']:
+            for statute_position in by_topic.get(word, ()):
+                if item['category_mask'] & statute_side[statute_position]['category_mask']:
+                    pairs.setdefault((community_position, statute_position), set()).add(f"topic:{word}")
+    return pairs
+
+
+def cosine(first, second):
+    if len(first['freq']) > len(second['freq']):
+        first, second = second, first
+    dot = sum(count * second['freq'].get(word, 0) for word, count in first['freq'].items())
+    return dot / (first['magnitude'] * second['magnitude']) if dot else 0.0
+
+
+def score_pair(community_item, statute_item):
+    """Conflict likelihood: topical similarity, weighted up when protective statute text meets restrictive community text"""
+    similarity = cosine(community_item, statute_item)
+    opposition = (1.0 if statute_item['protective'] else UNPROTECTED_WEIGHT) * (1.0 if community_item['restrictive'] else UNRESTRICTED_WEIGHT)
+    return similarity * opposition, similarity
+
+
+def _score_community_item(job):
+    """Score one community item against its surviving statute items; runs inside a worker"""
+    community_item, statute_candidates = job
+    scored = []
+    for statute_item, blocks in statute_candidates:
+        score, similarity = score_pair(community_item, statute_item)
+        if score >= MIN_CONFLICT_SCORE:
+            shared = sorted(set(community_item['topics']) & set(statute_item['topics']))
+            scored.append((score, similarity, statute_item['key'], sorted(blocks), shared))
+    return community_item['key'], scored
+
+
+def item_summary(item):
+    return {name: item[name] for name in ('key', 'kind', 'title', 'community', 'document', 'page', 'excerpt')}
+
+
+def find_conflict_candidates(community, statute_side, workers=1, max_candidates=MAX_CANDIDATES):
+    """Ranked conflict candidates between one community's documents and state statute, plus pipeline counts"""
+    community_side = community_items(community)
+    assign_topics(community_side + statute_side)
+    pairs = blocked_pairs(community_side, statute_side)
+
+    candidates_by_item = {}
+    for (community_position, statute_position), blocks in pairs.items():
+        candidates_by_item.setdefault(community_position, []).append((statute_side[statute_position], blocks))
+    jobs = [(community_side[position], candidates) for position, candidates in candidates_by_item.items()]
+
+    if workers <= 1:
+        results = map(_score_community_item, jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_score_community_item, jobs, chunksize=16)
+
+    community_by_key = {item['key']: item for item in community_side}
+    statute_by_key = {item['key']: item for item in statute_side}
+    candidates = []
+    try:
+        for community_key, scored in results:
+            for score, similarity, statute_key, blocks, shared in scored:
+                statute_item = statute_by_key[statute_key]
+                candidates.append({
+                    'score': round(score, 4),
+                    'similarity': round(similarity, 4),
+                    'statute': statute_item['statute'],
+                    'blocks': blocks,
+                    'shared_terms': shared,
+                    'community_section': item_summary(community_by_key[community_key]),
+                    'statute_section': item_summary(statute_item)
+                })
+    finally:
+        if workers > 1:
+            executor.shutdown()
+
+    candidates.sort(key=lambda candidate: (-candidate['score'], candidate['community_section']['key'],
+                                           candidate['statute_section']['key']))
+    stats = {
+        'community_sections': len(community_side),
+        'statute_sections': len(statute_side),
+        'all_pairs': len(community_side) * len(statute_side),
+        'blocked_pairs': len(pairs),
+        'candidates': len(candidates)
+    }
+    return candidates[:max_candidates], stats
+
+
+def write_conflict_candidates(path=DEFAULT_CONFLICTS_PATH, workers=1, communities=None):
+    """Run the whole pipeline offline and store every community's candidates"""
+    statute_side = statute_items()
+    report = {'version': CONFLICTS_VERSION, 'built_at': time.time(), 'communities': {}, 'stats': {}}
+    for community in communities or list_communities():
+        candidates, stats = find_conflict_candidates(community, statute_side, workers)
+        report['communities'][community] = candidates
+        report['stats'][community] = stats
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f)
+    os.replace(temp_path, path)
+    return report
+
+
+_conflict_report = None
+_conflict_report_lock = threading.Lock()
+
+
+def get_conflict_candidates(community, statute=None, limit=None, path=DEFAULT_CONFLICTS_PATH):
+    """Stored candidates for a community, optionally only those against one statute section.
+
+    Reads the file written by the offline pipeline; nothing is scored here.
+    """
+    global _conflict_report
+    if _conflict_report is None:
+        with _conflict_report_lock:
+            if _conflict_report is None:
+                if not os.path.exists(path):
+                    return []
+                with open(path, encoding='utf-8') as f:
+                    report = json.load(f)
+                if report.get('version') != CONFLICTS_VERSION:
+                    raise ValueError(f"Unsupported conflict candidates version {report.get('version')}")
+                _conflict_report = report
+
+    candidates = _conflict_report['communities'].get(community, [])
+    if statute:
+        candidates = [candidate for candidate in candidates if candidate['statute'] == statute]
+    return candidates[:limit] if limit else candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find community rules that may conflict with Florida statute (offline)")
+    parser.add_argument('--output', default=DEFAULT_CONFLICTS_PATH, help="Candidates file (default: %(default)s)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help="Worker processes (default: %(default)s)")
+    parser.add_argument('--community', action='append', help="Community to process (repeatable; default: all)")
+    parser.add_argument('--show', type=int, default=5, help="Candidates to print per community (default: %(default)s)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = write_conflict_candidates(args.output, args.workers, args.community)
+    print(f"Wrote {args.output} in {time.perf_counter() - started:.1f}s")
+    for community, stats in report['stats'].items():
+        print(f"{community}: {stats['community_sections']} x {stats['statute_sections']} sections, "
+              f"{stats['all_pairs']} pairs -> {stats['blocked_pairs']} blocked -> {stats['candidates']} candidates")
+        for candidate in report['communities'][community][:args.show]:
+            print(f"  {candidate['score']:.3f} {candidate['statute'] or '-':<10} "
+                  f"{candidate['community_section']['title']} <> {candidate['statute_section']['title']}")
+
+
+if __name__ == '__main__':
+    main()
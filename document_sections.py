@@ -0,0 +1,145 @@
+import re
+
+from community_corpus import document_type, read_document
+from hoa_search_engine import SlottedRecord
+
+# Headings that open a section: "ARTICLE IV", "Section 3." and statute
+# sections such as "720.3075 Prohibited clauses in association documents.—".
+# OCR turns roman numerals into look-alikes ("ARTICLE 1V", "ARTICLE Vii"), so
+# article numbers are kept as printed rather than parsed
+ARTICLE_HEADING = re.compile(r'\bARTICLE\s+([IVXL1][IVXLivxl1]*|\d+)\b')
+SECTION_HEADING = re.compile(r'\b[Ss]ection\s*[·;]?\s+(\d+)\s*\.\s*([^.]{0,80})')
+STATUTE_HEADING = re.compile(r'\b(\d{3}\.\d{2,4})\s+([A-Z][^.—]{3,150})\.\s?—')
+
+# Topic annotations the OCR processor inserts before recognised sections: "📋 [BYLAWS]"
+ANNOTATION = re.compile(r'📋\s*\[([A-Z ]+)\]\s*')
+
+
+class Section(SlottedRecord):
+    """One headed section of a governing document, as printed; tags are the annotations found in it.
+
+    page_offsets holds (offset in text, page) for the page the section starts
+    on and every page it runs onto.
+    """
+    __slots__ = ('document', 'article', 'number', 'heading', 'page', 'text', 'tags', 'page_offsets')
+
+    def __init__(self, document, article, number, heading, page, text, tags=(), page_offsets=()):
+        self.document = document
+        self.article = article
+        self.number = number
+        self.heading = heading
+        self.page = page
+        self.text = text
+        self.tags = tags
+        self.page_offsets = page_offsets
+
+    @property
+    def label(self):
+        """Citation-style label: "ARTICLE IV Section 3", "720.3075" or "Preamble" """
+        if self.article and self.number:
+            return f"ARTICLE {self.article} Section {self.number}"
+        if self.number:
+            return self.number if '.' in self.number else f"Section {self.number}"
+        return f"ARTICLE {self.article}" if self.article else 'Preamble'
+
+    def page_at(self, offset):
+        """Page a character offset of the text is printed on"""
+        page = self.page
+        for start, offset_page in self.page_offsets:
+            if start > offset:
+                break
+            page = offset_page
+        return page
+
+
+def heading_matches(text, statutes=False):
+    """(offset, kind, number, heading) for every heading in a page, in page order"""
+    if statutes:
+        return [(match.start(), 'section', match.group(1), match.group(2).strip())
+                for match in STATUTE_HEADING.finditer(text)]
+    matches = [(match.start(), 'article', match.group(1), '') for match in ARTICLE_HEADING.finditer(text)]
+    matches += [(match.start(), 'section', match.group(1), match.group(2).strip())
+                for match in SECTION_HEADING.finditer(text)]
+    return sorted(matches)
+
+
+def passage_statute_sections(passages):
+    """Statute section open at the start of each passage, for passages of statute documents; None for others"""
+    sections = []
+    document = None
+    section = None
+    for passage in passages:
+        if passage.document != document:
+            document = passage.document
+            section = None
+        if document_type(document) != 'statute':
+            sections.append(None)
+            continue
+        headings = [match.group(1) for match in STATUTE_HEADING.finditer(passage.text)]
+        # A passage belongs to the section open at its start; a table of contents opens none
+        sections.append(section if not headings or passage.text.find(headings[0]) > 0 else headings[0])
+        if len(headings) < 4:
+            section = headings[-1] if headings else section
+    return sections
+
+
+def split_sections(community, filename):
+    """Document title and its sections in reading order.
+
+    Text before the first heading is a 'Preamble' section; a section runs to
+    the next heading, across page breaks, and keeps the page it starts on.
+    An annotation goes to the section it is found in, or opens, as a tag.
+    """
+    document, pages = read_document(community, filename)
+    statutes = document_type(document) == 'statute'
+    sections = []
+    article = None
+    current = Section(document, None, None, 'Preamble', pages[0][0] if pages else 1, '')
+    parts = []
+    tags = []
+
+    def close():
+        texts = []
+        page_offsets = []
+        length = 0
+        for part_page, part in parts:
+            part = ' '.join(part.split())
+            if not part:
+                continue
+            if not page_offsets or page_offsets[-1][1] != part_page:
+                page_offsets.append((length + 1 if texts else 0, part_page))
+            texts.append(part)
+            length += len(part) + (1 if len(texts) > 1 else 0)
+        current.text = ' '.join(texts)
+        current.page_offsets = tuple(page_offsets)
+        current.tags = tuple(dict.fromkeys(tags))
+        if current.text:
+            sections.append(current)
+
+    for page, page_text in pages:
+        # Offsets of the annotations in the stripped text; one right before a heading lands on its offset
+        annotations = []
+
+        def strip(match):
+            annotations.append((match.start() - sum(length for _, _, length in annotations), match.group(1).strip(),
+                                len(match.group(0))))
+            return ''
+
+        page_text = ANNOTATION.sub(strip, page_text)
+        position = 0
+        for offset, kind, number, heading in heading_matches(page_text, statutes):
+            parts.append((page, page_text[position:offset]))
+            tags.extend(tag for at, tag, _ in annotations if position <= at < offset)
+            close()
+            if kind == 'article':
+                article = number
+                current = Section(document, article, None, '', page, '')
+            else:
+                current = Section(document, article, number, heading, page, '')
+            parts = []
+            tags = []
+            position = offset
+        parts.append((page, page_text[position:]))
+        tags.extend(tag for at, tag, _ in annotations if at >= position)
+    close()
+    return document, sections
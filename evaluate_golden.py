@@ -0,0 +1,160 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+from benchmark_search import percentile
+from hoa_search_engine import analyze_query, get_rule_index, score_features, search_florida_hoa_rules
+
+DEFAULT_GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_queries.jsonl')
+
+# Ranks scored by nDCG
+NDCG_DEPTH = 5
+
+
+def load_golden_queries(path=DEFAULT_GOLDEN_PATH):
+    """Golden records: query, optional community, expected rule ids (expected top rule first)"""
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            record = json.loads(line)
+            if not record.get('query') or not record.get('expected'):
+                raise ValueError(f"{path}:{line_number}: golden records need 'query' and 'expected'")
+            records.append(record)
+    return records
+
+
+def result_key(result):
+    """Golden id of a ranked result; every dynamic fallback counts as 'dynamic'"""
+    return 'dynamic' if result.get('type') == 'dynamic' else result['rule_id']
+
+
+def rank_with_search(query, community=None):
+    """What residents see: thresholds, dynamic fallback and top-N cuts included"""
+    return [result_key(result) for result in search_florida_hoa_rules(query, community)]
+
+
+def rank_with_similarity(query, community=None):
+    """The scorer alone: every indexed rule ordered by similarity, no cut-offs"""
+    query_features = analyze_query(query)
+    scored = [(score_features(query_features, features), rule_id) for rule_id, _, features in get_rule_index(community)]
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return [rule_id for score, rule_id in scored if score > 0]
+
+
+# Scorer variants evaluated by default; each maps (query, community) to ranked golden ids
+SCORER_VARIANTS = {
+    'search': rank_with_search,
+    'similarity': rank_with_similarity
+}
+
+
+def reciprocal_rank(ranking, expected_top):
+    for rank, key in enumerate(ranking, 1):
+        if key == expected_top:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg(ranking, expected, depth=NDCG_DEPTH):
+    """nDCG with the expected top rule graded 2 and the other expected rules graded 1"""
+    grades = {key: 1 for key in expected[1:]}
+    grades[expected[0]] = 2
+
+    dcg = sum(grades.get(key, 0) / math.log2(rank + 1) for rank, key in enumerate(ranking[:depth], 1))
+    ideal = sorted(grades.values(), reverse=True)[:depth]
+    idcg = sum(grade / math.log2(rank + 1) for rank, grade in enumerate(ideal, 1))
+    return dcg / idcg if idcg else 0.0
+
+
+def evaluate_variant(rank, golden, repeat=5):
+    """Ranking quality and latency of one scorer variant over the golden set"""
+    latencies = []
+    misses = []
+    reciprocal_ranks = []
+    ndcgs = []
+    for record in golden:
+        query = record['query']
+        community = record.get('community')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            ranking = rank(query, community)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        rr = reciprocal_rank(ranking, record['expected'][0])
+        reciprocal_ranks.append(rr)
+        ndcgs.append(ndcg(ranking, record['expected']))
+        if rr < 1.0:
+            misses.append({'query': query, 'expected': record['expected'][0], 'got': ranking[:3]})
+
+    latencies.sort()
+    return {
+        'queries': len(golden),
+        'mrr': sum(reciprocal_ranks) / len(reciprocal_ranks),
+        f'ndcg@{NDCG_DEPTH}': sum(ndcgs) / len(ndcgs),
+        'hit@1': sum(1 for rr in reciprocal_ranks if rr == 1.0) / len(reciprocal_ranks),
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'misses': misses
+    }
+
+
+def check_budgets(report, min_mrr=None, max_p95_ms=None):
+    """Human-readable budget violations for every evaluated variant"""
+    failures = []
+    for variant, stats in report.items():
+        if min_mrr is not None and stats['mrr'] < min_mrr:
+            failures.append(f"{variant}: MRR {stats['mrr']:.3f} below {min_mrr:.3f}")
+        if max_p95_ms is not None and stats['p95_ms'] > max_p95_ms:
+            failures.append(f"{variant}: p95 {stats['p95_ms']:.3f} ms above {max_p95_ms:.3f} ms")
+    return failures
+
+
+def print_report(report, show_misses=False):
+    print(f"{'variant':<14} {'MRR':>6} {'nDCG@' + str(NDCG_DEPTH):>7} {'hit@1':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    for variant, stats in report.items():
+        print(f"{variant:<14} {stats['mrr']:>6.3f} {stats[f'ndcg@{NDCG_DEPTH}']:>7.3f} {stats['hit@1']:>6.3f} "
+              f"{stats['p50_ms']:>8.3f} {stats['p95_ms']:>8.3f}")
+        if show_misses:
+            for miss in stats['misses']:
+                print(f"    miss: {miss['query']!r} expected {miss['expected']} got {miss['got']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score the golden query set for ranking quality and latency together")
+    parser.add_argument('--golden', default=DEFAULT_GOLDEN_PATH, help="Golden JSONL file (default: %(default)s)")
+    parser.add_argument('--variant', action='append', choices=sorted(SCORER_VARIANTS), help="Variant to evaluate (repeatable; default: all)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per query (default: %(default)s)")
+    parser.add_argument('--snapshot', help="Evaluate against a memory-mapped index snapshot")
+    parser.add_argument('--min-mrr', type=float, help="Fail if any variant's MRR drops below this")
+    parser.add_argument('--max-p95-ms', type=float, help="Fail if any variant's p95 latency exceeds this")
+    parser.add_argument('--misses', action='store_true', help="List queries whose expected rule was not ranked first")
+    parser.add_argument('--output', help="Write the report as JSON")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        from index_snapshot import attach_snapshot
+        attach_snapshot(args.snapshot)
+
+    golden = load_golden_queries(args.golden)
+    report = {variant: evaluate_variant(SCORER_VARIANTS[variant], golden, args.repeat)
+              for variant in (args.variant or SCORER_VARIANTS)}
+    print_report(report, args.misses)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    failures = check_budgets(report, args.min_mrr, args.max_p95_ms)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import sys
+import threading
+import time
+
+from citation_graph import extract_citations
+from community_corpus import document_type, get_passage_index, search_passages
+from document_sections import passage_statute_sections
+from hoa_search_engine import list_communities
+from passage_classifier import bitset_from_ids
+
+# Facet fields of a passage index; 'community' picks indexes instead and is not stored
+FACET_FIELDS = ('document', 'document_type', 'statute', 'category')
+
+
+class FacetIndex:
+    """Facet value -> int bitset over one community's passage ids.
+
+    A near-duplicate cluster is indexed under its representative for every
+    member document, so a filter on an older document version still finds the
+    passage that stands for it; the representative is always of the same
+    document type.
+    """
+
+    def __init__(self, passage_index):
+        self.fields = {field: {} for field in FACET_FIELDS}
+        representative = {}
+        for passage_id, others in passage_index.versions.items():
+            for other in others:
+                representative[other] = passage_id
+
+        passages = passage_index.passages
+        members = {field: {} for field in ('document', 'document_type', 'statute')}
+        for passage, section in zip(passages, passage_statute_sections(passages)):
+            target = representative.get(passage.passage_id, passage.passage_id)
+            members['document'].setdefault(passage.document, set()).add(target)
+            kind = document_type(passage.document)
+            # Clusters never span document types (see PassageIndex); a type bit
+            # only ever goes to a passage of that type
+            if kind == document_type(passages[target].document):
+                members['document_type'].setdefault(kind, set()).add(target)
+            statutes = set(extract_citations(passage.text))
+            if section:
+                statutes.add(section)
+            for statute in statutes:
+                members['statute'].setdefault(statute, set()).add(target)
+
+        for field, values in members.items():
+            for value, ids in values.items():
+                self.fields[field][value] = bitset_from_ids(ids)
+        self.fields['category'] = dict(passage_index.category_bitsets)
+
+    def values(self, field):
+        """Facet values with their passage counts, most passages first"""
+        counts = {value: bin(bitset).count('1') for value, bitset in self.fields[field].items()}
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+    def select(self, field, values):
+        """OR of the bitsets of the requested values; document values match any document name containing them"""
+        selected = 0
+        for value in values:
+            if field == 'document':
+                for document, bitset in self.fields[field].items():
+                    if value.lower() in document.lower():
+                        selected |= bitset
+            else:
+                selected |= self.fields[field].get(value, 0)
+        return selected
+
+    def allowed(self, filters):
+        """AND across fields of each field's OR; None when no filter is set"""
+        allowed = None
+        for field, values in filters.items():
+            if values:
+                selected = self.select(field, values)
+                allowed = selected if allowed is None else allowed & selected
+        return allowed
+
+
+_facet_indexes = {}
+_facet_index_lock = threading.Lock()
+
+
+def get_facet_index(community):
+    """Shared facet index for a community, built with (and after) its passage index"""
+    index = _facet_indexes.get(community)
+    if index is not None:
+        return index
+    passage_index = get_passage_index(community)
+    with _facet_index_lock:
+        if community not in _facet_indexes:
+            _facet_indexes[community] = FacetIndex(passage_index)
+        return _facet_indexes[community]
+
+
+def faceted_search(query, k=10, communities=None, documents=(), document_types=(), statutes=(), categories=()):
+    """Top-k passages across communities, restricted to the selected facet values before anything is scored.
+
+    Within a field the values are OR'd, across fields AND'ed; a community whose
+    bitsets intersect to nothing is skipped without decoding a single posting.
+    """
+    filters = {'document': documents, 'document_type': document_types, 'statute': statutes, 'category': categories}
+    results = []
+    for community in communities or list_communities():
+        allowed = get_facet_index(community).allowed(filters)
+        if allowed == 0:
+            continue
+        results.extend(search_passages(query, community, k, allowed=allowed))
+    results.sort(key=lambda result: (-result.score, result.rule_id))
+    return results[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Facet values of each community's passages, and filtered vs unfiltered query timings")
+    parser.add_argument('--community', action='append', help="Community to report (repeatable; default: all)")
+    parser.add_argument('--query', default="vehicle parking trucks boats", help="Query to time (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=50, help="Timed runs per filter (default: %(default)s)")
+    args = parser.parse_args()
+
+    communities = args.community or list_communities()
+    for community in communities:
+        index = get_facet_index(community)
+        print(community)
+        for field in FACET_FIELDS:
+            values = index.values(field)
+            print(f"  {field:<14} " + ", ".join(f"{value} ({count})" for value, count in values[:8]) +
+                  (f", ... {len(values) - 8} more" if len(values) > 8 else ""))
+
+    filter_sets = {
+        'none': {},
+        'category=parking': {'categories': ['parking']},
+        'document_type=declaration': {'document_types': ['declaration']},
+        'type=declaration,category=parking': {'document_types': ['declaration'], 'categories': ['parking']},
+        'statute=720.306': {'statutes': ['720.306']}
+    }
+    print(f"\n{'filters':<36} {'results':>7} {'ms/query':>9}")
+    for name, filters in filter_sets.items():
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            results = faceted_search(args.query, 10, communities, **filters)
+        elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+        print(f"{name:<36} {len(results):>7} {elapsed_ms:>9.3f}")
+        for result in results[:2]:
+            print(f"    {result.score:6.1f} {result.title}")
+
+    # A type filter must only ever return passages of that type
+    mismatches = 0
+    for community in communities:
+        for kind, _ in get_facet_index(community).values('document_type'):
+            for result in faceted_search(args.query, 50, [community], document_types=[kind]):
+                if document_type(result.rule_data.document) != kind:
+                    mismatches += 1
+                    print(f"type={kind} returned {result.rule_data.document}", file=sys.stderr)
+    print(f"\ntype filter check: {mismatches} mismatched results")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,971 @@
+import math
+import os
+import pickle
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from rules_database import iter_rules_database
+
+# FLORIDA-SPECIFIC HOA rules database with statute references, links, AND Boca Ridge Glen examples
+florida_hoa_rules = {
+    # Architectural Review - Florida Specific with Boca Ridge Glen Examples
+    "architectural_review_process_fl": {
+        "content": "Per Florida Statute 720.303, architectural review applications must be approved or denied within 45 days of submission. Failure to respond within 45 days constitutes approval unless governing documents specify otherwise.",
+        "boca_ridge_example": "Boca Ridge Glen Architectural Control Board: No building, wall, fence, or other structure shall be erected until construction plans and specifications are approved in writing by the Architectural Control Board. Refusal may be based on any ground, including purely aesthetic grounds.",
+        "statute": "720.303",
+        "links": [
+            ("Florida Statute 720.303", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/Sections/0720.303.html"),
+            ("CAI Florida Chapter", "https://www.caionline.org/StateChapters/Florida/Pages/default.aspx")
+        ]
+    },
+    
+    # Pet Policies - Florida and Boca Ridge Glen
+    "pet_restrictions_fl": {
+        "content": "Florida HOAs may establish reasonable pet restrictions and registration requirements under community covenants and Florida Statute 720.",
+        "boca_ridge_example": "Boca Ridge Glen Pet Policy: Dogs weighing less than 30 pounds, cats, or other household pets may be kept, provided they are not kept for commercial purposes and do not become a nuisance. Dogs must be on leash not exceeding 6 feet. No pet excretions allowed except in designated areas.",
+        "statute": "720 (General)",
+        "links": [
+            ("Florida Statute 720", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/"),
+            ("Pet Policy Guidelines", "https://www.caionline.org/")
+        ]
+    },
+    
+    # Property Boundaries and Common Areas - Boca Ridge Glen Specific
+    "common_areas_definition_fl": {
+        "content": "Florida Statute 720.301 defines common areas as property owned by the association for use by all members, including recreational facilities, roads, and landscaped areas.",
+        "boca_ridge_example": "Boca Ridge Glen Common Areas: Include walkways, parking facilities, lakes, ponds, canals, open spaces, private streets, sidewalks, driveways, street lighting, entrance features and landscaping. Common Areas include grass areas to the edge of pavement of Boca Ridge Drive and Boca Ridge Drive South.",
+        "statute": "720.301",
+        "links": [
+            ("Florida Statute 720.301", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/Sections/0720.301.html"),
+            ("Property Rights Guide", "https://www.caionline.org/")
+        ]
+    },
+    
+    # Assessments and Collection - Boca Ridge Glen Example
+    "assessment_collection_fl": {
+        "content": "Florida Statute 720.3085 provides HOAs with collection rights including liens, foreclosure, and attorney fees, with specific notice requirements before legal action.",
+        "boca_ridge_example": "Boca Ridge Glen Assessment Policy: Annual assessments payable in monthly installments. If not paid within 30 days after due date, assessment bears interest at 18% per annum. Association may bring legal action and add attorneys' fees and costs to the amount owed.",
+        "statute": "720.3085",
+        "links": [
+            ("Florida Statute 720.3085", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/Sections/0720.3085.html"),
+            ("Collection Procedures", "https://www.caionline.org/")
+        ]
+    },
+    
+    # Fines and Violations - Boca Ridge Glen Specific Process
+    "violation_fines_fl": {
+        "content": "Florida Statute 720.305 requires specific violation notice procedures including 14-day cure period for most violations before fines can be imposed.",
+        "boca_ridge_example": "Boca Ridge Glen Fine Schedule: First violation up to $50, Second violation up to $100, Third violation up to $200, Fourth and subsequent violations up to $500. Owner gets notice and hearing opportunity before Board of Directors, with appeals committee process available.",
+        "statute": "720.305",
+        "links": [
+            ("Florida Statute 720.305", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/Sections/0720.305.html"),
+            ("Violation Procedures", "https://www.caionline.org/")
+        ]
+    },
+    
+    # Exterior Maintenance - Boca Ridge Glen Specific
+    "exterior_maintenance_fl": {
+        "content": "Florida HOAs typically maintain exterior elements of buildings and common areas, with specific responsibilities defined in governing documents.",
+        "boca_ridge_example": "Boca Ridge Glen Exterior Maintenance: Association maintains paint, coating, stain and other exterior finishing on all buildings as originally installed. Association also maintains landscaping, sprinkler systems, private streets, sidewalks, driveways, and street lighting throughout the community.",
+        "statute": "720 (General)",
+        "links": [
+            ("Florida HOA Maintenance Law", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/"),
+            ("Maintenance Guidelines", "https://www.caionline.org/")
+        ]
+    },
+    
+    # Landscaping Requirements - Boca Ridge Glen
+    "landscaping_requirements_fl": {
+        "content": "Florida communities often have specific landscaping standards to maintain property values and community appearance.",
+        "boca_ridge_example": "Boca Ridge Glen Landscaping Rules: Landscaping maintained as originally installed by Developer unless prior approval obtained from Architectural Control Board. No tree or shrub with trunk exceeding 2 inches diameter may be removed without written consent. No artificial grass or plants allowed without approval.",
+        "statute": "Community Covenants",
+        "links": [
+            ("Florida-Friendly Landscaping", "https://ffl.ifas.ufl.edu/"),
+            ("Native Plant Guidelines", "https://www.fnps.org/")
+        ]
+    },
+    
+    # Water Conservation Requirements - Florida and Boca Ridge Glen
+    "water_conservation_fl": {
+        "content": "Florida communities must comply with water management district regulations and may implement additional conservation measures during drought conditions. Florida Statute 373 governs water use and conservation throughout the state.",
+        "boca_ridge_example": "Boca Ridge Glen Water Conservation: Irrigation systems must comply with South Florida Water Management District regulations. Watering restricted to designated days and times. Drought-tolerant landscaping encouraged. Pool covers required to reduce evaporation.",
+        "statute": "373 (Water Resources)",
+        "links": [
+            ("Florida Water Management", "https://www.sfwmd.gov/"),
+            ("Water Conservation Guidelines", "https://floridadep.gov/water"),
+            ("SFWMD Regulations", "https://www.sfwmd.gov/doing-business-with-us/permits/irrigation")
+        ]
+    },
+    
+    "irrigation_restrictions_fl": {
+        "content": "South Florida Water Management District requires year-round irrigation restrictions: residential properties may water on assigned days only, typically twice per week, between 4am-10am or 4pm-8pm.",
+        "boca_ridge_example": "Boca Ridge Glen follows SFWMD irrigation schedule: Even-numbered addresses water Wednesday/Saturday, odd-numbered addresses water Thursday/Sunday. No watering 10am-4pm. Hand watering and micro-irrigation allowed anytime.",
+        "statute": "SFWMD Rules",
+        "links": [
+            ("SFWMD Watering Rules", "https://www.sfwmd.gov/living-in-south-florida/water-restrictions"),
+            ("Year-Round Restrictions", "https://www.sfwmd.gov/sites/default/files/documents/wsd_year_round_landscape_irrigation_rule.pdf")
+        ]
+    },
+    
+    "drought_emergency_procedures_fl": {
+        "content": "During declared water emergencies, Florida communities must implement additional restrictions including prohibition of non-essential water uses such as car washing, fountain operation, and landscape irrigation.",
+        "boca_ridge_example": "Boca Ridge Glen Emergency Water Plan: During Phase I restrictions, irrigation reduced to once per week. Phase II eliminates all irrigation except hand watering. Violations subject to fines and water service suspension.",
+        "statute": "Emergency Management",
+        "links": [
+            ("Florida Drought Response", "https://floridadisaster.org/dem/mitigation/drought/"),
+            ("Water Emergency Plans", "https://www.sfwmd.gov/")
+        ]
+    },
+    
+    "florida_friendly_landscaping_fl": {
+        "content": "Florida Statute 720.3075 and 373.185 require HOAs to allow Florida-friendly landscaping that conserves water and protects the environment. HOAs cannot enforce rules prohibiting sustainable landscaping practices including drought-tolerant plants, efficient irrigation, and native species.",
+        "boca_ridge_example": "Boca Ridge Glen must permit Florida-friendly landscaping modifications under state law, including replacement of high-water-use grass with drought-tolerant alternatives, installation of rain gardens, and use of native plant species approved by University of Florida guidelines.",
+        "statute": "720.3075, 373.185",
+        "links": [
+            ("Florida Statute 720.3075", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/Sections/0720.3075.html"),
+            ("Florida Statute 373.185", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0300-0399/0373/Sections/0373.185.html"),
+            ("Florida-Friendly Landscaping", "https://ffl.ifas.ufl.edu/"),
+            ("UF Plant Database", "https://gardeningsolutions.ifas.ufl.edu/plants/")
+        ]
+    },
+    
+    "rain_water_collection_fl": {
+        "content": "Florida Statute 373.036 permits residential rainwater collection for landscape irrigation and other non-potable uses. HOAs cannot prohibit rain barrels or cisterns used for water conservation.",
+        "boca_ridge_example": "Boca Ridge Glen residents may install rain collection systems under Florida law for irrigation purposes, subject to reasonable aesthetic guidelines from the Architectural Control Board.",
+        "statute": "373.036",
+        "links": [
+            ("Florida Statute 373.036", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0300-0399/0373/Sections/0373.036.html"),
+            ("Rainwater Harvesting Guide", "https://edis.ifas.ufl.edu/")
+        ]
+    },
+    
+    # Vehicle and Parking Restrictions - Boca Ridge Glen
+    "vehicle_restrictions_fl": {
+        "content": "Florida HOAs commonly restrict commercial vehicles, RVs, and boats to maintain residential character and property values.",
+        "boca_ridge_example": "Boca Ridge Glen Vehicle Policy: No trucks, commercial vehicles (over 6 feet height or with commercial markings), campers, motor homes, boats, or trailers permitted except during construction or if stored in garages/behind walls where not visible from streets. Temporary parking allowed for deliveries and services.",
+        "statute": "Community Covenants",
+        "links": [
+            ("HOA Vehicle Restrictions", "https://www.caionline.org/"),
+            ("Property Value Protection", "https://www.appraisalinstitute.org/")
+        ]
+    },
+    
+    # Use Restrictions - Boca Ridge Glen
+    "residential_use_fl": {
+        "content": "Florida residential communities restrict properties to residential use only, preventing commercial activities that could disrupt neighborhood character.",
+        "boca_ridge_example": "Boca Ridge Glen Use Restrictions: No Lot shall be used except for residential purposes. No business, service repair or maintenance for general public allowed on any Lot or Common Areas. No 'for rent', 'for sale' or other signs displayed to public view.",
+        "statute": "Zoning and Covenants",
+        "links": [
+            ("Residential Zoning Laws", "https://www.myflorida.com/"),
+            ("Land Use Guidelines", "https://www.caionline.org/")
+        ]
+    },
+    
+    # Party Wall Maintenance - Boca Ridge Glen Specific
+    "party_wall_maintenance_fl": {
+        "content": "Florida attached housing developments often have specific party wall maintenance requirements shared between adjacent owners.",
+        "boca_ridge_example": "Boca Ridge Glen Party Wall Policy: Cost of reasonable repair and maintenance shared by Owners in proportion to use. If party wall destroyed by fire/casualty not covered by insurance, any Owner may restore it with others contributing proportionally. Association may repair party walls if Owner fails to maintain properly.",
+        "statute": "Property Law",
+        "links": [
+            ("Florida Property Law", "http://www.leg.state.fl.us/statutes/"),
+            ("Party Wall Guidelines", "https://www.caionline.org/")
+        ]
+    },
+    
+    # Additional Florida Statutory Requirements
+    "reserve_fund_requirements_fl": {
+        "content": "Florida Statute 720.303 requires HOAs to maintain reserve accounts for roof replacement, building painting, pavement resurfacing, and other major components with useful lives exceeding one year.",
+        "boca_ridge_example": "Reserve funding requirements apply to Boca Ridge Glen for major component replacement and capital improvements as mandated by Florida law.",
+        "statute": "720.303",
+        "links": [
+            ("Florida Statute 720.303", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/Sections/0720.303.html"),
+            ("Reserve Study Guidelines", "https://www.apra-usa.com/")
+        ]
+    },
+    
+    "board_meetings_fl": {
+        "content": "Florida law requires 48-hour advance notice for board meetings, with emergency meetings allowed for urgent matters affecting health, safety, or significant financial issues.",
+        "boca_ridge_example": "Boca Ridge Glen board governance follows Florida Sunshine Law requirements for open meetings and proper notice procedures.",
+        "statute": "720.306",
+        "links": [
+            ("Florida Statute 720.306", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/Sections/0720.306.html"),
+            ("Sunshine Law Guide", "https://www.myflorida.com/myflorida/government/governmentinformation/sunshine_law.html")
+        ]
+    },
+    
+    "board_quorum_requirements_fl": {
+        "content": "Florida Statute 720.306 requires a majority of board members to constitute a quorum for conducting HOA business. For a 5-member board, 3 members are required; for a 7-member board, 4 members are required. Decisions require a majority vote of those present at a properly noticed meeting.",
+        "boca_ridge_example": "Boca Ridge Glen HOA Board requires a majority of directors present to conduct official business, following Florida statutory quorum requirements for valid board actions and voting procedures.",
+        "statute": "720.306",
+        "links": [
+            ("Florida Statute 720.306", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/Sections/0720.306.html"),
+            ("Board Governance Guide", "https://www.caionline.org/StateChapters/Florida/Pages/default.aspx")
+        ]
+    },
+    
+    "board_composition_fl": {
+        "content": "Florida HOA boards typically consist of 3, 5, or 7 members as specified in governing documents. Florida Statute 720.306 governs board member eligibility, terms, and election procedures.",
+        "boca_ridge_example": "Boca Ridge Glen Board of Directors composition and member terms are established in the community bylaws in compliance with Florida HOA governance requirements.",
+        "statute": "720.306",
+        "links": [
+            ("Florida Statute 720.306", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/Sections/0720.306.html"),
+            ("Board Structure Guidelines", "https://www.caionline.org/")
+        ]
+    },
+    
+    "financial_reporting_requirements_fl": {
+        "content": "Florida HOAs must produce and maintain comprehensive financial records under Florida Statute 720.308. Required reports include: annual budgets, financial statements, tax returns, reserve fund information, and detailed receipts/expenditures records. Financial and accounting records must be kept for at least 7 years according to good accounting practices. Records must include accurate, itemized, and detailed records of all receipts and expenditures, plus a current account and periodic statement for each member showing assessment due dates, payment dates, amounts, and current balance due. Financial records must be made available to homeowners within 10 business days of request.",
+        "boca_ridge_example": "Boca Ridge Glen maintains comprehensive financial records including annual budgets, detailed financial statements, tax returns, and reserve fund reports as required by FL Statute 720.308. All financial records are kept for the required 7-year retention period and made available to homeowners within 10 business days upon request.",
+        "statute": "720.308",
+        "links": [
+            ("Florida Statute 720.308", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/Sections/0720.308.html"),
+            ("NextGen Florida HOA Records Guide", "https://nextgenfla.com/blogs/f/720-record-keeping-access-maintenance"),
+            ("DBPR HOA Information", "https://www.myfloridalicense.com/")
+        ]
+    },
+    
+    "budget_requirements_fl": {
+        "content": "Florida Statute 720.308 requires HOAs to adopt an annual budget at least 14 days before the start of the fiscal year. The budget must be provided to all members and include operating expenses, reserves, and any special assessments planned.",
+        "boca_ridge_example": "Boca Ridge Glen adopts its annual budget in compliance with Florida requirements, providing detailed financial planning documents to homeowners before the fiscal year begins.",
+        "statute": "720.308", 
+        "links": [
+            ("Florida Statute 720.308", "http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/Sections/0720.308.html"),
+            ("Budget Planning Guide", "https://www.apra-usa.com/")
+        ]
+    }
+}
+
+
+# Dynamic response generator for open-ended queries
+def generate_dynamic_response(query):
+    """Generate dynamic HOA responses for queries not covered by existing rules"""
+    
+    # Common HOA topics and their Florida law context
+    hoa_knowledge_base = {
+        'noise': {
+            'statutes': ['720.305 (Violation Procedures)'],
+            'content': 'Florida HOAs can establish reasonable noise restrictions to maintain peaceful enjoyment of properties. Enforcement follows FL Statute 720.305 violation procedures.',
+            'examples': ['Quiet hours (typically 10 PM - 7 AM)', 'Construction noise limits', 'Party/gathering restrictions', 'HVAC equipment placement rules']
+        },
+        'solar': {
+            'statutes': ['163.04 (Solar Rights)', '720.3075 (Property Rights)'],
+            'content': 'Florida Statute 163.04 protects homeowner rights to install solar collectors. HOAs cannot prohibit solar installations but may impose reasonable aesthetic restrictions.',
+            'examples': ['Solar panel placement guidelines', 'Roof installation approval process', 'Aesthetic screening requirements', 'Energy efficiency improvements']
+        },
+        'flag': {
+            'statutes': ['720.3075 (Display Rights)'],
+            'content': 'Florida law protects the right to display the US flag, Florida state flag, and military service flags. HOAs may establish reasonable size and placement restrictions.',
+            'examples': ['American flag display rights', 'Military service flag protection', 'Holiday decoration guidelines', 'Political sign restrictions']
+        },
+        'storage': {
+            'statutes': ['720 (General Covenants)'],
+            'content': 'Florida HOAs commonly restrict outdoor storage to maintain community appearance and property values through architectural guidelines.',
+            'examples': ['Garage storage requirements', 'Shed installation approval', 'Pool equipment screening', 'Trash container placement']
+        },
+        'security': {
+            'statutes': ['720.301 (Common Areas)', '768.28 (Liability)'],
+            'content': 'Florida HOAs may provide security services and establish access control measures for common areas while managing liability considerations.',
+            'examples': ['Gated community access', 'Security patrol services', 'Camera surveillance systems', 'Guest registration procedures']
+        },
+        'insurance': {
+            'statutes': ['720.3085 (Financial Management)'],
+            'content': 'Florida law requires HOAs to maintain appropriate insurance coverage and may require individual owners to carry specific insurance types.',
+            'examples': ['Hurricane/windstorm coverage', 'Flood insurance requirements', 'Liability insurance minimums', 'Building coverage responsibilities']
+        },
+        'election': {
+            'statutes': ['720.306 (Board Elections)'],
+            'content': 'Florida Statute 720.306 governs HOA board elections including candidate eligibility, voting procedures, and term limits.',
+            'examples': ['Annual election requirements', 'Candidate qualification rules', 'Voting method procedures', 'Term limit restrictions']
+        },
+        'budget': {
+            'statutes': ['720.308 (Budgets and Financial Reports)'],
+            'content': 'Florida law requires HOAs to prepare annual budgets, provide financial reports to owners, and follow specific assessment procedures.',
+            'examples': ['Annual budget adoption', 'Financial statement distribution', 'Assessment increase limitations', 'Reserve fund requirements']
+        }
+    }
+    
+    query_lower = query.lower()
+    
+    # Find matching topics
+    for topic, info in hoa_knowledge_base.items():
+        if topic in query_lower or any(keyword in query_lower for keyword in [topic + 's', topic + 'ing']):
+            return {
+                'type': 'dynamic',
+                'title': f'Florida HOA {topic.title()} Requirements',
+                'content': info['content'],
+                'statute': ', '.join(info['statutes']),
+                'examples': info['examples'],
+                'boca_example': f'Boca Ridge Glen would handle {topic} matters according to Florida statutory requirements and community covenants.',
+                'links': [
+                    ('Florida HOA Laws', 'http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/'),
+                    ('CAI Florida Resources', 'https://www.caionline.org/StateChapters/Florida/Pages/default.aspx')
+                ]
+            }
+    
+    # General catch-all response for any HOA question
+    return {
+        'type': 'general',
+        'title': f'Florida HOA Information: {query.title()}',
+        'content': f'Florida HOA communities are governed by Chapter 720, Florida Statutes, which provides comprehensive frameworks for community governance. For specific questions about "{query}", consult your community\'s governing documents alongside applicable Florida statutes.',
+        'statute': '720 (Florida HOA Act)',
+        'examples': ['Review community covenants and bylaws', 'Consult Florida Statute Chapter 720', 'Contact your HOA board or management', 'Seek legal advice for complex issues'],
+        'boca_example': f'Boca Ridge Glen, like all Florida HOAs, must comply with state law requirements while implementing community-specific rules through properly adopted covenants and bylaws.',
+        'links': [
+            ('Florida Statute 720', 'http://www.leg.state.fl.us/statutes/index.cfm?App_mode=Display_Statute&URL=0700-0799/0720/'),
+            ('Florida HOA Resources', 'https://www.caionline.org/StateChapters/Florida/Pages/default.aspx'),
+            ('Legal Information', 'https://www.floridabar.org/')
+        ]
+    }
+
+# Conversational phrases rewritten to the formal terms used in the rule tables
+conversational_mappings = {
+    # Question words to intent
+    'how often': 'frequency',
+    'how many': 'quantity', 
+    'how much': 'amount',
+    'when': 'timing',
+    'what are': 'definition',
+    'can we': 'permission',
+    'do we need': 'requirement',
+    'are we allowed': 'permission',
+    'what happens if': 'consequence',
+    
+    # Conversational phrases to formal terms  
+    'provide financials': 'financial reports',
+    'give financial info': 'financial reports',
+    'money stuff': 'financial matters',
+    'budget info': 'budget information',
+    'pay fees': 'assessment collection',
+    'get fined': 'violation penalties',
+    'board stuff': 'board governance',
+    'meeting rules': 'meeting procedures',
+    'pet rules': 'pet restrictions',
+    'landscaping rules': 'landscaping requirements',
+    'parking rules': 'vehicle restrictions',
+    'building changes': 'architectural modifications',
+    'house modifications': 'architectural modifications'
+}
+
+# Stop words removed before matching
+stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'we', 'us', 'our'}
+
+# Semantic categories and domain-specific vocabulary
+semantic_categories = {
+    'governance': ['board', 'director', 'meeting', 'quorum', 'voting', 'election', 'governance', 'bylaws', 'member', 'majority'],
+    'financial': ['budget', 'financial', 'report', 'reports', 'reporting', 'money', 'fee', 'assessment', 'revenue', 'expense', 'accounting', 'cpa', 'audit', 'fiscal', 'financials', 'provide', 'prepared', 'annual', 'quarterly', 'monthly', 'produce', 'produced', 'records', 'statements', 'maintain', 'kept'],
+    'property': ['property', 'real estate', 'lot', 'unit', 'residence', 'home', 'building', 'structure', 'land'],
+    'maintenance': ['maintenance', 'repair', 'upkeep', 'service', 'contractor', 'work', 'improvement', 'renovation'],
+    'rules': ['rule', 'rules', 'regulation', 'restriction', 'requirement', 'guideline', 'policy', 'covenant', 'provision'],
+    'legal': ['statute', 'law', 'legal', 'florida', 'compliance', 'violation', 'enforcement', 'penalty', 'fine'],
+    'pets': ['pet', 'dog', 'cat', 'animal', 'leash', 'weight', 'breed', 'registration'],
+    'architectural': ['architectural', 'modification', 'approval', 'construction', 'building', 'design', 'structure'],
+    'landscaping': ['landscape', 'landscaping', 'garden', 'tree', 'plant', 'grass', 'irrigation', 'lawn'],
+    'vehicle': ['vehicle', 'car', 'truck', 'parking', 'garage', 'driveway', 'boat', 'trailer', 'commercial'],
+    'water': ['water', 'irrigation', 'conservation', 'drought', 'watering', 'sprinkler', 'usage', 'restriction'],
+    'frequency': ['often', 'frequency', 'when', 'timing', 'schedule', 'annual', 'monthly', 'quarterly', 'produced', 'prepared', 'issued']
+}
+
+# Query intent detection patterns
+intent_patterns = {
+    'frequency': ['often', 'frequency', 'timing', 'when', 'schedule'],
+    'quantity': ['many', 'much', 'number', 'amount', 'count'],
+    'permission': ['allowed', 'can', 'may', 'permitted', 'legal'],
+    'requirement': ['must', 'required', 'need', 'mandatory', 'shall'],
+    'process': ['how', 'procedure', 'steps', 'process', 'method'],
+    'definition': ['what', 'define', 'meaning', 'definition'],
+    'consequence': ['happens', 'penalty', 'fine', 'violation', 'consequence']
+}
+
+# Rule vocabulary that confirms a detected intent
+intent_boosts = {
+    'frequency': ['reporting', 'annual', 'monthly', 'schedule', 'timeline'],
+    'quantity': ['majority', 'quorum', 'members', 'days', 'percent'],
+    'permission': ['may', 'allowed', 'permitted', 'authorize'],
+    'requirement': ['required', 'must', 'shall', 'mandatory'],
+    'process': ['procedure', 'process', 'steps', 'application'],
+    'consequence': ['fine', 'penalty', 'violation', 'enforcement']
+}
+
+# Bit positions used for the category and intent masks in rule features
+category_bits = {category: 1 << position for position, category in enumerate(semantic_categories)}
+intent_bits = {intent: 1 << position for position, intent in enumerate(intent_boosts)}
+
+class SlottedRecord:
+    """Compact record that still reads like the dict it replaces: record['key'] and record.get('key')"""
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+    
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+    
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+    
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if hasattr(self, name)}
+    
+    @classmethod
+    def from_dict(cls, values):
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            if name in values:
+                setattr(record, name, values[name])
+        return record
+
+class RuleRecord(SlottedRecord):
+    """Display fields of one rule; fields a rule does not have are simply left unset"""
+    __slots__ = ('title', 'content', 'boca_ridge_example', 'statute', 'links', 'community', 'category', 'document', 'section')
+    
+    @classmethod
+    def from_dict(cls, values):
+        record = super().from_dict(values)
+        if 'links' in values:
+            record.links = tuple(tuple(link) for link in values['links'])
+        return record
+
+class RuleFeatures(SlottedRecord):
+    """Scorer features of one rule or passage"""
+    __slots__ = ('text', 'length', 'distinct', 'freq', 'magnitude', 'category_mask', 'intent_mask',
+                 'mentions_florida', 'mentions_boca', 'mentions_hoa')
+
+class SearchResult(SlottedRecord):
+    """One ranked result; read with result['score'] like the result dicts used elsewhere"""
+    __slots__ = ('rule_id', 'rule_data', 'score', 'title', 'has_boca_example', 'type', 'examples', 'versions')
+    
+    def __init__(self, rule_id, rule_data, score, title, has_boca_example, type, examples=(), versions=()):
+        self.rule_id = rule_id
+        self.rule_data = rule_data
+        self.score = score
+        self.title = title
+        self.has_boca_example = has_boca_example
+        self.type = type
+        self.examples = examples
+        # (document, page) of near-duplicate copies in other document versions
+        self.versions = versions
+
+def count_bits(mask):
+    """Number of set bits in a category or intent mask"""
+    return bin(mask).count('1')
+
+def extract_words(text):
+    """Lowercase text tokens with stop words and short words removed"""
+    return [w for w in re.findall(r'\b\w+\b', text) if w not in stop_words and len(w) > 2]
+
+def analyze_query(query):
+    """Query-side features, computed once per search instead of once per rule"""
+    # Normalize text
+    query = query.lower().strip()
+    
+    # Apply conversational mappings
+    processed_query = query
+    for phrase, formal_term in conversational_mappings.items():
+        if phrase in processed_query:
+            processed_query = processed_query.replace(phrase, formal_term)
+    
+    query_words = extract_words(processed_query)
+    query_freq = Counter(query_words)
+    
+    # Multi-word phrases
+    bigrams = [f"{query_words[i]} {query_words[i+1]}" for i in range(len(query_words) - 1)]
+    
+    category_mask = 0
+    for category, terms in semantic_categories.items():
+        if any(term in query_words for term in terms):
+            category_mask |= category_bits[category]
+    
+    # First matching intent wins
+    query_intent = None
+    for intent, patterns in intent_patterns.items():
+        if any(pattern in query_words for pattern in patterns):
+            query_intent = intent
+            break
+    
+    return {
+        'text': query,
+        'words': query_words,
+        'freq': query_freq,
+        'set': set(query_words),
+        'magnitude': math.sqrt(sum(q * q for q in query_freq.values())),
+        'bigrams': bigrams,
+        'category_mask': category_mask,
+        'intent_bit': intent_bits.get(query_intent, 0)
+    }
+
+def analyze_rule(rule_content, rule_id):
+    """Rule-side features; these never change, so they are computed once into the rule index"""
+    content = rule_content.lower()
+    # Interned so every rule and passage shares one string object per vocabulary word
+    content_words = [sys.intern(word) for word in extract_words(content + ' ' + rule_id.lower())]
+    content_freq = Counter(content_words)
+    
+    category_mask = 0
+    for category, terms in semantic_categories.items():
+        if any(term in content_freq for term in terms):
+            category_mask |= category_bits[category]
+    
+    intent_mask = 0
+    for intent, terms in intent_boosts.items():
+        if any(term in content_freq for term in terms):
+            intent_mask |= intent_bits[intent]
+    
+    # Plain scalars plus one term-count mapping, so the same features can be
+    # served from an in-process record or from a memory-mapped snapshot
+    features = RuleFeatures()
+    features.text = content
+    features.length = len(content_words)
+    features.distinct = len(content_freq)
+    features.freq = content_freq
+    features.magnitude = math.sqrt(sum(c * c for c in content_freq.values()))
+    features.category_mask = category_mask
+    features.intent_mask = intent_mask
+    features.mentions_florida = 'florida' in content or 'fl' in content
+    features.mentions_boca = 'boca' in content
+    features.mentions_hoa = 'hoa' in content
+    return features
+
+def score_tf_idf(query_features, rule_features):
+    """1. TF-IDF-inspired scoring"""
+    content_freq = rule_features.freq
+    content_length = rule_features.length
+    tf_idf_score = 0
+    for word in query_features['words']:
+        if word in content_freq:
+            # Term frequency in content
+            tf = content_freq[word] / content_length
+            # Inverse document frequency (simplified - higher weight for less common words)
+            idf = math.log(content_length / (content_freq[word] + 1)) + 1
+            tf_idf_score += tf * idf * 100
+    return tf_idf_score
+
+def score_cosine(query_features, rule_features):
+    """2. Cosine similarity (only shared words contribute to the dot product)"""
+    content_freq = rule_features.freq
+    dot_product = sum(q * content_freq[word] for word, q in query_features['freq'].items() if word in content_freq)
+    return (dot_product / (query_features['magnitude'] * rule_features.magnitude)) * 100
+
+def score_jaccard(query_features, rule_features):
+    """3. Jaccard similarity (overlap coefficient)"""
+    query_set = query_features['set']
+    content_freq = rule_features.freq
+    intersection = sum(1 for word in query_set if word in content_freq)
+    union = len(query_set) + rule_features.distinct - intersection
+    return (intersection / union * 100) if union > 0 else 0
+
+def score_phrase(query_features, rule_features):
+    """4. Phrase matching bonuses"""
+    content = rule_features.text
+    phrase_score = 0
+    # Exact query match
+    if query_features['text'] in content:
+        phrase_score += 200
+    
+    for phrase in query_features['bigrams']:
+        if phrase in content:
+            phrase_score += 80
+    return phrase_score
+
+def score_category(query_features, rule_features):
+    """5. Boost for matching categories, and the penalty for mismatched primary categories: (score, penalty)"""
+    query_categories = query_features['category_mask']
+    content_categories = rule_features.category_mask
+    matching_categories = query_categories & content_categories
+    category_score = count_bits(matching_categories) * 50
+    
+    mismatch_penalty = 0
+    if query_categories and content_categories:
+        if not matching_categories and count_bits(query_categories) == 1 and count_bits(content_categories) == 1:
+            mismatch_penalty = 50  # Strong penalty for completely unrelated topics
+    return category_score, mismatch_penalty
+
+def score_intent(query_features, rule_features):
+    """6. Conversational intent matching"""
+    if rule_features.intent_mask & query_features['intent_bit']:
+        return 60  # Strong intent match bonus
+    return 0
+
+def score_context(query_features, rule_features):
+    """7. Context-specific boosters"""
+    query = query_features['text']
+    context_score = 0
+    
+    # Florida-specific boost
+    if 'florida' in query and rule_features.mentions_florida:
+        context_score += 30
+    
+    # Boca Ridge specific boost  
+    if 'boca' in query and rule_features.mentions_boca:
+        context_score += 40
+    
+    # HOA context boost
+    if 'hoa' in query and rule_features.mentions_hoa:
+        context_score += 20
+    return context_score
+
+def blend_scores(tf_idf_score, cosine_score, jaccard_score, phrase_score, category, intent_score, context_score):
+    """Weighted total of the seven stage scores, floored at zero"""
+    category_score, mismatch_penalty = category
+    total_score = (
+        tf_idf_score * 0.25 +      # Reduced weight for TF-IDF
+        cosine_score * 0.2 +       # Reduced weight for cosine  
+        jaccard_score * 0.1 +      # Reduced weight for Jaccard
+        phrase_score * 0.3 +       # Reduced weight for phrases
+        category_score * 0.25 +    # Reduced weight for categories
+        intent_score * 0.4 +       # High weight for intent matching
+        context_score * 0.15 -     # Reduced weight for context
+        mismatch_penalty
+    )
+    
+    return max(0, total_score)  # Ensure non-negative score
+
+def score_features(query_features, rule_features):
+    """Blend the seven similarity components for one analyzed query and one analyzed rule"""
+    if not query_features['words'] or not rule_features.length:
+        return 0
+    return blend_scores(
+        score_tf_idf(query_features, rule_features),
+        score_cosine(query_features, rule_features),
+        score_jaccard(query_features, rule_features),
+        score_phrase(query_features, rule_features),
+        score_category(query_features, rule_features),
+        score_intent(query_features, rule_features),
+        score_context(query_features, rule_features)
+    )
+
+# Similarity stages, in the order score_features blends them
+SCORER_STAGES = ('tf_idf', 'cosine', 'jaccard', 'phrase', 'category', 'intent', 'context')
+STAGE_SCORERS = (score_tf_idf, score_cosine, score_jaccard, score_phrase, score_category, score_intent, score_context)
+
+# Stage timing is off unless switched on; the plain scorer never checks it per rule
+_stage_profiling = os.environ.get('HOA_SCORER_TIMINGS', '').lower() in ('1', 'true', 'yes')
+
+def new_stage_timings():
+    """Empty per-stage accumulator: stage -> [seconds, calls]"""
+    return {stage: [0.0, 0] for stage in SCORER_STAGES}
+
+_process_stage_timings = new_stage_timings()
+_stage_timings_lock = threading.Lock()
+
+def set_stage_profiling(enabled):
+    """Turn per-stage scorer timing on or off for this process"""
+    global _stage_profiling, _process_scorer
+    _stage_profiling = bool(enabled)
+    _process_scorer = score_features_profiled if _stage_profiling else score_features
+
+def stage_profiling_enabled():
+    return _stage_profiling
+
+def merge_stage_timings(target, timings):
+    for stage, (seconds, calls) in timings.items():
+        target[stage][0] += seconds
+        target[stage][1] += calls
+    return target
+
+def record_stage_timings(timings):
+    """Add one query's stage timings to the process totals"""
+    with _stage_timings_lock:
+        merge_stage_timings(_process_stage_timings, timings)
+
+def process_stage_timings():
+    """Copy of the cumulative stage timings recorded by this process"""
+    with _stage_timings_lock:
+        return {stage: list(totals) for stage, totals in _process_stage_timings.items()}
+
+def reset_stage_timings():
+    with _stage_timings_lock:
+        _process_stage_timings.update(new_stage_timings())
+
+def stage_timing_rows(timings):
+    """Display rows (stage, calls, total ms, mean us, share of scorer time) for a timings dict"""
+    total = sum(seconds for seconds, _ in timings.values())
+    return [{
+        'stage': stage,
+        'calls': calls,
+        'total_ms': round(seconds * 1000, 3),
+        'mean_us': round(seconds * 1e6 / calls, 3) if calls else 0.0,
+        'share': round(seconds / total, 3) if total else 0.0
+    } for stage, (seconds, calls) in timings.items()]
+
+def score_features_timed(query_features, rule_features, timings):
+    """score_features with every stage timed into `timings`"""
+    if not query_features['words'] or not rule_features.length:
+        return 0
+    
+    clock = time.perf_counter
+    scores = []
+    for stage, score_stage in zip(SCORER_STAGES, STAGE_SCORERS):
+        started = clock()
+        scores.append(score_stage(query_features, rule_features))
+        totals = timings[stage]
+        totals[0] += clock() - started
+        totals[1] += 1
+    return blend_scores(*scores)
+
+def score_features_profiled(query_features, rule_features):
+    """score_features with its stage timings added to the process totals"""
+    timings = new_stage_timings()
+    score = score_features_timed(query_features, rule_features, timings)
+    record_stage_timings(timings)
+    return score
+
+# Scorer for callers that do not collect timings themselves: picked when
+# HOA_SCORER_TIMINGS is read or profiling is switched, so with timing off the
+# scoring loop calls score_features itself and never checks the flag
+_process_scorer = score_features_profiled if _stage_profiling else score_features
+
+# Enhanced conversational similarity system for natural HOA rule matching
+def calculate_semantic_similarity(query, rule_content, rule_id):
+    """Calculate semantic similarity using multiple algorithms with conversational understanding"""
+    return _process_scorer(analyze_query(query), analyze_rule(rule_content, rule_id))
+
+# Community folders with governing documents and optional rules_database.json
+COMMUNITIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'communities')
+
+# The built-in Florida rules carry this community's examples
+FEATURED_COMMUNITY = 'Boca Ridge Glen'
+
+def list_communities():
+    """Names of the community folders that can be searched"""
+    if not os.path.isdir(COMMUNITIES_DIR):
+        return []
+    return sorted(name for name in os.listdir(COMMUNITIES_DIR) if os.path.isdir(os.path.join(COMMUNITIES_DIR, name)))
+
+def iter_community_rules(community, problems=None):
+    """(rule_id, rule_data) for each valid rule of a community's rules_database.json, streamed record by record.
+
+    Malformed records are skipped; with problems=None their paths and problems
+    are printed to stderr, otherwise appended to problems as (path, message).
+    """
+    database_path = os.path.join(COMMUNITIES_DIR, community, 'rules_database.json')
+    if not os.path.exists(database_path):
+        return
+    
+    report = problems is None
+    problems = [] if report else problems
+    community_key = re.sub(r'\W+', '_', community.lower()).strip('_')
+    with open(database_path, encoding='utf-8') as f:
+        for category, rule_key, rule in iter_rules_database(f, problems):
+            yield f"{community_key}_{category}_{rule_key}", {
+                'title': rule.get('title', rule_key.replace('_', ' ').title()),
+                'content': rule['content'],
+                'statute': rule.get('section', 'Community Rules'),
+                'links': [],
+                'community': community,
+                'category': category,
+                'document': rule.get('document'),
+                'section': rule.get('section')
+            }
+    if report:
+        for path, message in problems:
+            print(f"{database_path}: {path}: {message}", file=sys.stderr)
+
+def load_community_rules(community):
+    """Rules from a community's rules_database.json, shaped like florida_hoa_rules entries"""
+    return dict(iter_community_rules(community))
+
+def build_rule_index(rules):
+    """Analyze every rule once; returns (rule_id, rule_data, features) entries in table order.
+
+    rules is a rule table or an iterable of (rule_id, rule_data), e.g. iter_community_rules().
+    """
+    index = []
+    for rule_id, rule_data in (rules.items() if hasattr(rules, 'items') else rules):
+        combined_content = rule_data["content"] + " " + rule_data.get("boca_ridge_example", "")
+        index.append((rule_id, RuleRecord.from_dict(rule_data), analyze_rule(combined_content, rule_id)))
+    return index
+
+# Process-level rule indexes keyed by community (None = statewide rules only)
+_rule_indexes = {}
+_rule_index_load_seconds = {}
+_rule_index_lock = threading.RLock()
+
+# Every rule index prebuilt at deploy time, so a new instance unpickles them instead
+# of re-analyzing every rule; set HOA_STARTUP_SNAPSHOT= (empty) to always build
+STARTUP_SNAPSHOT_PATH = os.environ.get('HOA_STARTUP_SNAPSHOT',
+                                       os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_index.pickle'))
+STARTUP_SNAPSHOT_VERSION = 2
+_startup_snapshot_checked = False
+
+def _startup_snapshot_sources():
+    """Modification times of the files the rule indexes are built from"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = [os.path.abspath(__file__)]
+    paths += [os.path.join(COMMUNITIES_DIR, community, 'rules_database.json') for community in list_communities()]
+    return {os.path.relpath(path, base_dir): os.path.getmtime(path) for path in paths if os.path.exists(path)}
+
+def write_startup_snapshot(path=STARTUP_SNAPSHOT_PATH):
+    """Build the statewide and every community index and pickle them for fast startup"""
+    statewide = build_rule_index(florida_hoa_rules)
+    indexes = {None: statewide}
+    for community in list_communities():
+        indexes[community] = statewide + build_rule_index(iter_community_rules(community))
+    
+    snapshot = {'version': STARTUP_SNAPSHOT_VERSION, 'sources': _startup_snapshot_sources(), 'indexes': indexes}
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+    return path
+
+def load_startup_snapshot(path=STARTUP_SNAPSHOT_PATH):
+    """Install every index from a startup snapshot; False when it is missing or older than its sources"""
+    if not path or not os.path.exists(path):
+        return False
+    
+    started = time.perf_counter()
+    # Only ever load snapshots written by write_startup_snapshot at deploy time
+    with open(path, 'rb') as f:
+        snapshot = pickle.load(f)
+    if snapshot.get('version') != STARTUP_SNAPSHOT_VERSION or snapshot.get('sources') != _startup_snapshot_sources():
+        return False
+    
+    load_seconds = time.perf_counter() - started
+    with _rule_index_lock:
+        for community, index in snapshot['indexes'].items():
+            install_rule_index(index, community, load_seconds)
+    return True
+
+def get_rule_index(community=None):
+    """Shared rule index for a community; loaded from the startup snapshot or built on first use"""
+    global _startup_snapshot_checked
+    index = _rule_indexes.get(community)
+    if index is not None:
+        return index
+    
+    if community is not None and community not in list_communities():
+        raise KeyError(f"Unknown community: {community}")
+    
+    with _rule_index_lock:
+        # Nothing installed yet (e.g. no mmap snapshot attached): try the startup snapshot once
+        if not _startup_snapshot_checked:
+            _startup_snapshot_checked = True
+            if not _rule_indexes:
+                load_startup_snapshot()
+        
+        if community not in _rule_indexes:
+            started = time.perf_counter()
+            index = get_rule_index() if community is not None else build_rule_index(florida_hoa_rules)
+            if community is not None:
+                index = index + build_rule_index(iter_community_rules(community))
+            _rule_indexes[community] = index
+            _rule_index_load_seconds[community] = time.perf_counter() - started
+        return _rule_indexes[community]
+
+def install_rule_index(index, community=None, load_seconds=0.0):
+    """Serve a community from a prebuilt index (e.g. a memory-mapped snapshot) instead of building one"""
+    with _rule_index_lock:
+        _rule_indexes[community] = index
+        _rule_index_load_seconds[community] = load_seconds
+
+def rule_index_stats():
+    """Rule count, posting count and build or attach time of every loaded rule index"""
+    with _rule_index_lock:
+        loaded = list(_rule_indexes.items())
+    return {
+        community: {
+            'rules': len(index),
+            'postings': sum(len(features.freq) for _, _, features in index),
+            'load_seconds': _rule_index_load_seconds.get(community, 0.0)
+        }
+        for community, index in loaded
+    }
+
+def rule_title(rule_id, rule_data):
+    """Display title: the rule's own title, else one derived from its id"""
+    return rule_data.get('title') or rule_id.replace('_fl', '').replace('_', ' ').title()
+
+# Enhanced Florida search function with semantic similarity
+def search_florida_hoa_rules(search_query, community=None, stage_timings=None):
+    """Ranked results for a query; pass a new_stage_timings() dict to collect this query's stage timings"""
+    if not search_query:
+        return []
+    
+    results = []
+    
+    # Search existing rule database using semantic similarity
+    semantic_algorithm_used = True  # Debug flag
+    
+    query_features = analyze_query(search_query)
+    
+    # The process scorer is score_features itself unless profiling is on; a
+    # caller collecting this query's timings gets the timed scorer instead
+    score_rule = _process_scorer
+    if stage_timings is not None:
+        timings = new_stage_timings()
+        score_rule = lambda query_features, rule_features: score_features_timed(query_features, rule_features, timings)
+    
+    for rule_id, rule_data, rule_features in get_rule_index(community):
+        # Calculate semantic similarity score against the pre-analyzed rule
+        score = score_rule(query_features, rule_features)
+        
+        # Add result if score is significant
+        if score > 10:  # Lower threshold since we use more sophisticated scoring
+            results.append(SearchResult(
+                rule_id,
+                rule_data,
+                score,
+                rule_title(rule_id, rule_data),
+                bool(rule_data.get("boca_ridge_example")),
+                'existing'
+            ))
+    
+    # If no good matches found (highest score < 30), add dynamic response
+    if not results or (results and max(r.score for r in results) < 30):
+        dynamic_response = generate_dynamic_response(search_query)
+        results.append(SearchResult(
+            f'dynamic_{hash(search_query) % 1000}',
+            RuleRecord.from_dict({
+                'content': dynamic_response['content'],
+                'boca_ridge_example': dynamic_response['boca_example'],
+                'statute': dynamic_response['statute'],
+                'links': dynamic_response['links']
+            }),
+            50,  # Medium relevance for dynamic responses
+            dynamic_response['title'],
+            True,
+            'dynamic',
+            dynamic_response.get('examples', [])
+        ))
+    
+    if stage_timings is not None:
+        record_stage_timings(timings)
+        merge_stage_timings(stage_timings, timings)
+    
+    # Sort by score (highest first) before any top-N cut, so the cuts keep the
+    # best matches rather than the first rules in table order
+    results.sort(key=lambda x: x.score, reverse=True)
+    
+    # Filter out low-relevance results - only keep high-quality matches
+    if results:
+        # Get the top score to establish relevance threshold
+        top_score = max(r.score for r in results)
+        
+        # Special handling for Boca Ridge queries - show more results
+        is_boca_query = 'boca' in search_query.lower() and ('ridge' in search_query.lower() or 'rules' in search_query.lower())
+        
+        if is_boca_query:
+            # For Boca Ridge queries, show up to 10 high-scoring results
+            relevance_threshold = max(top_score * 0.6, 60)
+            high_quality_results = [r for r in results if r.score >= relevance_threshold]
+            results = high_quality_results[:10]  # Show up to 10 Boca Ridge rules
+        else:
+            # Normal filtering for specific queries
+            relevance_threshold = max(top_score * 0.4, 50)
+            high_quality_results = [r for r in results if r.score >= relevance_threshold]
+            
+            # If we have good results, use them; otherwise keep top 3
+            if len(high_quality_results) >= 3:
+                results = high_quality_results[:3]  # Limit to top 3 most relevant
+            else:
+                results = results[:3]  # Fallback to top 3
+    
+    return results
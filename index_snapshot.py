@@ -0,0 +1,376 @@
+import bisect
+import functools
+import json
+import mmap
+import os
+import struct
+import time
+from collections.abc import Mapping
+
+import hoa_search_engine
+from hoa_search_engine import (COMMUNITIES_DIR, build_rule_index, florida_hoa_rules, install_rule_index,
+                               iter_community_rules, list_communities)
+
+SNAPSHOT_MAGIC = b'HOASNAP1'
+SNAPSHOT_VERSION = 2
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rule_index.snapshot')
+
+# One fixed-size record per rule: string offsets, postings slice, scorer scalars
+# id_off, id_len, text_off, text_len, meta_off, meta_len, postings_start, postings_len,
+# length, distinct, magnitude, category_mask, intent_mask, flags, community
+RULE_RECORD = struct.Struct('<10Id4I')
+HEADER_LENGTH = struct.Struct('<I')
+
+# Decoded display records kept per process; a search reads several fields of each
+# hit and popular queries keep returning the same rules
+RULE_DATA_CACHE_SIZE = 1024
+
+FLAG_FLORIDA = 1
+FLAG_BOCA = 2
+FLAG_HOA = 4
+
+
+def _align(buffer, boundary=8):
+    buffer.extend(b'\0' * (-len(buffer) % boundary))
+
+
+def snapshot_sources(communities):
+    """[mtime, size] of the engine code and rule databases a snapshot is built from, by path"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = [os.path.abspath(hoa_search_engine.__file__), os.path.abspath(__file__)]
+    paths += [os.path.join(COMMUNITIES_DIR, community, 'rules_database.json') for community in communities]
+    return {os.path.relpath(path, base_dir): [os.path.getmtime(path), os.path.getsize(path)]
+            for path in paths if os.path.exists(path)}
+
+
+def write_snapshot(path=DEFAULT_SNAPSHOT_PATH, communities=None):
+    """Analyze the statewide and community rule tables and write them as one mmap-able file"""
+    if communities is None:
+        communities = list_communities()
+    # Taken before reading, so a database rewritten mid-build reads as stale next time
+    sources = snapshot_sources(communities)
+
+    # Statewide rules belong to community 0, community rules to their 1-based position
+    tagged_entries = [(0, entry) for entry in build_rule_index(florida_hoa_rules)]
+    for community_no, community in enumerate(communities, 1):
+        tagged_entries.extend((community_no, entry) for entry in build_rule_index(iter_community_rules(community)))
+
+    # Vocabulary sorted by encoded bytes so workers can binary-search it in place
+    vocabulary = sorted({word.encode('utf-8') for _, (_, _, features) in tagged_entries for word in features.freq})
+    term_ids = {term: term_id for term_id, term in enumerate(vocabulary)}
+
+    strings = bytearray()
+
+    def add_string(value):
+        data = value.encode('utf-8')
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    records = bytearray()
+    posting_terms = []
+    posting_counts = []
+    for community_no, (rule_id, rule_data, features) in tagged_entries:
+        id_off, id_len = add_string(rule_id)
+        text_off, text_len = add_string(features.text)
+        meta_off, meta_len = add_string(json.dumps(rule_data.to_dict()))
+
+        postings = sorted((term_ids[word.encode('utf-8')], count) for word, count in features.freq.items())
+        postings_start = len(posting_terms)
+        posting_terms.extend(term_id for term_id, _ in postings)
+        posting_counts.extend(count for _, count in postings)
+
+        flags = ((FLAG_FLORIDA if features.mentions_florida else 0) |
+                 (FLAG_BOCA if features.mentions_boca else 0) |
+                 (FLAG_HOA if features.mentions_hoa else 0))
+        records.extend(RULE_RECORD.pack(
+            id_off, id_len, text_off, text_len, meta_off, meta_len, postings_start, len(postings),
+            features.length, features.distinct, features.magnitude,
+            features.category_mask, features.intent_mask, flags, community_no
+        ))
+
+    term_offsets = [0]
+    for term in vocabulary:
+        term_offsets.append(term_offsets[-1] + len(term))
+
+    sections = [
+        ('term_offsets', struct.pack(f'<{len(term_offsets)}I', *term_offsets)),
+        ('terms', b''.join(vocabulary)),
+        ('rules', bytes(records)),
+        ('posting_terms', struct.pack(f'<{len(posting_terms)}I', *posting_terms)),
+        ('posting_counts', struct.pack(f'<{len(posting_counts)}I', *posting_counts)),
+        ('strings', bytes(strings))
+    ]
+
+    # Section offsets are relative to the 8-byte aligned start of the body
+    body = bytearray()
+    section_table = {}
+    for name, data in sections:
+        _align(body)
+        section_table[name] = [len(body), len(data)]
+        body.extend(data)
+
+    header = json.dumps({
+        'version': SNAPSHOT_VERSION,
+        'built_at': time.time(),
+        'sources': sources,
+        'communities': communities,
+        'rule_count': len(tagged_entries),
+        'term_count': len(vocabulary),
+        'sections': section_table
+    }).encode('utf-8')
+
+    output = bytearray(SNAPSHOT_MAGIC)
+    output.extend(HEADER_LENGTH.pack(len(header)))
+    output.extend(header)
+    _align(output)
+    output.extend(body)
+
+    # Write-then-rename so attached workers never see a half-written file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(output)
+    os.replace(temp_path, path)
+    return path
+
+
+def read_header(path):
+    """Header of a snapshot file, without mapping its body"""
+    with open(path, 'rb') as f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a rule index snapshot: {path}")
+        (header_length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+        return json.loads(f.read(header_length))
+
+
+def snapshot_is_current(path=DEFAULT_SNAPSHOT_PATH):
+    """Whether a snapshot exists and was built by this snapshot version from the current code and rule databases"""
+    try:
+        header = read_header(path)
+    except (OSError, ValueError, struct.error):
+        return False
+    return (header.get('version') == SNAPSHOT_VERSION and header['communities'] == list_communities()
+            and header.get('sources') == snapshot_sources(header['communities']))
+
+
+class IndexSnapshot:
+    """Read-only view over a snapshot file; every attached process shares the same page-cache pages"""
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self.mmap)
+
+        if bytes(buffer[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a rule index snapshot: {path}")
+        header_start = len(SNAPSHOT_MAGIC) + HEADER_LENGTH.size
+        (header_length,) = HEADER_LENGTH.unpack_from(buffer, len(SNAPSHOT_MAGIC))
+        self.header = json.loads(bytes(buffer[header_start:header_start + header_length]))
+        if self.header['version'] != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {self.header['version']} in {path}")
+
+        body_start = header_start + header_length
+        body_start += -body_start % 8
+
+        def section(name):
+            offset, length = self.header['sections'][name]
+            return buffer[body_start + offset:body_start + offset + length]
+
+        self.term_offsets = section('term_offsets').cast('I')
+        self.terms = section('terms')
+        self.rules = section('rules')
+        self.posting_terms = section('posting_terms').cast('I')
+        self.posting_counts = section('posting_counts').cast('I')
+        self.strings = section('strings')
+        self.communities = self.header['communities']
+        self.rule_count = self.header['rule_count']
+        self.term_count = self.header['term_count']
+
+        # Small per-process caches of word -> term id lookups and decoded display records
+        self.term_id = functools.lru_cache(maxsize=8192)(self._term_id)
+        self.rule_data = functools.lru_cache(maxsize=RULE_DATA_CACHE_SIZE)(self._rule_data)
+
+    def _term_id(self, word):
+        """Binary search the sorted vocabulary; -1 when the word is not indexed"""
+        target = word.encode('utf-8')
+        offsets = self.term_offsets
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            term = self.terms[offsets[middle]:offsets[middle + 1]].tobytes()
+            if term < target:
+                low = middle + 1
+            elif term > target:
+                high = middle
+            else:
+                return middle
+        return -1
+
+    def string(self, offset, length):
+        return self.strings[offset:offset + length].tobytes().decode('utf-8')
+
+    def _rule_data(self, offset, length):
+        """Display fields of one rule, decoded from its JSON string"""
+        return json.loads(self.string(offset, length))
+
+    def record(self, rule_no):
+        return RULE_RECORD.unpack_from(self.rules, rule_no * RULE_RECORD.size)
+
+    def rule_index(self, community=None):
+        """Rule index for a community, iterable like the engine's in-process index"""
+        if community is None:
+            return MappedRuleIndex(self, {0})
+        return MappedRuleIndex(self, {0, self.communities.index(community) + 1})
+
+    def close(self):
+        self.term_id.cache_clear()
+        self.rule_data.cache_clear()
+        self.term_offsets.release()
+        self.posting_terms.release()
+        self.posting_counts.release()
+        self.terms.release()
+        self.rules.release()
+        self.strings.release()
+        self.mmap.close()
+
+
+class MappedTermCounts:
+    """Term -> count lookups for one rule, read straight from the snapshot postings"""
+    __slots__ = ('snapshot', 'start', 'end')
+
+    def __init__(self, snapshot, start, length):
+        self.snapshot = snapshot
+        self.start = start
+        self.end = start + length
+
+    def _position(self, word):
+        term_id = self.snapshot.term_id(word)
+        if term_id < 0:
+            return -1
+        position = bisect.bisect_left(self.snapshot.posting_terms, term_id, self.start, self.end)
+        if position < self.end and self.snapshot.posting_terms[position] == term_id:
+            return position
+        return -1
+
+    def __contains__(self, word):
+        return self._position(word) >= 0
+
+    def __getitem__(self, word):
+        # Missing terms count as zero, like collections.Counter
+        position = self._position(word)
+        return self.snapshot.posting_counts[position] if position >= 0 else 0
+
+    def __len__(self):
+        return self.end - self.start
+
+
+class MappedRuleFeatures:
+    """Scorer features for one rule, decoded from its fixed-size record on access"""
+    __slots__ = ('snapshot', 'record')
+
+    def __init__(self, snapshot, record):
+        self.snapshot = snapshot
+        self.record = record
+
+    @property
+    def text(self):
+        return self.snapshot.string(self.record[2], self.record[3])
+
+    @property
+    def freq(self):
+        return MappedTermCounts(self.snapshot, self.record[6], self.record[7])
+
+    @property
+    def length(self):
+        return self.record[8]
+
+    @property
+    def distinct(self):
+        return self.record[9]
+
+    @property
+    def magnitude(self):
+        return self.record[10]
+
+    @property
+    def category_mask(self):
+        return self.record[11]
+
+    @property
+    def intent_mask(self):
+        return self.record[12]
+
+    @property
+    def mentions_florida(self):
+        return bool(self.record[13] & FLAG_FLORIDA)
+
+    @property
+    def mentions_boca(self):
+        return bool(self.record[13] & FLAG_BOCA)
+
+    @property
+    def mentions_hoa(self):
+        return bool(self.record[13] & FLAG_HOA)
+
+
+class MappedRuleData(Mapping):
+    """Display fields of one rule; decoded from the snapshot on first access, through the snapshot's LRU"""
+    __slots__ = ('snapshot', 'offset', 'length', 'data')
+
+    def __init__(self, snapshot, offset, length):
+        self.snapshot = snapshot
+        self.offset = offset
+        self.length = length
+        self.data = None
+
+    def _decode(self):
+        if self.data is None:
+            self.data = self.snapshot.rule_data(self.offset, self.length)
+        return self.data
+
+    def __getitem__(self, key):
+        return self._decode()[key]
+
+    def __iter__(self):
+        return iter(self._decode())
+
+    def __len__(self):
+        return len(self._decode())
+
+
+class MappedRuleIndex:
+    """(rule_id, rule_data, features) entries for the snapshot rules visible to one community"""
+
+    def __init__(self, snapshot, community_numbers):
+        self.snapshot = snapshot
+        self.rule_numbers = [rule_no for rule_no in range(snapshot.rule_count)
+                             if snapshot.record(rule_no)[14] in community_numbers]
+
+    def __iter__(self):
+        snapshot = self.snapshot
+        for rule_no in self.rule_numbers:
+            record = snapshot.record(rule_no)
+            yield (snapshot.string(record[0], record[1]),
+                   MappedRuleData(snapshot, record[4], record[5]),
+                   MappedRuleFeatures(snapshot, record))
+
+    def __len__(self):
+        return len(self.rule_numbers)
+
+
+def attach_snapshot(path=DEFAULT_SNAPSHOT_PATH):
+    """Serve every search in this process from the memory-mapped snapshot"""
+    started = time.perf_counter()
+    snapshot = IndexSnapshot(path)
+    install_rule_index(snapshot.rule_index(), None, time.perf_counter() - started)
+    for community in snapshot.communities:
+        community_started = time.perf_counter()
+        install_rule_index(snapshot.rule_index(community), community, time.perf_counter() - community_started)
+    return snapshot
+
+
+if __name__ == '__main__':
+    started = time.perf_counter()
+    snapshot_path = write_snapshot()
+    print(f"Wrote {snapshot_path} ({os.path.getsize(snapshot_path)} bytes) in {(time.perf_counter() - started) * 1000:.1f} ms")
@@ -0,0 +1,146 @@
+import random
+import re
+import zlib
+from array import array
+
+# Words per shingle; five-word runs survive OCR noise and re-wrapped lines
+SHINGLE_WORDS = 5
+
+# MinHash signature length, split into LSH bands of BAND_ROWS rows. Two passages
+# share a bucket with probability 1 - (1 - J^BAND_ROWS)^bands: about 87% at
+# Jaccard 0.25, which is where a passage half-overlapping its counterpart in
+# another version (the windows rarely line up) lands
+SIGNATURE_SIZE = 64
+BAND_ROWS = 2
+
+# Share of the smaller passage's shingles found in the other at which the two
+# count as the same text
+NEAR_DUPLICATE_CONTAINMENT = 0.8
+
+# A document of one type copied whole into a file of another type (the
+# declaration inside the 2019 bylaws) is found by comparing whole documents:
+# the share of the smaller one's shingles found in the other
+EMBEDDED_DOCUMENT_CONTAINMENT = 0.8
+# Exact share of a copied passage's shingles found in its original; pages break
+# at different places in the copy, so this is lower than for versions
+EMBEDDED_PASSAGE_CONTAINMENT = 0.7
+
+HASH_MASK = (1 << 32) - 1
+
+# XOR masks standing in for hash permutations; fixed seed so signatures never
+# change between processes or builds
+_random = random.Random(720)
+PERMUTATION_MASKS = [_random.getrandbits(32) for _ in range(SIGNATURE_SIZE)]
+
+YEAR = re.compile(r'(?<!\d)(19\d{2}|20\d{2})(?!\d)')
+
+
+def shingle_hash(shingle):
+    # crc32 is linear in its input; the multiply spreads it over all 32 bits before masking
+    return (zlib.crc32(shingle.encode('utf-8')) * 0x9E3779B1) & HASH_MASK
+
+
+def shingles(text, size=SHINGLE_WORDS):
+    """Hashes of the text's overlapping word runs"""
+    words = re.findall(r'\w+', text.lower())
+    if len(words) <= size:
+        return {shingle_hash(' '.join(words))}
+    return {shingle_hash(' '.join(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+
+def minhash(shingle_hashes):
+    """MinHash signature: the minimum of each masked hash over the shingle set"""
+    return array('I', [min([value ^ mask for value in shingle_hashes]) for mask in PERMUTATION_MASKS])
+
+
+def estimated_jaccard(first, second):
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+def estimated_containment(first, second, first_size, second_size):
+    """Share of the smaller shingle set found in the other, from the Jaccard estimate and the set sizes"""
+    jaccard = estimated_jaccard(first, second)
+    return jaccard * (first_size + second_size) / ((1 + jaccard) * min(first_size, second_size))
+
+
+def lsh_candidates(signatures, groups=None, band_rows=BAND_ROWS):
+    """Index pairs sharing at least one LSH band bucket; with groups, only pairs from different groups"""
+    candidates = set()
+    for start in range(0, SIGNATURE_SIZE, band_rows):
+        buckets = {}
+        for position, signature in enumerate(signatures):
+            buckets.setdefault(signature[start:start + band_rows].tobytes(), []).append(position)
+        for members in buckets.values():
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    if groups is None or groups[first] != groups[second]:
+                        candidates.add((first, second))
+    return candidates
+
+
+def cluster_near_duplicates(texts, groups=None, threshold=NEAR_DUPLICATE_CONTAINMENT):
+    """Cluster id per text: texts whose estimated containment reaches the threshold share one, transitively.
+
+    The cluster id is the lowest member position, so unique texts are their own cluster.
+    With groups (e.g. the source document of each text), texts of one group are never clustered.
+    """
+    shingle_sets = [shingles(text) for text in texts]
+    sizes = [len(shingle_set) for shingle_set in shingle_sets]
+    signatures = [minhash(shingle_set) for shingle_set in shingle_sets]
+    parent = list(range(len(texts)))
+
+    def root(position):
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    for first, second in lsh_candidates(signatures, groups):
+        if estimated_containment(signatures[first], signatures[second], sizes[first], sizes[second]) >= threshold:
+            first_root, second_root = root(first), root(second)
+            if first_root != second_root:
+                parent[max(first_root, second_root)] = min(first_root, second_root)
+    return [root(position) for position in range(len(texts))]
+
+
+def embedded_documents(document_shingles, groups, threshold=EMBEDDED_DOCUMENT_CONTAINMENT):
+    """(original, copy) document pairs of different groups where most of the original's shingles are in the copy.
+
+    document_shingles maps each document to the union of its passages' shingles;
+    groups maps each document to its version chain, since versions are clustered apart.
+    """
+    pairs = []
+    for original, original_shingles in document_shingles.items():
+        for copy, copy_shingles in document_shingles.items():
+            if groups[original] == groups[copy] or len(copy_shingles) <= len(original_shingles):
+                continue
+            if len(original_shingles & copy_shingles) >= threshold * len(original_shingles):
+                pairs.append((original, copy))
+    return pairs
+
+
+def match_embedded_copies(original_shingles, copy_shingles, threshold=EMBEDDED_PASSAGE_CONTAINMENT):
+    """Position of the original passage each copy passage repeats (exact containment), or -1"""
+    owners = {}
+    for position, shingle_set in enumerate(original_shingles):
+        for value in shingle_set:
+            owners.setdefault(value, []).append(position)
+    matches = []
+    for shingle_set in copy_shingles:
+        shared = {}
+        for value in shingle_set:
+            for position in owners.get(value, ()):
+                shared[position] = shared.get(position, 0) + 1
+        best, best_position = threshold, -1
+        for position, count in shared.items():
+            containment = count / min(len(shingle_set), len(original_shingles[position]))
+            if containment >= best:
+                best, best_position = containment, position
+        matches.append(best_position)
+    return matches
+
+
+def document_version(document):
+    """Year a document version is from, read from its name ("CH2019-08-04 BRG HOA ByLaws" -> 2019); 0 if unknown"""
+    match = YEAR.search(document or '')
+    return int(match.group(1)) if match else 0
@@ -0,0 +1,155 @@
+import math
+import re
+
+from hoa_search_engine import semantic_categories
+
+# Rule categories of rules_database.json, in its order
+DOCUMENT_CATEGORIES = ('architectural', 'landscaping', 'pets', 'parking', 'noise', 'rentals', 'fees', 'maintenance',
+                       'common_areas', 'governance')
+
+# Seed vocabulary per category: the engine's semantic category words where one
+# exists, plus the words (and plurals) the rules_database categories add on top
+CATEGORY_WORDS = {
+    'architectural': semantic_categories['architectural'] + ['modifications', 'alteration', 'alterations', 'paint',
+                                                             'painting', 'color', 'colors', 'fence', 'fences', 'exterior'],
+    'landscaping': semantic_categories['landscaping'] + ['landscaped', 'trees', 'plants', 'shrub', 'shrubs', 'lawns',
+                                                         'sod', 'mulch', 'hedge', 'hedges'],
+    'pets': semantic_categories['pets'] + ['pets', 'dogs', 'cats', 'animals', 'livestock', 'poultry'],
+    'parking': semantic_categories['vehicle'] + ['vehicles', 'cars', 'trucks', 'parked', 'boats', 'trailers', 'camper',
+                                                 'campers'],
+    'noise': ['noise', 'noises', 'quiet', 'loud', 'music', 'nuisance', 'disturbance', 'sound', 'annoyance'],
+    'rentals': ['rent', 'rental', 'rentals', 'lease', 'leases', 'leased', 'leasing', 'tenant', 'tenants', 'lessee',
+                'landlord'],
+    'fees': ['fee', 'fees', 'assessment', 'assessments', 'fine', 'fines', 'dues', 'lien', 'liens', 'payment',
+             'delinquent'],
+    'maintenance': semantic_categories['maintenance'] + ['maintain', 'maintained', 'repairs', 'replacement', 'replace'],
+    'common_areas': ['common', 'pool', 'clubhouse', 'playground', 'recreation', 'recreational', 'amenities',
+                     'facilities', 'tennis'],
+    'governance': semantic_categories['governance'] + ['directors', 'meetings', 'vote', 'votes', 'elections', 'proxy',
+                                                       'officers']
+}
+
+# Engine category words too common in governing documents to say anything on
+# their own ("registration" of anything, "work", "commercial", every "member")
+GENERIC_WORDS = {'weight', 'breed', 'registration', 'work', 'service', 'improvement', 'commercial', 'building',
+                 'structure', 'approval', 'member', 'majority', 'governance'}
+
+# Stock legal phrases that use a category word in another sense: "fee simple"
+# title is ownership, not a fee, and an owner "of record" is not a financial record.
+# Matched as whole phrases, so a fee or a record mentioned on its own still counts
+NON_CATEGORY_PHRASES = re.compile(r'\b(?:fee\s+simple|of\s+record)\b', re.IGNORECASE)
+
+CATEGORY_SEEDS = {category: [word for word in words if word not in GENERIC_WORDS]
+                  for category, words in CATEGORY_WORDS.items()}
+
+# A passage is seed-labelled when it uses this many distinct seed words of a category
+SEED_MIN_WORDS = 2
+
+# Words learned per category from the seed-labelled passages: at least
+# LEARNED_MIN_DF of them must use the word, and the word must be LEARNED_MIN_LIFT
+# times likelier there than in the whole corpus. Categories with fewer than
+# LEARNED_MIN_LABELLED seed-labelled passages learn nothing
+LEARNED_WORDS = 15
+LEARNED_MIN_LABELLED = 20
+LEARNED_MIN_DF = 3
+LEARNED_MIN_LIFT = 3.0
+LEARNED_WEIGHT = 0.5
+
+# Evidence a passage needs to get a category: each seed word counts 1 and each
+# learned word LEARNED_WEIGHT per use, up to EVIDENCE_USES uses of one word
+MIN_EVIDENCE = 2.0
+EVIDENCE_USES = 2
+
+
+def bitset_from_ids(ids):
+    """int bitset with bit i set for every id i"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for item in ids:
+        bits[item >> 3] |= 1 << (item & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bitset_ids(bitset):
+    """Ids of the set bits, lowest first"""
+    ids = []
+    while bitset:
+        low = bitset & -bitset
+        position = low.bit_length() - 1
+        ids.append(position)
+        bitset ^= low
+    return ids
+
+
+def learn_vocabularies(passage_words, seeds=CATEGORY_SEEDS):
+    """Category -> {word: weight}: the seeds plus words over-represented in seed-labelled passages.
+
+    passage_words holds one set of distinct words per passage (None for passages to skip).
+    """
+    document_frequency = {}
+    counted = 0
+    for words in passage_words:
+        if words is None:
+            continue
+        counted += 1
+        for word in words:
+            document_frequency[word] = document_frequency.get(word, 0) + 1
+
+    vocabularies = {}
+    for category, seed_words in seeds.items():
+        seed_set = set(seed_words)
+        labelled = [words for words in passage_words if words is not None and len(words & seed_set) >= SEED_MIN_WORDS]
+        category_frequency = {}
+        for words in labelled:
+            for word in words:
+                if word not in seed_set:
+                    category_frequency[word] = category_frequency.get(word, 0) + 1
+
+        lifts = []
+        for word, frequency in category_frequency.items():
+            if frequency < LEARNED_MIN_DF or len(labelled) < LEARNED_MIN_LABELLED:
+                continue
+            lift = (frequency / len(labelled)) / (document_frequency[word] / counted)
+            if lift >= LEARNED_MIN_LIFT:
+                # Frequent words first among equally strong ones
+                lifts.append((lift * math.log(1 + frequency), word))
+        lifts.sort(reverse=True)
+
+        vocabulary = {word: 1.0 for word in seed_set}
+        vocabulary.update((word, LEARNED_WEIGHT) for _, word in lifts[:LEARNED_WORDS])
+        vocabularies[category] = vocabulary
+    return vocabularies
+
+
+def classify_passages(passage_counts, vocabularies):
+    """Category -> int bitset of the passages (by position) whose evidence reaches MIN_EVIDENCE.
+
+    passage_counts holds one word -> count mapping per passage (None for passages to skip).
+    """
+    members = {category: [] for category in vocabularies}
+    for passage_id, counts in enumerate(passage_counts):
+        if counts is None:
+            continue
+        for category, evidence in category_evidence(counts, vocabularies).items():
+            if evidence >= MIN_EVIDENCE:
+                members[category].append(passage_id)
+    return {category: bitset_from_ids(ids) for category, ids in members.items()}
+
+
+def category_text(text):
+    """Text with the stock phrases that would mislead category evidence blanked out"""
+    return NON_CATEGORY_PHRASES.sub(' ', text)
+
+
+def category_evidence(counts, vocabularies):
+    """Category -> evidence of one text, from its word -> count mapping"""
+    return {category: sum(weight * min(counts.get(word, 0), EVIDENCE_USES) for word, weight in vocabulary.items())
+            for category, vocabulary in vocabularies.items()}
+
+
+def query_categories(query_words, vocabularies):
+    """Categories whose seed words the query uses; learned words are too loose to read intent from"""
+    return [category for category, vocabulary in vocabularies.items()
+            if any(vocabulary.get(word) == 1.0 for word in query_words)]
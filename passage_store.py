@@ -0,0 +1,65 @@
+import bisect
+import functools
+import mmap
+import threading
+from array import array
+from collections import OrderedDict
+
+# Document files kept mapped at once; the least recently read is closed first,
+# so open maps stay bounded however many communities are hosted
+MAX_OPEN_DOCUMENTS = 32
+
+# Decoded passage texts kept for reuse; scoring reads every candidate's text, and
+# popular queries keep hitting the same passages. Bounded, like the open maps
+TEXT_CACHE_SIZE = 4096
+
+_maps = OrderedDict()
+_maps_lock = threading.Lock()
+
+
+def read_bytes(path, start, length):
+    """Bytes [start, start + length) of a file, through a shared read-only mmap"""
+    with _maps_lock:
+        mapped = _maps.get(path)
+        if mapped is None:
+            with open(path, 'rb') as f:
+                mapped = _maps[path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(_maps) > MAX_OPEN_DOCUMENTS:
+                _, oldest = _maps.popitem(last=False)
+                oldest.close()
+        else:
+            _maps.move_to_end(path)
+        return mapped[start:start + length]
+
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def read_text(path, start, length):
+    """Text of a byte span, whitespace collapsed the way passages are stored"""
+    return ' '.join(read_bytes(path, start, length).decode('utf-8').split())
+
+
+def close_documents():
+    """Unmap every open document and drop cached texts (e.g. before the files are rewritten)"""
+    read_text.cache_clear()
+    with _maps_lock:
+        while _maps:
+            _, mapped = _maps.popitem()
+            mapped.close()
+
+
+class DocumentSource:
+    """Page-offset table of one converted document: the byte offset where each '=== PAGE n ===' page starts"""
+    __slots__ = ('path', 'page_numbers', 'page_offsets')
+
+    def __init__(self, path, page_numbers, page_offsets):
+        self.path = path
+        self.page_numbers = array('I', page_numbers)
+        self.page_offsets = array('Q', page_offsets)
+
+    def page_at(self, offset):
+        """Page a byte offset of the file is printed on"""
+        position = bisect.bisect_right(self.page_offsets, offset) - 1
+        return self.page_numbers[max(position, 0)]
+
+    def read(self, start, length):
+        return read_text(self.path, start, length)
@@ -0,0 +1,101 @@
+import threading
+
+
+def encode_varint(value, out):
+    """Append a non-negative int to a bytearray, 7 bits per byte, high bit = more bytes follow"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varints(buffer):
+    """Every varint in a bytes buffer, decoded lazily in order"""
+    value = 0
+    shift = 0
+    for byte in buffer:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = 0
+            shift = 0
+
+
+class Vocabulary:
+    """Word <-> integer term id, shared by every postings index in the process"""
+
+    def __init__(self):
+        self.ids = {}
+        self.words = []
+        self.lock = threading.Lock()
+
+    def add(self, word):
+        term_id = self.ids.get(word)
+        if term_id is None:
+            with self.lock:
+                term_id = self.ids.get(word)
+                if term_id is None:
+                    term_id = len(self.words)
+                    self.words.append(word)
+                    self.ids[word] = term_id
+        return term_id
+
+    def lookup(self, word):
+        """Term id of a word, or -1 when no index has seen it"""
+        return self.ids.get(word, -1)
+
+    def __len__(self):
+        return len(self.words)
+
+
+# One vocabulary for every community, so a word costs one entry however many indexes use it
+shared_vocabulary = Vocabulary()
+
+
+class PostingsIndex:
+    """Inverted index from term id to (doc id, term count) postings.
+
+    Each term's postings are one bytes buffer of varints: the gap to the
+    previous doc id, then the count. Docs must be added in increasing id order.
+    """
+
+    def __init__(self, vocabulary=shared_vocabulary):
+        self.vocabulary = vocabulary
+        self.postings = {}
+        self.last_doc = {}
+        self.doc_count = 0
+
+    def add(self, doc_id, term_counts):
+        """Index one document given its word -> count mapping"""
+        for word, count in term_counts.items():
+            term_id = self.vocabulary.add(word)
+            buffer = self.postings.get(term_id)
+            if buffer is None:
+                buffer = self.postings[term_id] = bytearray()
+            encode_varint(doc_id - self.last_doc.get(term_id, 0), buffer)
+            encode_varint(count, buffer)
+            self.last_doc[term_id] = doc_id
+        self.doc_count += 1
+
+    def freeze(self):
+        """Finish building: shrink every buffer to immutable bytes and drop build state"""
+        self.postings = {term_id: bytes(buffer) for term_id, buffer in self.postings.items()}
+        self.last_doc = None
+        return self
+
+    def iter_postings(self, term_id):
+        """(doc id, count) pairs of one term, decoded on the fly"""
+        buffer = self.postings.get(term_id)
+        if not buffer:
+            return
+        values = decode_varints(buffer)
+        doc_id = 0
+        for gap in values:
+            doc_id += gap
+            yield doc_id, next(values)
+
+    def size_bytes(self):
+        """Bytes in the encoded postings buffers"""
+        return sum(len(buffer) for buffer in self.postings.values())
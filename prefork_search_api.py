@@ -0,0 +1,146 @@
+import argparse
+import os
+import signal
+import shutil
+import socket
+import sys
+import tempfile
+from http.server import ThreadingHTTPServer
+
+from index_snapshot import DEFAULT_SNAPSHOT_PATH, attach_snapshot, snapshot_is_current, write_snapshot
+from query_log import close_query_log, configure_query_log
+from search_api import DEFAULT_HOST, DEFAULT_PORT, SearchRequestHandler
+from search_metrics import enable_multiprocess, flush_metrics, start_metrics_flusher
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+LISTEN_BACKLOG = 512
+
+
+def exit_worker(signum, frame):
+    sys.exit(0)
+
+
+def serve_worker(listener, snapshot_path, quiet, query_log=None):
+    """Worker body: attach the shared snapshot and accept from the inherited socket"""
+    # SIGTERM unwinds to spawn(), which flushes the worker's query log and metrics before exiting
+    signal.signal(signal.SIGTERM, exit_worker)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # Started after the fork: the writer thread would not survive it. Every worker
+    # appends whole lines to the same file
+    if query_log is not None:
+        configure_query_log(*query_log)
+    attach_snapshot(snapshot_path)
+    SearchRequestHandler.quiet = quiet
+    start_metrics_flusher()
+
+    server = ThreadingHTTPServer(listener.getsockname(), SearchRequestHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = listener
+    server.serve_forever()
+
+
+class PreforkSupervisor:
+    """Front process: owns the listening socket, forks workers and replaces any that exit.
+
+    Every worker blocks in accept() on the same socket, so the kernel hands each
+    new connection to an idle worker; the front process never touches request
+    bytes and so never becomes a single-GIL bottleneck itself.
+    """
+
+    def __init__(self, listener, workers, snapshot_path, quiet=False, query_log=None):
+        self.listener = listener
+        self.worker_count = workers
+        self.snapshot_path = snapshot_path
+        self.quiet = quiet
+        self.query_log = query_log
+        self.workers = {}
+        self.stopping = False
+
+    def spawn(self, slot):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                serve_worker(self.listener, self.snapshot_path, self.quiet, self.query_log)
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                exit_code = 1
+            finally:
+                # os._exit skips atexit, so write out the query log and metrics here
+                try:
+                    close_query_log()
+                    flush_metrics()
+                finally:
+                    os._exit(exit_code)
+        self.workers[pid] = slot
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        for slot in range(self.worker_count):
+            self.spawn(slot)
+
+        try:
+            while self.workers:
+                pid, status = os.wait()
+                slot = self.workers.pop(pid, None)
+                if slot is not None and not self.stopping:
+                    print(f"Worker {pid} exited with status {status}; restarting", file=sys.stderr)
+                    self.spawn(slot)
+        except KeyboardInterrupt:
+            self.stop()
+            while self.workers:
+                pid, _ = os.wait()
+                self.workers.pop(pid, None)
+        finally:
+            self.listener.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-forked HOA search API sharing one memory-mapped rule index")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to bind (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Worker processes (default: %(default)s)")
+    parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT_PATH, help="Index snapshot file (default: %(default)s)")
+    parser.add_argument('--rebuild-snapshot', action='store_true', help="Rebuild the snapshot even if it is current")
+    parser.add_argument('--metrics-dir', help="Directory where workers share their metrics (default: a new temporary directory)")
+    parser.add_argument('--quiet', action='store_true', help="Disable per-request access logging")
+    parser.add_argument('--query-log', help="Append sampled searches to this JSONL file (default: $HOA_QUERY_LOG)")
+    parser.add_argument('--query-log-sample', type=float, default=1.0,
+                        help="Fraction of searches to log (default: %(default)s)")
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        parser.error("pre-fork mode needs os.fork(); use search_api.py on this platform")
+    if not 0.0 <= args.query_log_sample <= 1.0:
+        parser.error("--query-log-sample must be between 0 and 1")
+    query_log = (args.query_log, args.query_log_sample) if args.query_log else None
+
+    # The front process writes the snapshot once; workers only map it read-only.
+    # A snapshot older than the engine code or a rules database is rebuilt
+    if args.rebuild_snapshot or not snapshot_is_current(args.snapshot):
+        write_snapshot(args.snapshot)
+
+    # /metrics on any worker sums every worker's counters from this directory
+    metrics_dir = args.metrics_dir or tempfile.mkdtemp(prefix='hoa-metrics-')
+    enable_multiprocess(metrics_dir)
+
+    listener = socket.create_server((args.host, args.port), backlog=LISTEN_BACKLOG)
+    print(f"HOA search API ({args.workers} workers, snapshot {args.snapshot}) listening on http://{args.host}:{args.port}/search?q=")
+    try:
+        PreforkSupervisor(listener, args.workers, args.snapshot, args.quiet, query_log).run()
+    finally:
+        if not args.metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
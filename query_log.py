@@ -0,0 +1,114 @@
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+# Lines waiting for the writer thread; when it falls this far behind, new lines are dropped
+DEFAULT_QUEUE_SIZE = 10000
+
+# Ranked results kept per logged query
+LOGGED_RESULTS = 5
+
+
+def normalize_query(query):
+    """Lowercase, whitespace-collapsed query text, so the same question logs the same way"""
+    return ' '.join(query.lower().split())
+
+
+class QueryLog:
+    """Append-only, sampled JSONL query log written by one background thread.
+
+    log() only samples, builds a dict and hands it to a bounded queue, so a
+    search never waits on the disk; if the writer falls behind, lines are
+    dropped and counted instead of blocking.
+    """
+
+    def __init__(self, path, sample_rate=1.0, queue_size=DEFAULT_QUEUE_SIZE):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.dropped = 0
+        self.writer = threading.Thread(target=self._write_lines, name='query-log', daemon=True)
+        self.writer.start()
+
+    def log(self, query, results, latency_ms, community=None, cache=None, source=None):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        top = results[:LOGGED_RESULTS]
+        record = {
+            'ts': round(time.time(), 3),
+            'query': normalize_query(query),
+            'community': community,
+            'results': [result['rule_id'] for result in top],
+            'scores': [round(result['score'], 3) for result in top],
+            'latency_ms': round(latency_ms, 3),
+            'cache': cache,
+            'source': source
+        }
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_lines(self):
+        # One os.write per line on an O_APPEND descriptor, so pre-forked workers
+        # sharing a log file never interleave partial lines
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            while True:
+                record = self.queue.get()
+                if record is None:
+                    return
+                os.write(fd, (json.dumps(record) + '\n').encode('utf-8'))
+                self.written += 1
+        finally:
+            os.close(fd)
+
+    def close(self, timeout=5.0):
+        """Write everything queued so far and stop the writer thread"""
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join(timeout)
+
+
+_query_log = None
+_query_log_lock = threading.RLock()
+
+
+def configure_query_log(path, sample_rate=1.0):
+    """Start logging this process's searches to `path`; replaces any earlier log"""
+    global _query_log
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ValueError(f"Query log sample rate must be between 0 and 1, got {sample_rate}")
+    with _query_log_lock:
+        if _query_log is not None:
+            _query_log.close()
+        _query_log = QueryLog(path, sample_rate)
+        return _query_log
+
+
+def get_query_log():
+    """This process's query log, started from HOA_QUERY_LOG / HOA_QUERY_LOG_SAMPLE on first use; None when unset"""
+    if _query_log is None and os.environ.get('HOA_QUERY_LOG'):
+        with _query_log_lock:
+            if _query_log is None:
+                configure_query_log(os.environ['HOA_QUERY_LOG'], float(os.environ.get('HOA_QUERY_LOG_SAMPLE', '1.0')))
+    return _query_log
+
+
+def log_query(query, results, latency_ms, community=None, cache=None, source=None):
+    """Log one search if query logging is configured; a no-op otherwise"""
+    query_log = get_query_log()
+    if query_log is not None:
+        query_log.log(query, results, latency_ms, community, cache, source)
+
+
+@atexit.register
+def close_query_log():
+    """Write out this process's queued lines; also called by workers that leave through os._exit"""
+    if _query_log is not None:
+        _query_log.close()
@@ -0,0 +1,123 @@
+import html
+
+# Bump whenever the card markup changes so cached bodies are rebuilt
+TEMPLATE_VERSION = 2
+
+# Pre-rendered card bodies keyed by (rule_id, TEMPLATE_VERSION). This module is
+# imported once per process, so the cache survives Streamlit script reruns.
+_card_body_cache = {}
+
+# Lookup outcomes for the card body cache, read by the metrics endpoint
+card_cache_stats = {'hit': 0, 'miss': 0}
+
+CARD_STYLE = "margin-bottom:1rem;"
+HEADER_STYLE = "margin:0.5rem 0 0.25rem 0;"
+PROGRESS_TRACK_STYLE = "background:#e9ecef;border-radius:4px;height:8px;margin:0.25rem 0;"
+PROGRESS_BAR_STYLE = "background:#ff4b4b;border-radius:4px;height:8px;"
+CAPTION_STYLE = "color:#6c757d;font-size:0.875em;margin:0.25rem 0 0.75rem 0;"
+BOCA_BOX_STYLE = "background:#d4edda;color:#155724;border-radius:6px;padding:0.75rem 1rem;margin:0.75rem 0;"
+LINK_ROW_STYLE = "display:flex;flex-wrap:wrap;gap:1.5rem;margin:0.25rem 0 0.75rem 0;"
+
+
+def relevance_label(result):
+    """Relevance badge text shown next to the result title"""
+    if result['score'] >= 80:
+        relevance = "🔥 High Relevance"
+    elif result['score'] >= 50:
+        relevance = "⭐ Medium Relevance"
+    else:
+        relevance = "💡 Related"
+
+    if result.get('type') == 'dynamic':
+        relevance += " (AI Generated)"
+    return relevance
+
+
+def _render_card_body(result):
+    """Build the score-independent part of a card: law text, examples, Boca example and links"""
+    rule_data = result['rule_data']
+    parts = [f"<p><strong>Florida Law:</strong> {html.escape(rule_data['content'])}</p>"]
+
+    # Examples section for dynamic responses
+    if result.get('type') == 'dynamic' and result.get('examples'):
+        items = "".join(f"<li>{html.escape(example)}</li>" for example in result['examples'])
+        parts.append(f"<p><strong>💡 Common Examples:</strong></p><ul>{items}</ul>")
+
+    # Other document versions holding the same passage, collapsed into this card
+    if result.get('versions'):
+        items = "".join(f"<li>{html.escape(document)}, page {page}</li>" for document, page in result['versions'])
+        parts.append(f"<p><strong>📑 Also in:</strong></p><ul>{items}</ul>")
+
+    # Boca Ridge example section
+    if result['has_boca_example']:
+        parts.append(
+            f'<div style="{BOCA_BOX_STYLE}">🏘️ <strong>Boca Ridge Glen Example:</strong> '
+            f"{html.escape(rule_data['boca_ridge_example'])}</div>"
+        )
+
+    # Links laid out in one flex row instead of one Streamlit column per link
+    links = "".join(
+        f'<span>🔗 <a href="{html.escape(link_url, quote=True)}" target="_blank">{html.escape(link_text)}</a></span>'
+        for link_text, link_url in rule_data['links']
+    )
+    parts.append(f'<p><strong>📚 Additional Resources:</strong></p><div style="{LINK_ROW_STYLE}">{links}</div>')
+
+    return "".join(parts)
+
+
+def card_body(result):
+    """Cached card body; dynamic results are query-specific and never cached"""
+    if result.get('type') != 'existing':
+        return _render_card_body(result)
+
+    cache_key = (result['rule_id'], TEMPLATE_VERSION)
+    body = _card_body_cache.get(cache_key)
+    if body is None:
+        card_cache_stats['miss'] += 1
+        body = _render_card_body(result)
+        _card_body_cache[cache_key] = body
+    else:
+        card_cache_stats['hit'] += 1
+    return body
+
+
+def render_result_card(result):
+    """Render one search result as a single HTML block"""
+    header_text = f"📄 {result['title']}"
+    if result['has_boca_example']:
+        header_text += " 🏘️"
+    if result.get('type') == 'dynamic':
+        header_text += " 🤖"
+    header_text += f" ({relevance_label(result)})"
+
+    # Relevance score bar, scaled to max 200 points like the old st.progress call
+    score_percentage = min(result['score'] / 200.0, 1.0) * 100
+
+    return (
+        f'<div style="{CARD_STYLE}">'
+        f'<h3 style="{HEADER_STYLE}">{html.escape(header_text)}</h3>'
+        f'<div style="{PROGRESS_TRACK_STYLE}"><div style="{PROGRESS_BAR_STYLE}width:{score_percentage:.1f}%;"></div></div>'
+        f'<p style="{CAPTION_STYLE}">🌡️ Relevance Score: {result["score"]} points</p>'
+        f"{card_body(result)}"
+        "<hr/>"
+        "</div>"
+    )
+
+
+def render_result_list(results):
+    """Render a list of results as one HTML block so the page gets a single delta"""
+    return "".join(render_result_card(result) for result in results)
+
+
+def clear_card_cache():
+    """Drop every cached card body (e.g. after the rule tables are reloaded)"""
+    _card_body_cache.clear()
+
+
+# Cards per "load more" step
+RESULTS_PAGE_SIZE = 3
+
+
+def page_slice(results, page, page_size=RESULTS_PAGE_SIZE):
+    """Results visible after `page` load-more steps (pages are 1-based)"""
+    return results[:max(page, 1) * page_size]
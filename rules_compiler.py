@@ -0,0 +1,211 @@
+import argparse
+import datetime
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from community_corpus import document_type, list_documents, superseded_documents, version_chain
+from document_sections import split_sections
+from hoa_search_engine import COMMUNITIES_DIR, extract_words, list_communities
+from near_duplicates import embedded_documents, match_embedded_copies, shingles
+from passage_classifier import DOCUMENT_CATEGORIES, MIN_EVIDENCE, category_evidence, category_text, learn_vocabularies
+from rules_database import is_fatal, validate_rule
+
+DATABASE_VERSION = '1.0'
+
+# Document types whose sections become community rules; statutes are covered by
+# the built-in Florida rules and survey maps hold no rules
+RULE_DOCUMENT_TYPES = ('bylaws', 'declaration', 'other')
+
+# Annotations that settle a section's category on their own; [BYLAWS] and
+# [DECLARATION] only say which document a section came from
+TAG_CATEGORIES = {'QUORUM': 'governance', 'RESERVES': 'fees'}
+
+# Sections with fewer words (bare headings, signature blocks) are not rules
+MIN_RULE_WORDS = 12
+# Rule content is cut at a word boundary after this many characters
+MAX_CONTENT_CHARS = 1500
+# Words of the section heading kept in a rule title
+TITLE_WORDS = 8
+
+
+def slug(text, words=6):
+    return '_'.join(re.findall(r'[a-z0-9]+', text.lower())[:words])
+
+
+def provenance(section):
+    """Section reference in the form rules_database.json uses: "Article III, Section 3" """
+    if section.article and section.number:
+        return f"Article {section.article}, Section {section.number}"
+    if section.number:
+        return section.number if '.' in section.number else f"Section {section.number}"
+    return f"Article {section.article}"
+
+
+def rule_title(section):
+    heading = ' '.join(section.heading.split('\n')[0].split()[:TITLE_WORDS]).strip(' ,:;-')
+    return heading or provenance(section)
+
+
+def rule_content(text):
+    if len(text) <= MAX_CONTENT_CHARS:
+        return text
+    return text[:MAX_CONTENT_CHARS].rsplit(' ', 1)[0] + ' ...'
+
+
+def compile_document(job):
+    """Rule candidates of one document: its numbered sections long enough to state a rule"""
+    community, filename = job
+    document, sections = split_sections(community, filename)
+    modified = os.path.getmtime(os.path.join(COMMUNITIES_DIR, community, filename))
+    last_updated = datetime.date.fromtimestamp(modified).isoformat()
+    candidates = []
+    for section in sections:
+        words = extract_words(section.text.lower())
+        if not section.number or len(words) < MIN_RULE_WORDS:
+            continue
+        # Category evidence is counted without phrases like "fee simple"
+        category_words = extract_words(category_text(section.text).lower())
+        candidates.append({
+            'title': rule_title(section),
+            'content': rule_content(section.text),
+            'document': filename,
+            'section': provenance(section),
+            'page': section.page,
+            'last_updated': last_updated,
+            'tags': list(section.tags),
+            'counts': dict(Counter(category_words))
+        })
+    return document, filename, candidates
+
+
+def drop_repeated_rules(candidates):
+    """Candidates without repeats: rules with the same text, and the rules of a document copied whole
+    into a file of another type (the declaration inside the 2019 bylaws) that repeat one of the original's"""
+    unique = []
+    seen = set()
+    for candidate in candidates:
+        text = ' '.join(candidate['content'].lower().split())
+        if text not in seen:
+            seen.add(text)
+            unique.append(candidate)
+
+    candidate_shingles = [shingles(candidate['content']) for candidate in unique]
+    positions = {}
+    for position, candidate in enumerate(unique):
+        positions.setdefault(candidate['document'], []).append(position)
+    document_shingles = {document: set().union(*(candidate_shingles[position] for position in document_positions))
+                         for document, document_positions in positions.items()}
+    groups = {document: version_chain(os.path.splitext(document)[0]) for document in positions}
+    repeated = set()
+    for original, copy in embedded_documents(document_shingles, groups):
+        matches = match_embedded_copies([candidate_shingles[position] for position in positions[original]],
+                                        [candidate_shingles[position] for position in positions[copy]])
+        repeated.update(position for position, match in zip(positions[copy], matches) if match >= 0)
+    return [candidate for position, candidate in enumerate(unique) if position not in repeated]
+
+
+def section_category(candidate, vocabularies):
+    """Category of a rule candidate: from its annotations, else its strongest classifier evidence; None if too weak"""
+    for tag in candidate['tags']:
+        if tag in TAG_CATEGORIES:
+            return TAG_CATEGORIES[tag]
+    evidence = category_evidence(candidate['counts'], vocabularies)
+    category = max(DOCUMENT_CATEGORIES, key=lambda name: (evidence[name], -DOCUMENT_CATEGORIES.index(name)))
+    return category if evidence[category] >= MIN_EVIDENCE else None
+
+
+def compile_rules_database(community, workers=1):
+    """rules_database.json contents for a community, compiled from its documents, and the sections left out"""
+    documents = [filename for filename in list_documents(community)
+                 if document_type(os.path.splitext(filename)[0]) in RULE_DOCUMENT_TYPES]
+    jobs = [(community, filename) for filename in documents]
+    if workers <= 1:
+        compiled = [compile_document(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            compiled = list(executor.map(compile_document, jobs))
+
+    # Older versions of a document are left to the newest one
+    superseded = superseded_documents([document for document, _, _ in compiled])
+    candidates = drop_repeated_rules([candidate for document, _, document_candidates in compiled
+                                      if document not in superseded for candidate in document_candidates])
+    vocabularies = learn_vocabularies([set(candidate['counts']) for candidate in candidates])
+
+    rules = {category: {} for category in DOCUMENT_CATEGORIES}
+    uncategorized = []
+    for candidate in candidates:
+        category = section_category(candidate, vocabularies)
+        if category is None:
+            uncategorized.append(candidate)
+            continue
+        key = slug(f"{document_type(candidate['document'])} {candidate['section']} {candidate['title']}", 10)
+        rule_key = key
+        suffix = 2
+        while rule_key in rules[category]:
+            rule_key = f"{key}_{suffix}"
+            suffix += 1
+        rules[category][rule_key] = {field: candidate[field]
+                                     for field in ('title', 'content', 'document', 'section', 'page', 'last_updated')}
+
+    database = {
+        'rules': {category: category_rules for category, category_rules in rules.items() if category_rules},
+        'categories': [category for category in DOCUMENT_CATEGORIES if rules[category]],
+        'last_updated': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'version': DATABASE_VERSION,
+        'compiled_from': [filename for document, filename, _ in compiled if document not in superseded]
+    }
+    return database, uncategorized
+
+
+def write_rules_database(database, path):
+    """Validate every record, then write the database next to the documents (write-then-rename)"""
+    problems = []
+    for category, category_rules in database['rules'].items():
+        for rule_key, rule in category_rules.items():
+            problems += [problem for problem in validate_rule(rule, f"rules.{category}.{rule_key}") if is_fatal(problem)]
+    if problems:
+        raise ValueError(f"Compiled rule fails validation: {problems[0][0]}: {problems[0][1]}")
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(database, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a community's rules_database.json from its documents (offline)")
+    parser.add_argument('--community', action='append', help="Community to compile (repeatable; default: all)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help="Worker processes (default: %(default)s)")
+    parser.add_argument('--output', help="File to write (default: the community's rules_database.json)")
+    parser.add_argument('--force', action='store_true', help="Overwrite an existing rules_database.json")
+    parser.add_argument('--dry-run', action='store_true', help="Report what would be compiled without writing")
+    args = parser.parse_args()
+
+    communities = args.community or list_communities()
+    if args.output and len(communities) > 1:
+        parser.error("--output needs a single --community")
+
+    for community in communities:
+        path = args.output or os.path.join(COMMUNITIES_DIR, community, 'rules_database.json')
+        started = time.perf_counter()
+        database, uncategorized = compile_rules_database(community, args.workers)
+        counts = ', '.join(f"{len(rules)} {category}" for category, rules in database['rules'].items())
+        total = sum(len(rules) for rules in database['rules'].values())
+        print(f"{community}: {total} rules from {len(database['compiled_from'])} documents in "
+              f"{time.perf_counter() - started:.1f}s ({counts}); {len(uncategorized)} sections without a category")
+        if args.dry_run:
+            continue
+        if os.path.exists(path) and not args.force:
+            print(f"  {path} exists; use --force to overwrite it", file=sys.stderr)
+            continue
+        write_rules_database(database, path)
+        print(f"  Wrote {path}")
+
+
+if __name__ == '__main__':
+    main()
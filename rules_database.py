@@ -0,0 +1,209 @@
+import argparse
+import json
+import re
+import sys
+
+# Characters read from the file at a time; only the current rule record and
+# the unread rest of the chunk are ever held in memory
+CHUNK_SIZE = 64 * 1024
+
+# Fields of a rule record and the type each must have; 'content' is the only
+# required one. Fields outside the schema are reported and ignored
+RULE_FIELDS = {'title': str, 'content': str, 'document': str, 'section': str, 'page': int, 'last_updated': str}
+TYPE_NAMES = {str: 'a string', int: 'an integer'}
+REQUIRED_FIELDS = ('content',)
+# last_updated is a date, with or without a time ("2024-01-15", "2024-01-15T10:00:00Z")
+LAST_UPDATED = re.compile(r'\d{4}-\d{2}-\d{2}([T ][\d:.]+(Z|[+-]\d{2}:?\d{2})?)?$')
+
+WHITESPACE = ' \t\n\r'
+NUMBER_CHARACTERS = '0123456789+-.eE'
+
+
+class RulesDatabaseError(ValueError):
+    """A rules_database.json that is not well-formed JSON, or whose structure cannot be walked"""
+
+    def __init__(self, path, offset, message):
+        super().__init__(f"{path} (character {offset}): {message}")
+        self.path = path
+        self.offset = offset
+
+
+class JsonStream:
+    """Cursor over a JSON text read chunk by chunk; consumed text is dropped as reading goes on"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+        self.consumed = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    @property
+    def offset(self):
+        """Character offset of the cursor in the whole text"""
+        return self.consumed + self.position
+
+    def fill(self):
+        """Read one more chunk; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.consumed += self.position
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self, path):
+        """Next non-whitespace character, without consuming it"""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                raise RulesDatabaseError(path, self.offset, "unexpected end of file")
+
+    def expect(self, characters, path):
+        """Consume the next non-whitespace character, which must be one of characters"""
+        character = self.peek(path)
+        if character not in characters:
+            expected = ' or '.join(repr(c) for c in characters)
+            raise RulesDatabaseError(path, self.offset, f"expected {expected}, found {character!r}")
+        self.position += 1
+        return character
+
+    def value(self, path):
+        """Decode the next complete JSON value"""
+        self.peek(path)
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as e:
+                if self.fill():
+                    continue
+                raise RulesDatabaseError(path, self.consumed + e.pos, e.msg) from None
+            # A number running up to the buffer end ("1", "1.", "1.5e-") may go on in the next chunk
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and not self.buffer[end:].strip(NUMBER_CHARACTERS) and self.fill()):
+                continue
+            self.position = end
+            return value
+
+    def expect_end(self, path):
+        """Fail unless only whitespace is left"""
+        try:
+            character = self.peek(path)
+        except RulesDatabaseError:
+            return
+        raise RulesDatabaseError(path, self.offset, f"unexpected data after the top-level object: {character!r}")
+
+    def members(self, path):
+        """Keys of the object at the cursor; the caller consumes each member's value before asking for the next key"""
+        self.expect('{', path)
+        if self.peek(path) == '}':
+            self.position += 1
+            return
+        while True:
+            if self.peek(path) != '"':
+                raise RulesDatabaseError(path, self.offset, "expected a quoted key")
+            key = self.value(path)
+            self.expect(':', f"{path}.{key}")
+            yield key
+            if self.expect(',}', path) == '}':
+                return
+
+
+def validate_rule(rule, path):
+    """(path, problem) for everything wrong with one rule record; empty when it is valid"""
+    if not isinstance(rule, dict):
+        return [(path, f"expected an object, found {type(rule).__name__}")]
+    problems = []
+    for field in REQUIRED_FIELDS:
+        if field not in rule:
+            problems.append((f"{path}.{field}", "missing"))
+    for field, value in rule.items():
+        field_path = f"{path}.{field}"
+        if field not in RULE_FIELDS:
+            problems.append((field_path, "unknown field, ignored"))
+        elif not isinstance(value, RULE_FIELDS[field]) or isinstance(value, bool):
+            problems.append((field_path, f"expected {TYPE_NAMES[RULE_FIELDS[field]]}, found {type(value).__name__}"))
+        elif field in REQUIRED_FIELDS and not value.strip():
+            problems.append((field_path, "empty"))
+        elif field == 'last_updated' and not LAST_UPDATED.match(value):
+            problems.append((field_path, f"not a date: {value!r}"))
+    return problems
+
+
+def is_fatal(problem):
+    """Whether a problem makes the record unusable; unknown fields are only noted"""
+    return problem[1] != "unknown field, ignored"
+
+
+def iter_rules_database(f, problems=None, chunk_size=CHUNK_SIZE):
+    """(category, rule_key, rule) for each valid rule record of an open rules_database.json, in file order.
+
+    Records are decoded one at a time and never collected into a tree. Records
+    that fail validation are skipped; every problem found is appended to problems
+    as (path, message), e.g. ("rules.pets.leash_policy.content", "missing").
+    Malformed JSON raises RulesDatabaseError, since nothing after it can be trusted.
+    """
+    problems = [] if problems is None else problems
+    stream = JsonStream(f, chunk_size)
+    if stream.peek('$') != '{':
+        raise RulesDatabaseError('$', stream.offset, "expected the top level to be an object")
+    for key in stream.members('$'):
+        if key != 'rules':
+            # 'categories', 'last_updated', 'version' and the like are small and unused here
+            stream.value(key)
+            continue
+        if stream.peek('rules') != '{':
+            problems.append(('rules', "expected an object of categories"))
+            stream.value('rules')
+            continue
+        for category in stream.members('rules'):
+            category_path = f"rules.{category}"
+            if stream.peek(category_path) != '{':
+                problems.append((category_path, "expected an object of rules"))
+                stream.value(category_path)
+                continue
+            for rule_key in stream.members(category_path):
+                rule_path = f"{category_path}.{rule_key}"
+                rule = stream.value(rule_path)
+                rule_problems = validate_rule(rule, rule_path)
+                problems.extend(rule_problems)
+                if not any(is_fatal(problem) for problem in rule_problems):
+                    yield category, rule_key, rule
+    stream.expect_end('$')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate rules_database.json files record by record")
+    parser.add_argument('paths', nargs='+', help="rules_database.json files to check")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Characters read at a time (default: %(default)s)")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.paths:
+        problems = []
+        try:
+            with open(path, encoding='utf-8') as f:
+                records = sum(1 for _ in iter_rules_database(f, problems, args.chunk_size))
+        except RulesDatabaseError as e:
+            print(f"{path}: malformed JSON at {e}", file=sys.stderr)
+            failed = True
+            continue
+        skipped = sum(1 for problem in problems if is_fatal(problem))
+        print(f"{path}: {records} valid rules, {len(problems)} problems")
+        for problem_path, message in problems:
+            print(f"  {problem_path}: {message}")
+        failed = failed or skipped > 0
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+import argparse
+import json
+import os
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from hoa_search_engine import (get_rule_index, list_communities, new_stage_timings, process_stage_timings,
+                               search_florida_hoa_rules, set_stage_profiling, stage_profiling_enabled, stage_timing_rows)
+from query_log import configure_query_log, log_query
+from search_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, observe_search, render_metrics
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Upper bound for the k query parameter
+MAX_K = 50
+
+
+class SearchRequestError(Exception):
+    """Bad search request; carries the HTTP status to answer with"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def result_summary(rank, result):
+    """JSON-ready view of one ranked result"""
+    return {
+        'rank': rank,
+        'rule_id': result['rule_id'],
+        'title': result['title'],
+        'score': result['score'],
+        'type': result['type'],
+        'statute': result['rule_data'].get('statute')
+    }
+
+
+def run_search(query, community=None, k=None, timings=False):
+    """Rank rules for one query exactly like the UI does and shape the response"""
+    if community is not None and community not in list_communities():
+        raise SearchRequestError(400, f"Unknown community: {community}")
+    stage_timings = new_stage_timings() if timings else None
+    started = time.perf_counter()
+    results = search_florida_hoa_rules(query, community, stage_timings)
+    took = time.perf_counter() - started
+    observe_search(took, results, community)
+    log_query(query, results, took * 1000, community, source='api')
+    if k is not None:
+        results = results[:k]
+    took_ms = took * 1000
+
+    response = {
+        'query': query,
+        'community': community,
+        'count': len(results),
+        'took_ms': round(took_ms, 3),
+        'results': [result_summary(rank, result) for rank, result in enumerate(results, 1)]
+    }
+    if stage_timings is not None:
+        response['stage_timings'] = stage_timing_rows(stage_timings)
+    return response
+
+
+def parse_k(value):
+    """k from a query string or a JSON line: an integer from 1 to MAX_K"""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise SearchRequestError(400, "Parameter k must be an integer")
+    try:
+        k = int(value)
+    except ValueError:
+        raise SearchRequestError(400, "Parameter k must be an integer")
+    if not 1 <= k <= MAX_K:
+        raise SearchRequestError(400, f"Parameter k must be between 1 and {MAX_K}")
+    return k
+
+
+def parse_search_params(query_string):
+    """Validate q / community / k / timings from a /search query string"""
+    params = parse_qs(query_string)
+    query = params.get('q', [''])[0].strip()
+    if not query:
+        raise SearchRequestError(400, "Missing required parameter: q")
+
+    community = params.get('community', [''])[0].strip() or None
+
+    k = parse_k(params['k'][0]) if 'k' in params else None
+
+    timings = params.get('timings', ['0'])[0].lower() in ('1', 'true', 'yes')
+
+    return query, community, k, timings
+
+
+def run_passage_search(params):
+    """/passages?q=<query>[&community=][&document=][&type=][&statute=][&category=][&k=10]: faceted passage search.
+
+    Each facet parameter may repeat; values of one facet are OR'd, facets are AND'ed.
+    """
+    from facets import faceted_search
+    from passage_classifier import DOCUMENT_CATEGORIES
+
+    query = params.get('q', [''])[0].strip()
+    if not query:
+        raise SearchRequestError(400, "Missing required parameter: q")
+    communities = [value.strip() for value in params.get('community', []) if value.strip()]
+    for community in communities:
+        if community not in list_communities():
+            raise SearchRequestError(400, f"Unknown community: {community}")
+    categories = params.get('category', [])
+    for category in categories:
+        if category not in DOCUMENT_CATEGORIES:
+            raise SearchRequestError(400, f"Unknown category: {category}")
+    k = parse_k(params.get('k', ['10'])[0])
+
+    filters = {
+        'documents': params.get('document', []),
+        'document_types': params.get('type', []),
+        'statutes': params.get('statute', []),
+        'categories': categories
+    }
+    started = time.perf_counter()
+    results = faceted_search(query, k, communities or None, **filters)
+    took = time.perf_counter() - started
+    log_query(query, results, took * 1000, ','.join(communities) or None, source='api_passages')
+    summaries = []
+    for rank, result in enumerate(results, 1):
+        summary = result_summary(rank, result)
+        summary['community'] = result['rule_data']['community']
+        summary['versions'] = [list(version) for version in result['versions']]
+        summaries.append(summary)
+    return {'query': query, 'communities': communities, 'filters': filters, 'count': len(results),
+            'took_ms': round(took * 1000, 3), 'results': summaries}
+
+
+def run_section_search(params):
+    """/sections?q=<query>&community=<name>[&k=10][&expand=1]: sections ranked, expanded to their article when needed"""
+    from section_index import search_sections
+
+    query = params.get('q', [''])[0].strip()
+    if not query:
+        raise SearchRequestError(400, "Missing required parameter: q")
+    community = params.get('community', [''])[0].strip()
+    if community not in list_communities():
+        raise SearchRequestError(400, f"Unknown community: {community}")
+    k = parse_k(params.get('k', ['10'])[0])
+    expand = params.get('expand', ['1'])[0].lower() in ('1', 'true', 'yes')
+
+    started = time.perf_counter()
+    results = search_sections(query, community, k, expand)
+    took = time.perf_counter() - started
+    log_query(query, results, took * 1000, community, source='api_sections')
+    summaries = []
+    for rank, result in enumerate(results, 1):
+        summary = result_summary(rank, result)
+        summary['document'] = result['rule_data']['document']
+        summaries.append(summary)
+    return {'query': query, 'community': community, 'expand': expand, 'count': len(results),
+            'took_ms': round(took * 1000, 3), 'results': summaries}
+
+
+def citing_statute(params):
+    """/citing?statute=720.306[&community=][&document=bylaws]: rules and passages citing a statute"""
+    from citation_graph import get_citation_graph
+
+    statute = params.get('statute', [''])[0].strip()
+    if not statute:
+        raise SearchRequestError(400, "Missing required parameter: statute")
+    community = params.get('community', [''])[0].strip() or None
+    document = params.get('document', [''])[0].strip() or None
+    sections = get_citation_graph().sections_citing(statute, community=community, document_contains=document)
+    return {'statute': statute, 'count': len(sections), 'sections': sections}
+
+
+def related_sections(params):
+    """/related?key=<rule id or passage key>: rules and passages sharing a cited statute"""
+    from citation_graph import get_citation_graph
+
+    key = params.get('key', [''])[0].strip()
+    if not key:
+        raise SearchRequestError(400, "Missing required parameter: key")
+    graph = get_citation_graph()
+    return {'key': key, 'statutes': graph.statutes_cited_by(key), 'related': graph.related(key)}
+
+
+def stored_conflicts(params):
+    """/conflicts?community=<name>[&statute=720.3075][&k=20]: precomputed statute conflict candidates"""
+    from conflict_candidates import get_conflict_candidates
+
+    community = params.get('community', [''])[0].strip()
+    if community not in list_communities():
+        raise SearchRequestError(400, f"Unknown community: {community}")
+    statute = params.get('statute', [''])[0].strip() or None
+    k = parse_k(params.get('k', ['20'])[0])
+    candidates = get_conflict_candidates(community, statute, k)
+    return {'community': community, 'statute': statute, 'count': len(candidates), 'candidates': candidates}
+
+
+def stored_changes(params):
+    """/changes?community=<name>[&type=bylaws][&status=changed]: precomputed section diffs between document versions"""
+    from version_diffs import get_version_diffs
+
+    community = params.get('community', [''])[0].strip()
+    if community not in list_communities():
+        raise SearchRequestError(400, f"Unknown community: {community}")
+    document_type = params.get('type', [''])[0].strip() or None
+    status = params.get('status', [''])[0].strip() or None
+    if status not in (None, 'added', 'changed', 'unchanged', 'removed'):
+        raise SearchRequestError(400, "Parameter status must be added, changed, unchanged or removed")
+    return {'community': community, 'diffs': get_version_diffs(community, document_type, status)}
+
+
+def handle_request(path):
+    """Route one GET request; returns (status, payload), where a str payload is sent as Prometheus text"""
+    url = urlparse(path)
+    try:
+        if url.path == '/search':
+            return 200, run_search(*parse_search_params(url.query))
+        if url.path == '/passages':
+            return 200, run_passage_search(parse_qs(url.query))
+        if url.path == '/sections':
+            return 200, run_section_search(parse_qs(url.query))
+        if url.path == '/communities':
+            return 200, {'communities': list_communities()}
+        if url.path == '/healthz':
+            return 200, {'status': 'ok', 'pid': os.getpid()}
+        if url.path == '/citing':
+            return 200, citing_statute(parse_qs(url.query))
+        if url.path == '/related':
+            return 200, related_sections(parse_qs(url.query))
+        if url.path == '/conflicts':
+            return 200, stored_conflicts(parse_qs(url.query))
+        if url.path == '/changes':
+            return 200, stored_changes(parse_qs(url.query))
+        if url.path == '/metrics':
+            return 200, render_metrics()
+        if url.path == '/debug/stages':
+            return 200, {'enabled': stage_profiling_enabled(), 'pid': os.getpid(),
+                         'stages': stage_timing_rows(process_stage_timings())}
+        raise SearchRequestError(404, f"Unknown path: {url.path}")
+    except SearchRequestError as error:
+        return error.status, {'error': error.message}
+    except Exception:
+        # A bug or a broken data file: log it and still answer with JSON
+        traceback.print_exc()
+        return 500, {'error': "Internal server error"}
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'HOASearchAPI/1.0'
+    quiet = False
+
+    def do_GET(self):
+        status, payload = handle_request(self.path)
+        if isinstance(payload, str):
+            self.send_body(status, payload.encode('utf-8'), METRICS_CONTENT_TYPE)
+        else:
+            self.send_json(status, payload)
+
+    def send_json(self, status, payload):
+        self.send_body(status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+    def send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless JSON search API for the Florida HOA rules engine")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to bind (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on (default: %(default)s)")
+    parser.add_argument('--quiet', action='store_true', help="Disable per-request access logging")
+    parser.add_argument('--query-log', help="Append sampled searches to this JSONL file (default: $HOA_QUERY_LOG)")
+    parser.add_argument('--query-log-sample', type=float, default=1.0,
+                        help="Fraction of searches to log (default: %(default)s)")
+    parser.add_argument('--stage-timings', action='store_true', help="Time every scorer stage for every search")
+    parser.add_argument('--mode', choices=['threaded', 'async'], default='threaded',
+                        help="threaded: one thread per request; async: event loop with bounded concurrency")
+    parser.add_argument('--concurrency', type=int, help="async mode: searches scored at once (default: CPU count)")
+    parser.add_argument('--queue-depth', type=int, help="async mode: requests allowed to wait before 503 (default: 64)")
+    args = parser.parse_args()
+
+    if args.stage_timings:
+        set_stage_profiling(True)
+    if args.query_log:
+        configure_query_log(args.query_log, args.query_log_sample)
+
+    # Build the shared rule index before accepting traffic
+    get_rule_index()
+
+    if args.mode == 'async':
+        from async_search_api import DEFAULT_CONCURRENCY, DEFAULT_QUEUE_DEPTH, serve_async
+        concurrency = args.concurrency or DEFAULT_CONCURRENCY
+        queue_depth = args.queue_depth if args.queue_depth is not None else DEFAULT_QUEUE_DEPTH
+        print(f"HOA search API (async, concurrency {concurrency}, queue depth {queue_depth}) listening on http://{args.host}:{args.port}/search?q=")
+        serve_async(args.host, args.port, concurrency, queue_depth, args.quiet)
+        return
+
+    SearchRequestHandler.quiet = args.quiet
+
+    server = ThreadingHTTPServer((args.host, args.port), SearchRequestHandler)
+    print(f"HOA search API listening on http://{args.host}:{args.port}/search?q=")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from query_log import get_query_log
+from result_cards import card_cache_stats
+
+# Prometheus text exposition format served by /metrics
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Search latency buckets in seconds; most searches land between 0.5 ms and 25 ms
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Scorer label for searches served by hoa_search_engine
+ENGINE_SCORER = 'hoa_search_engine'
+
+DEFAULT_METRICS_HOST = '127.0.0.1'
+
+# Seconds between a pre-forked worker's writes of its counters to the shared directory
+METRICS_FLUSH_SECONDS = 1.0
+
+# Everything below is per process: the Streamlit server and each API process
+# keep and expose their own numbers. Pre-forked workers also write theirs to a
+# shared directory, and whichever worker answers a scrape sums every file, so
+# the server reports one set of series however many workers it runs
+_metrics_lock = threading.Lock()
+_metrics = []
+_process_started = time.time()
+_multiprocess_dir = None
+_server_started = None
+
+
+def _reset_process_started():
+    global _process_started
+    _process_started = time.time()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_process_started)
+
+
+def _format_labels(labelnames, values):
+    if not labelnames:
+        return ''
+    pairs = ','.join(f'{name}="{_escape_label(value)}"' for name, value in zip(labelnames, values))
+    return '{' + pairs + '}'
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class CounterMetric:
+    """Monotonic counter with a fixed set of label names"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Unlabelled counters are exported as 0 before their first increment
+        self.values = {} if self.labelnames else {(): 0}
+        with _metrics_lock:
+            _metrics.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with _metrics_lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def set_totals(self, totals):
+        """Replace every value with a running total kept elsewhere (label values -> total)"""
+        with _metrics_lock:
+            self.values = {tuple(str(value) for value in key): total for key, total in totals.items()}
+
+    @staticmethod
+    def merge(total, value):
+        return total + value
+
+    def render(self, values=None):
+        values = self.values if values is None else values
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class HistogramMetric:
+    """Cumulative-bucket histogram with a fixed set of label names"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        # label values -> [per-bucket counts, sum, count]
+        self.values = {}
+        with _metrics_lock:
+            _metrics.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with _metrics_lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][position] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @staticmethod
+    def merge(total, value):
+        return [[a + b for a, b in zip(total[0], value[0])], total[1] + value[1], total[2] + value[2]]
+
+    def render(self, values=None):
+        values = self.values if values is None else values
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (bucket_counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames + ('le',), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+search_latency = HistogramMetric(
+    'hoa_search_latency_seconds', "Time to rank one query", ('scorer', 'community'))
+dynamic_fallbacks = CounterMetric(
+    'hoa_search_dynamic_fallbacks_total', "Searches answered with a generate_dynamic_response fallback",
+    ('scorer', 'community'))
+cache_requests = CounterMetric(
+    'hoa_result_cache_requests_total', "Result cache lookups by cache and outcome", ('cache', 'result'))
+reruns = CounterMetric(
+    'hoa_streamlit_reruns_total', "Streamlit script runs", ('app',))
+rejected_requests = CounterMetric(
+    'hoa_api_rejected_requests_total', "API requests shed with 503 because the queue was full")
+
+# Copied in from the card cache, query log and scorer before every render or flush
+card_cache_requests = CounterMetric(
+    'hoa_card_cache_requests_total', "Rendered result card cache lookups by outcome", ('result',))
+query_log_lines = CounterMetric(
+    'hoa_query_log_lines_total', "Query log lines written, or dropped because the writer fell behind", ('result',))
+# Only grows while scorer stage timing is switched on
+scorer_stage_seconds = CounterMetric(
+    'hoa_scorer_stage_seconds_total', "Time spent in each similarity stage", ('stage',))
+scorer_stage_calls = CounterMetric(
+    'hoa_scorer_stage_calls_total', "Rules scored by each similarity stage", ('stage',))
+
+
+def community_label(community):
+    return community or 'statewide'
+
+
+def observe_search(seconds, results, community=None, scorer=ENGINE_SCORER):
+    """Record one ranked query: latency and whether the dynamic fallback answered it"""
+    label = community_label(community)
+    search_latency.observe(seconds, scorer=scorer, community=label)
+    if any(result.get('type') == 'dynamic' for result in results):
+        dynamic_fallbacks.inc(scorer=scorer, community=label)
+
+
+def observe_cache(cache, hit):
+    cache_requests.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def _refresh_copied_counters():
+    card_cache_requests.set_totals({(outcome,): count for outcome, count in card_cache_stats.items()})
+    query_log = get_query_log()
+    if query_log is not None:
+        query_log_lines.set_totals({('written',): query_log.written, ('dropped',): query_log.dropped})
+    # Never imports the engine; a process that has not loaded it has scored nothing
+    engine = sys.modules.get('hoa_search_engine')
+    if engine is not None:
+        stage_timings = engine.process_stage_timings()
+        scorer_stage_seconds.set_totals({(stage,): seconds for stage, (seconds, _) in stage_timings.items()})
+        scorer_stage_calls.set_totals({(stage,): calls for stage, (_, calls) in stage_timings.items()})
+
+
+def _gauge_lines(name, documentation, labelname, values):
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    for label, value in sorted(values.items()):
+        lines.append(f'{name}{{{labelname}="{_escape_label(label)}"}} {_format_value(value)}')
+    return lines
+
+
+def _collected_lines():
+    """Gauges read from the engine at scrape time"""
+    # Imported here so loading the metrics module never pulls in the engine at startup
+    from hoa_search_engine import rule_index_stats
+    index_stats = {community_label(community): stats for community, stats in rule_index_stats().items()}
+    lines = []
+    lines += _gauge_lines('hoa_rule_index_rules', "Rules in the loaded rule index", 'community',
+                          {label: stats['rules'] for label, stats in index_stats.items()})
+    lines += _gauge_lines('hoa_rule_index_postings', "Term postings in the loaded rule index", 'community',
+                          {label: stats['postings'] for label, stats in index_stats.items()})
+    lines += _gauge_lines('hoa_rule_index_load_seconds', "Time taken to build or attach the rule index", 'community',
+                          {label: stats['load_seconds'] for label, stats in index_stats.items()})
+
+    if _multiprocess_dir is None:
+        lines += _gauge_lines('hoa_process_start_time_seconds', "Unix time this process started", 'pid',
+                              {os.getpid(): _process_started})
+    else:
+        lines += ["# HELP hoa_process_start_time_seconds Unix time the pre-fork server started",
+                  "# TYPE hoa_process_start_time_seconds gauge",
+                  f"hoa_process_start_time_seconds {_format_value(_server_started)}"]
+    return lines
+
+
+def enable_multiprocess(directory):
+    """Front process of a pre-fork server: share worker metrics through directory.
+
+    Files left by an earlier run are removed. Files of workers that exit are
+    kept, so the summed counters never go backwards when a worker is replaced.
+    """
+    global _multiprocess_dir, _server_started
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+        os.remove(path)
+    _multiprocess_dir = directory
+    _server_started = time.time()
+
+
+def flush_metrics():
+    """Write this process's counters to the shared directory (pre-fork workers only; no-op otherwise)"""
+    if _multiprocess_dir is None:
+        return
+    _refresh_copied_counters()
+    with _metrics_lock:
+        state = {metric.name: [[list(key), value] for key, value in metric.values.items()] for metric in _metrics}
+    path = os.path.join(_multiprocess_dir, f"metrics_{os.getpid()}.json")
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(temp_path, path)
+
+
+def start_metrics_flusher():
+    """Pre-fork worker: flush this process's counters to the shared directory every METRICS_FLUSH_SECONDS"""
+    def flush_forever():
+        while True:
+            time.sleep(METRICS_FLUSH_SECONDS)
+            flush_metrics()
+
+    threading.Thread(target=flush_forever, name='metrics-flush', daemon=True).start()
+
+
+def _merged_values():
+    """metric name -> summed values over every worker file in the shared directory"""
+    merged = {metric.name: {} for metric in _metrics}
+    merge = {metric.name: metric.merge for metric in _metrics}
+    for path in glob.glob(os.path.join(_multiprocess_dir, 'metrics_*.json')):
+        try:
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, series in state.items():
+            if name not in merged:
+                continue
+            values = merged[name]
+            for key, value in series:
+                key = tuple(key)
+                values[key] = merge[name](values[key], value) if key in values else value
+    return merged
+
+
+def render_metrics():
+    """Every metric as Prometheus text: this process's, or the sum over every pre-fork worker"""
+    if _multiprocess_dir is None:
+        _refresh_copied_counters()
+        with _metrics_lock:
+            lines = [line for metric in _metrics for line in metric.render()]
+    else:
+        # Flush first so the answering worker's latest requests are counted
+        flush_metrics()
+        merged = _merged_values()
+        lines = [line for metric in _metrics for line in metric.render(merged[metric.name])]
+    lines += _collected_lines()
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_metrics_server = None
+
+
+def start_metrics_server(port, host=DEFAULT_METRICS_HOST):
+    """Serve /metrics from a daemon thread; later calls in the same process reuse the running server"""
+    global _metrics_server
+    with _metrics_lock:
+        if _metrics_server is None:
+            _metrics_server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+            threading.Thread(target=_metrics_server.serve_forever, name='metrics', daemon=True).start()
+        return _metrics_server
@@ -0,0 +1,233 @@
+import argparse
+import re
+import sys
+import threading
+import time
+from array import array
+
+from community_corpus import Passage, PassageIndex, get_passage_index, list_documents, score_passages, search_passages
+from document_sections import split_sections
+from hoa_search_engine import RuleRecord, SearchResult, analyze_query, list_communities
+
+# Sections longer than this many words (whole statute sections, the landscaping
+# article printed without section headings) are cut into parts at sentence ends
+UNIT_MAX_WORDS = 400
+SENTENCE_END = re.compile(r'(?<=[.;:])\s+')
+
+# An article result scores its best section plus this share of each other
+# section that brings in query words the best one lacks
+ARTICLE_SIBLING_WEIGHT = 0.25
+
+# Characters of each section kept in an article result's content
+ARTICLE_SECTION_CHARS = 600
+
+
+def section_parts(section, max_words=UNIT_MAX_WORDS):
+    """(page, text) retrieval units of one section: the whole section, or sentence-aligned parts of a long one"""
+    if len(section.text.split()) <= max_words:
+        return [(section.page, section.text)]
+    parts = []
+    start = 0
+    words = 0
+    offset = 0
+    for sentence in SENTENCE_END.split(section.text):
+        sentence_words = len(sentence.split())
+        if words and words + sentence_words > max_words:
+            parts.append((section.page_at(start), section.text[start:offset].strip()))
+            start = offset
+            words = 0
+        words += sentence_words
+        offset = section.text.index(sentence, offset) + len(sentence)
+    parts.append((section.page_at(start), section.text[start:].strip()))
+    return parts
+
+
+def load_section_units(community):
+    """Section units of a community's documents, with their labels and parent unit ids.
+
+    An 'ARTICLE' heading opens a unit that is the parent of every section under
+    it; the parts of a long section share the section's parent, and the later
+    parts of a long article heading point to its first part. Preambles and
+    statute sections have no parent (-1).
+    """
+    units = []
+    labels = []
+    parents = array('i')
+    for filename in list_documents(community):
+        _, sections = split_sections(community, filename)
+        article_unit = -1
+        for section in sections:
+            is_article = section.article is not None and section.number is None
+            if is_article:
+                parent = -1
+            elif section.article is not None:
+                parent = article_unit
+            else:
+                parent = -1
+            first_unit = len(units)
+            for part, (page, text) in enumerate(section_parts(section)):
+                units.append(Passage(len(units), community, section.document, page, text))
+                labels.append(sys.intern(section.label))
+                parents.append(parent if part == 0 or not is_article else first_unit)
+            if is_article:
+                article_unit = first_unit
+    return units, labels, parents
+
+
+class SectionIndex:
+    """Section units scored like passages, plus the parent pointers that group them into articles"""
+
+    def __init__(self, units, labels, parents):
+        self.index = PassageIndex(units)
+        self.labels = labels
+        self.parents = parents
+        self.children = {}
+        for unit_id, parent in enumerate(parents):
+            if parent >= 0:
+                self.children.setdefault(parent, []).append(unit_id)
+
+    def __len__(self):
+        return len(self.index)
+
+    def article_of(self, unit_id):
+        """Unit id of the article a unit sits in (itself for an article heading); -1 if none"""
+        parent = self.parents[unit_id]
+        if parent >= 0:
+            return parent
+        return unit_id if unit_id in self.children else -1
+
+
+_section_indexes = {}
+_section_index_lock = threading.Lock()
+
+
+def get_section_index(community):
+    """Shared section index for a community; built on first use and reused by every session"""
+    index = _section_indexes.get(community)
+    if index is not None:
+        return index
+
+    if community not in list_communities():
+        raise KeyError(f"Unknown community: {community}")
+
+    with _section_index_lock:
+        if community not in _section_indexes:
+            _section_indexes[community] = SectionIndex(*load_section_units(community))
+        return _section_indexes[community]
+
+
+def section_result(index, unit_id, score):
+    unit = index.index.passages[unit_id]
+    label = index.labels[unit_id]
+    rule_data = RuleRecord.from_dict({
+        'title': f"{unit.document}, {label}, page {unit.page}",
+        'content': unit.text,
+        'statute': label,
+        'links': (),
+        'community': unit.community,
+        'document': unit.document,
+        'section': label
+    })
+    return SearchResult(f"{unit.community}:s{unit_id}", rule_data, score, rule_data.title, False, 'section',
+                        versions=index.index.versions_of(unit_id))
+
+
+def article_result(index, article_id, unit_ids, score):
+    """One result for an article, showing the sections that matched in document order"""
+    article = index.index.passages[article_id]
+    unit_ids = sorted(unit_ids)
+    first = index.index.passages[unit_ids[0]]
+    label = index.labels[article_id]
+    sections = [index.labels[unit_id] for unit_id in unit_ids if index.labels[unit_id] != label]
+    rule_data = RuleRecord.from_dict({
+        'title': f"{article.document}, {label}, page {first.page}",
+        'content': ' ... '.join(index.index.passages[unit_id].text[:ARTICLE_SECTION_CHARS] for unit_id in unit_ids),
+        'statute': f"{label} ({', '.join(dict.fromkeys(sections))})" if sections else label,
+        'links': (),
+        'community': article.community,
+        'document': article.document,
+        'section': label
+    })
+    return SearchResult(f"{article.community}:a{article_id}", rule_data, score, rule_data.title, False, 'article')
+
+
+def search_sections(query, community, k=10, expand=True):
+    """Top-k sections of a community's documents for a query, best first.
+
+    Sections are the units scored. With expand, a section is replaced by its
+    article only when other sections of that article match query words the
+    section itself lacks; those sections fold into the article result instead
+    of ranking on their own. An article is expanded at most once.
+    """
+    index = get_section_index(community)
+    scored = score_passages(index.index, analyze_query(query))
+    if not expand:
+        return [section_result(index, unit_id, score) for score, unit_id, _ in scored[:k]]
+
+    hits_by_article = {}
+    for score, unit_id, term_counts in scored:
+        article_id = index.article_of(unit_id)
+        if article_id >= 0:
+            hits_by_article.setdefault(article_id, []).append((score, unit_id, term_counts))
+
+    results = []
+    used = set()
+    expanded = set()
+    for score, unit_id, term_counts in scored:
+        if len(results) == k:
+            break
+        if unit_id in used:
+            continue
+        used.add(unit_id)
+        article_id = index.article_of(unit_id)
+        covered = set(term_counts)
+        members = [unit_id]
+        article_score = score
+        siblings = hits_by_article.get(article_id, ()) if article_id not in expanded else ()
+        for sibling_score, sibling_id, sibling_counts in siblings:
+            if sibling_id in used or covered.issuperset(sibling_counts):
+                continue
+            covered.update(sibling_counts)
+            members.append(sibling_id)
+            article_score += ARTICLE_SIBLING_WEIGHT * sibling_score
+        if len(members) == 1:
+            results.append(section_result(index, unit_id, score))
+            continue
+        used.update(members)
+        expanded.add(article_id)
+        results.append(article_result(index, article_id, members, article_score))
+    results.sort(key=lambda result: -result.score)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Section units of each community's documents, and section vs passage retrieval")
+    parser.add_argument('--community', action='append', help="Community to report (repeatable; default: all)")
+    parser.add_argument('--query', action='append', help="Query to run (repeatable)")
+    parser.add_argument('-k', type=int, default=5, help="Results per query (default: %(default)s)")
+    args = parser.parse_args()
+
+    queries = args.query or ["trucks boats trailers parking", "pets animals leash", "quorum members annual meeting",
+                             "landscaping trees irrigation"]
+    for community in args.community or list_communities():
+        index = get_section_index(community)
+        passage_index = get_passage_index(community)
+        articles = sum(1 for unit_id in range(len(index)) if index.article_of(unit_id) == unit_id)
+        print(f"{community}: {len(index)} section units in {articles} articles ({len(passage_index)} page passages)")
+        for query in queries:
+            query_features = analyze_query(query)
+            started = time.perf_counter()
+            results = search_sections(query, community, args.k)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            section_scored = len(score_passages(index.index, query_features))
+            passage_scored = len(score_passages(passage_index, query_features))
+            print(f"  {query!r}: {section_scored} sections scored vs {passage_scored} passages, {elapsed_ms:.2f} ms")
+            for result in results:
+                print(f"    {result.score:6.1f} [{result.type}] {result.rule_data.statute}: {result.rule_data.document}, "
+                      f"page {result.title.rsplit(' ', 1)[-1]}")
+            for result in search_passages(query, community, 1):
+                print(f"    best passage {result.score:6.1f} {result.title}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,19 @@
 import streamlit as st
+import os
 import re
+import time
+
+from result_cards import page_slice, render_result_list
+from query_log import log_query
+from search_metrics import observe_cache, observe_search, reruns, start_metrics_server
 
 st.set_page_config(page_title="Florida HOA Rules Lookup", page_icon="🏘️")
 
+# Prometheus metrics for this Streamlit process, served from a background thread when a port is set
+if os.environ.get('HOA_METRICS_PORT'):
+    start_metrics_server(int(os.environ['HOA_METRICS_PORT']))
+reruns.inc(app='streamlit_app')
+
 st.markdown("# 🏘️ Florida HOA Rules Lookup")
 st.markdown("**Comprehensive Florida HOA search based on Florida Statute 720 and real community examples**")
 st.info("🏘️ **Featured Community**: Includes actual rules from **Boca Ridge Glen HOA** in Palm Beach County, Florida")
@@ -556,9 +567,33 @@ with col20:
     if st.button("⚖️ Board Powers"):
         query = "board authority powers duties"
 
+# Ranked results are kept in session state so "load more" reruns never repeat the search
+def load_more_results():
+    st.session_state.results_page += 1
+    st.session_state.results_load_more = True
+
+# "Load more" pages through the ranking on screen, whatever the text box now holds:
+# topic-button queries do not survive a rerun, and the box may hold another query
+load_more = st.session_state.get('results_load_more', False)
+if load_more:
+    query = st.session_state.results_query
+st.session_state.results_load_more = False
+
 # Display enhanced search results with Boca Ridge examples
 if query:
-    results = search_florida_hoa_rules(query)
+    search_started = time.perf_counter()
+    cache_hit = st.session_state.get('results_query') == query
+    observe_cache('session_results', cache_hit)
+    if not cache_hit:
+        st.session_state.results_query = query
+        st.session_state.results_ranked = search_florida_hoa_rules(query)
+        observe_search(time.perf_counter() - search_started, st.session_state.results_ranked, scorer='streamlit_app')
+        st.session_state.results_page = 1
+    results = st.session_state.results_ranked
+    # Any widget reruns the script; only a new search or a "load more" page is logged
+    if not cache_hit or load_more:
+        log_query(query, results, (time.perf_counter() - search_started) * 1000,
+                  cache='hit' if cache_hit else 'miss', source='streamlit_app')
     
     if results:
         st.markdown(f"### 📋 Found {len(results)} Florida HOA Results for: '{query}'")
@@ -593,67 +628,14 @@ if query:
             for i, result in enumerate(debug_results[:10], 1):
                 st.caption(f"{i}. {result['name']}: {result['score']} points (Contract Content: {result['has_contract_content']})")
         
-        for i, result in enumerate(results[:6], 1):
-            rule_data = result['rule_data']
-            
-            # Enhanced relevance indicators
-            if result['score'] >= 80:
-                relevance = "🔥 High Relevance"
-                color = "#d4edda"
-            elif result['score'] >= 50:
-                relevance = "⭐ Medium Relevance"  
-                color = "#fff3cd"
-            else:
-                relevance = "💡 Related"
-                color = "#f8f9fa"
-            
-            # Special indicators for dynamic responses
-            dynamic_indicator = ""
-            if result.get('type') == 'dynamic':
-                dynamic_indicator = " 🤖"
-                relevance += " (AI Generated)"
-            
-            boca_indicator = " 🏘️" if result['has_boca_example'] else ""
-            
-            # Display using native Streamlit components for better compatibility
-            
-            # Header with relevance indicator
-            header_text = f"📄 {result['title']}"
-            if result['has_boca_example']:
-                header_text += " 🏘️"
-            if result.get('type') == 'dynamic':
-                header_text += " 🤖"
-                relevance += " (AI Generated)"
-            header_text += f" ({relevance})"
-            
-            with st.container():
-                st.markdown(f"### {header_text}")
-                
-                # Add relevance score thermometer
-                score_percentage = min(result['score'] / 200.0, 1.0)  # Scale to max 200 points
-                st.progress(score_percentage)
-                st.caption(f"🌡️ Relevance Score: {result['score']} points")
-                
-                st.markdown(f"**Florida Law:** {rule_data['content']}")
-                
-                # Examples section for dynamic responses
-                if result.get('type') == 'dynamic' and result.get('examples'):
-                    st.markdown("**💡 Common Examples:**")
-                    for example in result['examples']:
-                        st.markdown(f"• {example}")
-                
-                # Boca Ridge example section
-                if result['has_boca_example']:
-                    st.success(f"🏘️ **Boca Ridge Glen Example:** {rule_data['boca_ridge_example']}")
-                
-                # Links section using native Streamlit columns
-                st.markdown("**📚 Additional Resources:**")
-                link_cols = st.columns(len(rule_data['links']))
-                for idx, (link_text, link_url) in enumerate(rule_data['links']):
-                    with link_cols[idx % len(link_cols)]:
-                        st.markdown(f"🔗 [{link_text}]({link_url})")
-                
-                st.markdown("---")
+        # Only the cards for the pages loaded so far are rendered, as one HTML block
+        visible_results = results[:6]
+        shown_results = page_slice(visible_results, st.session_state.results_page)
+        st.markdown(render_result_list(shown_results), unsafe_allow_html=True)
+        
+        remaining = len(visible_results) - len(shown_results)
+        if remaining > 0:
+            st.button(f"⬇️ Load more results ({remaining} remaining)", on_click=load_more_results, key="load_more_results")
             
         if len(results) > 6:
             st.info(f"Showing top 6 of {len(results)} Florida HOA results. Try more specific terms for better matches.")
@@ -0,0 +1,190 @@
+import argparse
+import difflib
+import json
+import os
+import threading
+import time
+
+from community_corpus import list_documents, version_chains
+from document_sections import split_sections
+from hoa_search_engine import extract_words, list_communities
+
+DEFAULT_DIFFS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'version_diffs.json')
+DIFFS_VERSION = 1
+
+# Word-set Jaccard two sections need to be aligned as the same section in two versions
+MIN_ALIGNMENT = 0.25
+# Sections printed under the same label get this bonus once their words overlap
+# at least LABEL_MIN_JACCARD; OCR noise alone would otherwise keep them apart,
+# and a compiled document repeats labels across its parts too often to trust
+# a label without overlap
+LABEL_BONUS = 0.25
+LABEL_MIN_JACCARD = 0.15
+# Sections with fewer distinct words (bare "ARTICLE IX COMMITTEES" headings)
+# are too short for word overlap to mean anything and are never aligned
+MIN_SECTION_WORDS = 8
+
+# Changed spans stored per section, and characters kept of each side of a span (and of section excerpts)
+MAX_CHANGES = 20
+CHANGE_CHARS = 200
+
+
+def aligned_sections(old_sections, new_sections):
+    """(old index, new index, similarity) for sections of two versions that are the same section.
+
+    Pairs are taken best first, each section used at most once.
+    """
+    old_words = [set(extract_words(section.text.lower())) for section in old_sections]
+    new_words = [set(extract_words(section.text.lower())) for section in new_sections]
+    scored = []
+    for new_index, words in enumerate(new_words):
+        if len(words) < MIN_SECTION_WORDS:
+            continue
+        for old_index, other in enumerate(old_words):
+            if len(other) < MIN_SECTION_WORDS:
+                continue
+            similarity = len(words & other) / len(words | other)
+            if similarity >= LABEL_MIN_JACCARD and old_sections[old_index].label == new_sections[new_index].label:
+                similarity += LABEL_BONUS
+            if similarity >= MIN_ALIGNMENT:
+                scored.append((similarity, old_index, new_index))
+
+    scored.sort(key=lambda entry: (-entry[0], entry[1], entry[2]))
+    used_old = set()
+    used_new = set()
+    pairs = []
+    for similarity, old_index, new_index in scored:
+        if old_index not in used_old and new_index not in used_new:
+            used_old.add(old_index)
+            used_new.add(new_index)
+            pairs.append((old_index, new_index, similarity))
+    return pairs
+
+
+def section_changes(old_text, new_text):
+    """Word-level changed spans between two versions of a section, and their similarity ratio"""
+    old_words = old_text.split()
+    new_words = new_text.split()
+    matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+    changes = []
+    for operation, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if operation != 'equal' and len(changes) < MAX_CHANGES:
+            changes.append({
+                'operation': operation,
+                'old': ' '.join(old_words[old_start:old_end])[:CHANGE_CHARS],
+                'new': ' '.join(new_words[new_start:new_end])[:CHANGE_CHARS]
+            })
+    return changes, matcher.ratio()
+
+
+def section_summary(section):
+    return {'label': section.label, 'heading': section.heading, 'page': section.page, 'excerpt': section.text[:CHANGE_CHARS]}
+
+
+def diff_versions(old_sections, new_sections):
+    """Section-level diff of two document versions, in the new version's order with removed sections last"""
+    entries = []
+    matched = {}
+    for old_index, new_index, _ in aligned_sections(old_sections, new_sections):
+        matched[new_index] = old_index
+
+    for new_index, new_section in enumerate(new_sections):
+        if new_index not in matched:
+            entries.append({'status': 'added', 'old': None, 'new': section_summary(new_section),
+                            'similarity': 0.0, 'changes': []})
+            continue
+        old_section = old_sections[matched[new_index]]
+        changes, ratio = section_changes(old_section.text, new_section.text)
+        entries.append({'status': 'changed' if changes else 'unchanged', 'old': section_summary(old_section),
+                        'new': section_summary(new_section), 'similarity': round(ratio, 3), 'changes': changes})
+
+    removed = sorted(set(range(len(old_sections))) - set(matched.values()))
+    for old_index in removed:
+        entries.append({'status': 'removed', 'old': section_summary(old_sections[old_index]), 'new': None,
+                        'similarity': 0.0, 'changes': []})
+    return entries
+
+
+def community_version_diffs(community):
+    """Diffs between each consecutive pair of dated versions of a community's documents"""
+    sections_by_document = {}
+    for filename in list_documents(community):
+        document, sections = split_sections(community, filename)
+        sections_by_document[document] = sections
+
+    diffs = []
+    for document_type, versions in sorted(version_chains(sections_by_document).items()):
+        for old_document, new_document in zip(versions, versions[1:]):
+            entries = diff_versions(sections_by_document[old_document], sections_by_document[new_document])
+            counts = {}
+            for entry in entries:
+                counts[entry['status']] = counts.get(entry['status'], 0) + 1
+            diffs.append({'document_type': document_type, 'old_document': old_document, 'new_document': new_document,
+                          'counts': counts, 'sections': entries})
+    return diffs
+
+
+def write_version_diffs(path=DEFAULT_DIFFS_PATH, communities=None):
+    """Align and diff every community's document versions once, offline"""
+    report = {'version': DIFFS_VERSION, 'built_at': time.time(), 'communities': {}}
+    for community in communities or list_communities():
+        report['communities'][community] = community_version_diffs(community)
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f)
+    os.replace(temp_path, path)
+    return report
+
+
+_version_diffs = None
+_version_diffs_lock = threading.Lock()
+
+
+def get_version_diffs(community, document_type=None, status=None, path=DEFAULT_DIFFS_PATH):
+    """Stored version diffs of a community, optionally of one document type and one section status.
+
+    Reads the file written offline; nothing is diffed here.
+    """
+    global _version_diffs
+    if _version_diffs is None:
+        with _version_diffs_lock:
+            if _version_diffs is None:
+                if not os.path.exists(path):
+                    return []
+                with open(path, encoding='utf-8') as f:
+                    report = json.load(f)
+                if report.get('version') != DIFFS_VERSION:
+                    raise ValueError(f"Unsupported version diffs version {report.get('version')}")
+                _version_diffs = report
+
+    diffs = _version_diffs['communities'].get(community, [])
+    if document_type:
+        diffs = [diff for diff in diffs if diff['document_type'] == document_type]
+    if status:
+        diffs = [dict(diff, sections=[entry for entry in diff['sections'] if entry['status'] == status]) for diff in diffs]
+    return diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Align and diff each community's document versions (offline)")
+    parser.add_argument('--output', default=DEFAULT_DIFFS_PATH, help="Diffs file (default: %(default)s)")
+    parser.add_argument('--community', action='append', help="Community to process (repeatable; default: all)")
+    parser.add_argument('--show', type=int, default=5, help="Changed sections to print per version pair (default: %(default)s)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = write_version_diffs(args.output, args.community)
+    print(f"Wrote {args.output} in {time.perf_counter() - started:.1f}s")
+    for community, diffs in report['communities'].items():
+        for diff in diffs:
+            counts = ', '.join(f"{count} {status}" for status, count in sorted(diff['counts'].items()))
+            print(f"{community}: {diff['old_document']} -> {diff['new_document']}: {counts}")
+            changed = [entry for entry in diff['sections'] if entry['status'] == 'changed']
+            for entry in changed[:args.show]:
+                print(f"  {entry['old']['label']} (p.{entry['old']['page']}) -> {entry['new']['label']} "
+                      f"(p.{entry['new']['page']}): similarity {entry['similarity']:.2f}, {len(entry['changes'])} changed spans")
+
+
+if __name__ == '__main__':
+    main()